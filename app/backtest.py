@@ -0,0 +1,234 @@
+"""
+Rolling-origin backtest for the layer-1 price engines (see forecast_engines).
+
+For every (item, vendor) series in PriceHistory, walks forecast origins
+forward through the history: fit on everything up to the origin, forecast
+`horizon` days, and score the forecast against the prices actually observed
+in that window. Each model runs in its own process so wall time and peak
+memory are measured per model.
+
+Reports per model:
+- MAPE overall and by horizon bucket (1-7, 8-14, 15-30 days)
+- coverage: share of actuals inside [low_ci, high_ci]
+- wall time, mean time per fit, peak RSS
+
+Usage:
+    python -m app.backtest
+    python -m app.backtest --models simple-v1,holt-damped-v1,ets-weekly-v1 --step 7 --output backtest.json
+    python -m app.backtest --models price-v1 --max-origins 5 --items 1,2,3
+"""
+from __future__ import annotations
+import json
+import sys
+import time
+from datetime import date, datetime
+from typing import Optional
+import multiprocessing
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from . import models
+from .services import forecast_engines
+
+HORIZON_BUCKETS = ((1, 7), (8, 14), (15, 30))
+
+SeriesKey = tuple[int, str]
+# (dates as datetime64[D], prices as float64), in date order
+Series = tuple[np.ndarray, np.ndarray]
+
+
+def _run_engine(model_version: str, dates: np.ndarray, prices: np.ndarray, periods: int) -> np.ndarray:
+    return forecast_engines.get_engine(model_version).forecast(dates, prices, periods)
+
+
+def load_series(db: Session, item_ids: Optional[list[int]] = None) -> dict[SeriesKey, Series]:
+    """
+    Load every (item, vendor) price series in one ordered query.
+
+    Same-day duplicates are kept; they score as separate observations.
+    """
+    ph = models.PriceHistory
+    stmt = select(ph.item_id, ph.vendor, ph.date, ph.unit_price).order_by(ph.item_id, ph.vendor, ph.date, ph.id)
+    if item_ids:
+        stmt = stmt.where(ph.item_id.in_(item_ids))
+
+    grouped: dict[SeriesKey, tuple[list, list]] = {}
+    for item_id, vendor, obs_date, price in db.execute(stmt.execution_options(yield_per=10000)):
+        dates, prices = grouped.setdefault((item_id, vendor), ([], []))
+        dates.append(obs_date)
+        prices.append(float(price))
+    return {
+        key: (np.array(dates, dtype="datetime64[D]"), np.array(prices, dtype=float))
+        for key, (dates, prices) in grouped.items()
+    }
+
+
+def rolling_origins(dates: np.ndarray, min_train: int, horizon: int, step: int, max_origins: Optional[int]) -> list[int]:
+    """
+    Origins (number of training rows) for one series.
+
+    An origin is usable when at least min_train rows precede it and at least
+    one observation falls within the following `horizon` days. When
+    max_origins is set, the most recent origins are kept.
+    """
+    origins = []
+    for cut in range(min_train, len(dates), step):
+        ahead = (dates[cut] - dates[cut - 1]).astype(int)
+        if 1 <= ahead <= horizon:
+            origins.append(cut)
+    if max_origins is not None:
+        origins = origins[-max_origins:]
+    return origins
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB; None where `resource` is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def backtest_model(task: tuple[str, dict[SeriesKey, Series], int, int, int, Optional[int]]) -> dict:
+    """
+    Backtest one model over every series. Runs in a worker process.
+
+    Returns:
+        Metrics dict for the model
+    """
+    name, series, horizon, min_train, step, max_origins = task
+    started = time.perf_counter()
+
+    abs_pct_errors = []
+    offsets = []
+    covered = []
+    fit_seconds = []
+    failures = 0
+    n_series = 0
+    for dates, prices in series.values():
+        origins = rolling_origins(dates, min_train, horizon, step, max_origins)
+        if origins:
+            n_series += 1
+        for cut in origins:
+            fit_start = time.perf_counter()
+            try:
+                layer1 = _run_engine(name, dates[:cut], prices[:cut], horizon)
+            except Exception as e:
+                failures += 1
+                print(f"Warning: {name} failed at origin {dates[cut - 1]}: {e}")
+                continue
+            fit_seconds.append(time.perf_counter() - fit_start)
+
+            # Score every actual within the horizon against the forecast for its day
+            ahead = (dates[cut:] - dates[cut - 1]).astype(int)
+            in_window = (ahead >= 1) & (ahead <= horizon)
+            day = ahead[in_window]
+            actual = prices[cut:][in_window]
+            forecast = layer1[day - 1]
+            nonzero = actual != 0
+            abs_pct_errors.append(np.abs(actual[nonzero] - forecast[nonzero, 0]) / np.abs(actual[nonzero]))
+            offsets.append(day[nonzero])
+            covered.append((actual >= forecast[:, 1]) & (actual <= forecast[:, 2]))
+
+    errors = np.concatenate(abs_pct_errors) if abs_pct_errors else np.empty(0)
+    days = np.concatenate(offsets) if offsets else np.empty(0, dtype=int)
+    hits = np.concatenate(covered) if covered else np.empty(0, dtype=bool)
+
+    def mape(mask) -> Optional[float]:
+        return round(float(errors[mask].mean() * 100), 3) if mask.any() else None
+
+    return {
+        "model": name,
+        "series": n_series,
+        "origins": len(fit_seconds),
+        "failures": failures,
+        "points": int(hits.size),
+        "mape": mape(np.ones(errors.size, dtype=bool)),
+        "mape_by_horizon": {f"{lo}-{hi}": mape((days >= lo) & (days <= hi)) for lo, hi in HORIZON_BUCKETS if lo <= horizon},
+        "coverage": round(float(hits.mean()), 4) if hits.size else None,
+        "wall_s": round(time.perf_counter() - started, 3),
+        "mean_fit_ms": round(float(np.mean(fit_seconds)) * 1000, 3) if fit_seconds else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run_backtest(
+    db: Session,
+    model_names: list[str],
+    horizon: int = 30,
+    min_train: int = 10,
+    step: int = 7,
+    max_origins: Optional[int] = None,
+    item_ids: Optional[list[int]] = None
+) -> dict:
+    """
+    Backtest several models in parallel, one process per model.
+
+    Returns:
+        Report with run parameters and per-model metrics
+    """
+    # Fail fast on unknown model_versions, before spawning anything
+    for name in model_names:
+        forecast_engines.get_engine(name)
+
+    series = load_series(db, item_ids)
+    tasks = [(name, series, horizon, min_train, step, max_origins) for name in model_names]
+    # A fresh (spawned) process per model, never reused (maxtasksperchild=1,
+    # one task per chunk), so each model's peak RSS is its own
+    with multiprocessing.get_context("spawn").Pool(processes=len(tasks), maxtasksperchild=1) as pool:
+        results = pool.map(backtest_model, tasks, chunksize=1)
+
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "params": {
+            "horizon": horizon,
+            "min_train": min_train,
+            "step": step,
+            "max_origins": max_origins,
+            "item_ids": item_ids,
+            "series": len(series),
+        },
+        "models": {result["model"]: result for result in results},
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    from .database import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of price forecast models")
+    parser.add_argument("--models", type=str, default=",".join(forecast_engines.ENGINES),
+                        help=f"Comma-separated model_versions ({', '.join(forecast_engines.ENGINES)})")
+    parser.add_argument("--horizon", type=int, default=30, help="Days forecast from each origin")
+    parser.add_argument("--min-train", type=int, default=10, help="Minimum observations before the first origin")
+    parser.add_argument("--step", type=int, default=7, help="Observations between origins")
+    parser.add_argument("--max-origins", type=int, default=None, help="Keep only the latest N origins per series")
+    parser.add_argument("--items", type=str, default=None, help="Comma-separated item ids (default all)")
+    parser.add_argument("--output", type=str, default=f"backtest-{date.today():%Y%m%d}.json", help="JSON report path")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        report = run_backtest(
+            db,
+            [name.strip() for name in args.models.split(",") if name.strip()],
+            horizon=args.horizon,
+            min_train=args.min_train,
+            step=args.step,
+            max_origins=args.max_origins,
+            item_ids=[int(i) for i in args.items.split(",")] if args.items else None,
+        )
+    finally:
+        db.close()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for name, m in report["models"].items():
+        print(f"  {name:<10} MAPE {m['mape']}%  coverage {m['coverage']}  "
+              f"{m['origins']} origins  wall {m['wall_s']}s  peak {m['peak_rss_mb']} MB")
+    print(f"✓ Backtest report written to {args.output}")
@@ -0,0 +1,119 @@
+"""
+Startup-time benchmark for the API.
+
+Reports:
+- import latency: time to `import app.main` in a fresh interpreter
+- boot latency: time from launching uvicorn until /health answers
+- first/second forecast request latency (the first one pays for lazy imports)
+
+Usage:
+    python -m app.bench_startup
+    python -m app.bench_startup --runs 5 --item-id 1 --port 8765
+    FORECAST_WARMUP=1 python -m app.bench_startup --item-id 1
+"""
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def measure_import(runs: int) -> list[float]:
+    """Time `import app.main` in `runs` fresh interpreters."""
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def _get(url: str, timeout: float = 600.0) -> tuple[int, float]:
+    """GET url, returning (status code, seconds taken)."""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def measure_server(port: int, item_id: int | None, boot_timeout: float) -> dict:
+    """Launch uvicorn, wait for /health, then time forecast requests."""
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        boot = None
+        while time.perf_counter() - start < boot_timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                status, _ = _get(f"{base}/health", timeout=1.0)
+                if status == 200:
+                    boot = time.perf_counter() - start
+                    break
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                time.sleep(0.05)
+        if boot is None:
+            raise RuntimeError(f"/health did not answer within {boot_timeout}s")
+
+        result = {"boot_to_health_s": round(boot, 3)}
+        if item_id is not None:
+            url = f"{base}/api/v1/forecast/price/{item_id}"
+            status, first = _get(url)
+            _, second = _get(url)
+            result.update({
+                "forecast_status": status,
+                "first_forecast_s": round(first, 3),
+                "second_forecast_s": round(second, 3),
+            })
+        return result
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark API import and first-request latency")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter import runs")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the temporary uvicorn server")
+    parser.add_argument("--item-id", type=int, default=None, help="Item to request a price forecast for")
+    parser.add_argument("--boot-timeout", type=float, default=60.0, help="Seconds to wait for /health")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    imports = measure_import(args.runs)
+    report = {
+        "import_app_main_s": {
+            "median": round(statistics.median(imports), 3),
+            "min": round(min(imports), 3),
+            "max": round(max(imports), 3),
+            "runs": args.runs,
+        },
+        **measure_server(args.port, args.item_id, args.boot_timeout),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        imp = report["import_app_main_s"]
+        print(f"import app.main:   median {imp['median']}s (min {imp['min']}s, max {imp['max']}s, {imp['runs']} runs)")
+        print(f"boot to /health:   {report['boot_to_health_s']}s")
+        if "first_forecast_s" in report:
+            print(f"first forecast:    {report['first_forecast_s']}s (HTTP {report['forecast_status']})")
+            print(f"second forecast:   {report['second_forecast_s']}s")
@@ -0,0 +1,32 @@
+"""
+Recompute vendor delivery performance (on-time %, fill rate, lead times).
+
+Reads orders created in the rolling window and their receiving logs, and
+rewrites the vendor_performance table. Run daily so the window rolls forward.
+
+Usage:
+    python -m app.compute_vendor_performance
+    python -m app.compute_vendor_performance --window-days 365
+"""
+from __future__ import annotations
+import time
+from .database import SessionLocal, init_db
+from .services.vendor_performance import refresh_vendor_performance, WINDOW_DAYS
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recompute VendorPerformance from orders and receiving logs")
+    parser.add_argument("--window-days", type=int, default=WINDOW_DAYS, help="Days of orders to include")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        count = refresh_vendor_performance(db, window_days=args.window_days)
+        print(f"✓ Vendor performance recomputed for {count} suppliers ({args.window_days}-day window) "
+              f"in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
@@ -0,0 +1,32 @@
+"""
+Recompute vendor volatility (avg/stdev price change) from price history.
+
+Incremental by default: only price changes dated after each vendor's last run
+are read and merged into the stored running moments.
+
+Usage:
+    python -m app.compute_vendor_volatility
+    python -m app.compute_vendor_volatility --full
+"""
+from __future__ import annotations
+import time
+from .database import SessionLocal, init_db
+from .services.vendor_volatility import recompute_vendor_volatility
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recompute VendorVolatility from PriceHistory")
+    parser.add_argument("--full", action="store_true", help="Rescan all history instead of only new changes")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = recompute_vendor_volatility(db, full=args.full)
+        print(f"✓ {result['mode'].capitalize()} volatility recompute: {result['changes']} price changes, "
+              f"{len(result['vendors'])} vendors updated in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
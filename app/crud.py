@@ -1,9 +1,13 @@
 from __future__ import annotations
 from typing import Iterable
-from datetime import date
+from datetime import date, datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, func, tuple_
 from . import models
+from .services.latest_prices import get_latest_prices_by_vendor
+from .services import product_search, holt_state
+from .services.forecast_cache import forecast_cache
+from .services.price_forecast import get_season
 
 # Products
 def create_product(db: Session, **data) -> models.Product:
@@ -13,11 +17,13 @@ def create_product(db: Session, **data) -> models.Product:
 
 def list_products(db: Session, q: str | None = None, limit: int = 50, offset: int = 0):
     stmt = select(models.Product).where(models.Product.active == True)
-    if q:
-        like = f"%{q}%"
-        stmt = stmt.where((models.Product.sku.ilike(like)) | (models.Product.name.ilike(like)))
+    if q and q.strip():
+        stmt = stmt.where(product_search.contains_clause(db, q))
     return db.execute(stmt.offset(offset).limit(limit)).scalars().all()
 
+def search_products(db: Session, q: str, limit: int = 20):
+    return product_search.search_products(db, q, limit=limit)
+
 # Suppliers
 def create_supplier(db: Session, **data) -> models.Supplier:
     obj = models.Supplier(**data)
@@ -48,25 +54,47 @@ def log_inventory(db: Session, product_id: int, qty_change: int, reason: str, re
     return rec
 
 # Forecasts upsert
-def upsert_forecasts(db: Session, rows: Iterable[dict]) -> int:
-    inserted = 0
+FORECAST_KEY = ["product_id", "location_id", "date", "horizon_days", "model_version"]
+
+def upsert_forecasts(db: Session, rows: Iterable[dict], commit: bool = True, chunk_size: int = 500) -> dict:
+    """
+    Insert or update forecasts on uq_fc_unique (product, location, date,
+    horizon, model version). location_id defaults to 0 (not location-specific).
+
+    Written with bulk_upsert (one INSERT ... ON CONFLICT per chunk). Existing
+    keys are counted per chunk to report inserted vs updated. When a key
+    appears more than once, the last row wins. created_at is reset on update,
+    so it records when the stored value was produced.
+
+    Returns:
+        Dict with inserted and updated counts
+    """
+    written_at = datetime.now(timezone.utc)
+    unique: dict[tuple, dict] = {}
     for r in rows:
-        # simple upsert by lookup then create/update
-        stmt = select(models.Forecast).where(
-            models.Forecast.product_id == r["product_id"],
-            models.Forecast.date == r["date"],
-            models.Forecast.horizon_days == r.get("horizon_days", 7),
-            models.Forecast.model_version == r.get("model_version","v1")
-        )
-        obj = db.execute(stmt).scalar_one_or_none()
-        if obj:
-            obj.forecast_qty = r["forecast_qty"]
-        else:
-            obj = models.Forecast(**r)
-            db.add(obj)
-        inserted += 1
-    db.commit()
-    return inserted
+        row = {
+            "product_id": r["product_id"],
+            "location_id": r.get("location_id", 0),
+            "date": date.fromisoformat(r["date"]) if isinstance(r["date"], str) else r["date"],
+            "horizon_days": r.get("horizon_days", 7),
+            "forecast_qty": r["forecast_qty"],
+            "model_version": r.get("model_version", "v1"),
+            "created_at": written_at,
+        }
+        unique[tuple(row[k] for k in FORECAST_KEY)] = row
+    keys = list(unique)
+
+    fc = models.Forecast
+    existing = 0
+    for start in range(0, len(keys), chunk_size):
+        existing += db.execute(
+            select(func.count()).select_from(fc)
+            .where(tuple_(fc.product_id, fc.location_id, fc.date, fc.horizon_days, fc.model_version).in_(keys[start:start + chunk_size]))
+        ).scalar_one()
+    bulk_upsert(db, fc, list(unique.values()), FORECAST_KEY, update_columns=["forecast_qty", "created_at"], chunk_size=chunk_size)
+    if commit:
+        db.commit()
+    return {"inserted": len(keys) - existing, "updated": existing}
 
 # External factors CRUD
 def get_calendar_day(db: Session, target_date: date):
@@ -125,13 +153,19 @@ def create_price_history(db: Session, **data) -> models.PriceHistory:
     """Create a new price history record."""
     # Auto-compute season if not provided
     if "season" not in data and "date" in data:
-        from app.services.price_forecast import get_season
         data["season"] = get_season(data["date"])
     
     obj = models.PriceHistory(**data)
     db.add(obj)
+    db.flush()
+    
+    # Keep the incremental forecast state in step, in the same transaction
+    holt_state.record_price(db, obj)
     db.commit()
     db.refresh(obj)
+    
+    # New history changes the series, so cached fitted models are stale
+    forecast_cache.invalidate(obj.item_id, obj.vendor)
     return obj
 
 def list_price_history(db: Session, item_id: int, vendor: str | None = None, limit: int = 365):
@@ -142,6 +176,85 @@ def list_price_history(db: Session, item_id: int, vendor: str | None = None, lim
     stmt = stmt.order_by(models.PriceHistory.date.desc()).limit(limit)
     return db.execute(stmt).scalars().all()
 
+def get_latest_prices(db: Session, item_ids: Iterable[int]) -> dict[int, models.LatestPrice]:
+    """Latest price (any vendor) for each item, from the maintained latest_prices table."""
+    newest: dict[int, models.LatestPrice] = {}
+    for r in get_latest_prices_by_vendor(db, item_ids):
+        current = newest.get(r.item_id)
+        if current is None or (r.date, r.price_history_id) > (current.date, current.price_history_id):
+            newest[r.item_id] = r
+    return newest
+
+def get_latest_prep_records(db: Session, product_ids: Iterable[int], location_id: int) -> dict[int, models.PrepRecord]:
+    """Latest prep record per product at a location, in one query."""
+    ids = set(product_ids)
+    if not ids:
+        return {}
+    ranked = select(
+        models.PrepRecord.id,
+        func.row_number().over(
+            partition_by=models.PrepRecord.product_id,
+            order_by=(models.PrepRecord.date.desc(), models.PrepRecord.id.desc())
+        ).label("rn")
+    ).where(
+        models.PrepRecord.product_id.in_(ids),
+        models.PrepRecord.location_id == location_id
+    ).subquery()
+    stmt = select(models.PrepRecord).join(ranked, models.PrepRecord.id == ranked.c.id).where(ranked.c.rn == 1)
+    return {r.product_id: r for r in db.execute(stmt).scalars().all()}
+
+def bulk_upsert(
+    db: Session,
+    model,
+    rows: list[dict],
+    index_elements: list[str],
+    update_columns: list[str] | None = None,
+    chunk_size: int = 500
+) -> int:
+    """
+    Insert or update many rows keyed on a unique constraint.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on SQLite and PostgreSQL (one
+    executemany per chunk); other dialects fall back to a lookup per row. Every
+    row must have the same keys. update_columns defaults to every non-key
+    column in the rows. Does not commit.
+    """
+    if not rows:
+        return 0
+    table = model.__table__
+    if update_columns is None:
+        update_columns = [c for c in rows[0] if c not in index_elements]
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        set_ = {c: stmt.excluded[c] for c in update_columns}
+        if "updated_at" in table.c and "updated_at" not in set_:
+            # onupdate defaults do not fire for ON CONFLICT updates
+            set_["updated_at"] = func.now()
+        if set_:
+            stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        # executemany of one compiled statement per chunk
+        for start in range(0, len(rows), chunk_size):
+            db.execute(stmt, rows[start:start + chunk_size])
+        return len(rows)
+
+    for r in rows:
+        obj = db.execute(select(model).filter_by(**{k: r[k] for k in index_elements})).scalar_one_or_none()
+        if obj is None:
+            db.add(model(**r))
+        else:
+            for c in update_columns:
+                setattr(obj, c, r[c])
+    db.flush()
+    return len(rows)
+
 def create_vendor_volatility(db: Session, **data) -> models.VendorVolatility:
     """Create or update vendor volatility."""
     stmt = select(models.VendorVolatility).where(models.VendorVolatility.vendor == data["vendor"])
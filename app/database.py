@@ -2,6 +2,7 @@ from __future__ import annotations
 import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase, scoped_session
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,6 +17,60 @@ def _get_db_url() -> str:
 engine = create_engine(_get_db_url(), echo=False, future=True)
 SessionLocal = scoped_session(sessionmaker(bind=engine, autoflush=False, autocommit=False))
 
+# Async engine for the API, created on first use so scripts never need an async driver
+_async_engine: AsyncEngine | None = None
+_async_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+
+def _get_async_db_url() -> str:
+    """ASYNC_DATABASE_URL if set, otherwise DATABASE_URL with its async driver (aiosqlite / asyncpg)."""
+    url = os.getenv("ASYNC_DATABASE_URL", "").strip()
+    if url:
+        return url
+    url = _get_db_url()
+    for sync_prefix, async_prefix in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(_get_async_db_url(), echo=False)
+    return _async_engine
+
+def new_async_session() -> AsyncSession:
+    """A new AsyncSession. Objects stay readable after commit (expire_on_commit=False)."""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_sessionmaker = async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker()
+
+async def dispose_async_engine():
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_sessionmaker = None
+
 def init_db():
     from . import models
+    from .services import latest_prices, sales_cube, product_search, holt_state, vendor_performance  # flush hooks, search index events, backfills
+    from .services.demand_forecast import ensure_forecast_location_column
+    from .services.vendor_volatility import ensure_through_id_column
     Base.metadata.create_all(bind=engine)
+    ensure_forecast_location_column(engine)
+    ensure_through_id_column(engine)
+    # create_all skips indexes added to tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    product_search.ensure_search_index(engine)
+    latest_prices.backfill_if_empty()
+    holt_state.backfill_if_empty()
+    sales_cube.backfill_if_empty()
+    vendor_performance.backfill_if_empty()
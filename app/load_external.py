@@ -0,0 +1,44 @@
+"""
+Load economic or weather data files into EconMonth / WeatherDay.
+
+Streams CSV or NDJSON files of any size in chunks, validating each chunk and
+upserting it on the table's unique key (year + month, or date). Invalid rows
+are skipped and reported with their line numbers.
+
+Usage:
+    python -m app.load_external econ data/econ_data.csv
+    python -m app.load_external weather data/weather.ndjson
+    python -m app.load_external weather data/weather_all_stores.csv --zip 75201
+"""
+from __future__ import annotations
+from .database import SessionLocal, init_db
+from .services.factor_loader import load_file, KINDS, CHUNK_ROWS
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk-load EconMonth or WeatherDay rows from CSV / NDJSON")
+    parser.add_argument("kind", choices=KINDS, help="Table to load")
+    parser.add_argument("path", help="CSV or NDJSON file")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default=None, help="File format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_ROWS, help="Rows per batch and commit")
+    parser.add_argument("--zip", dest="zip_code", default=None, help="Weather: only load rows for this ZIP code")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        report = load_file(db, args.kind, args.path, args.format, args.chunk_size, args.zip_code)
+        for line, error in report.errors:
+            print(f"Warning: line {line}: {error}")
+        if report.mixed_zip_codes:
+            print("Warning: the file has several ZIP codes and WeatherDay holds one series; "
+                  "later rows overwrote earlier ones for the same date (use --zip)")
+        if report.rejected > len(report.errors):
+            print(f"Warning: {report.rejected - len(report.errors)} more rejected rows not shown")
+        skipped = f", {report.skipped} for other ZIP codes skipped" if report.skipped else ""
+        print(f"✓ Loaded {report.loaded} {args.kind} rows from {report.rows} read "
+              f"({report.rejected} rejected{skipped}) in {report.seconds:.1f}s, {report.rows_per_second:,.0f} rows/s")
+    finally:
+        db.close()
@@ -1,9 +1,13 @@
 from __future__ import annotations
-from fastapi import FastAPI, Depends, HTTPException, APIRouter
+import os
+import threading
+from fastapi import FastAPI, Depends, HTTPException, APIRouter, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from .database import SessionLocal, init_db
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import init_db, new_async_session, dispose_async_engine
 from . import crud, schemas
+from .services import line_stream
 
 app = FastAPI(title="DemandSync 3.0 Backend", version="3.0.0")
 
@@ -19,57 +23,112 @@ app.add_middleware(
 # API router with prefix
 api_router = APIRouter(prefix="/api/v1")
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with new_async_session() as db:
         yield db
-    finally:
-        db.close()
 
 @app.on_event("startup")
 def on_startup():
     init_db()
+    # Optionally load pandas/Prophet in the background so the first forecast doesn't pay for it
+    if os.getenv("FORECAST_WARMUP", "").strip().lower() in ("1", "true", "yes"):
+        from app.services.price_forecast import warm_up
+        threading.Thread(target=warm_up, name="forecast-warmup", daemon=True).start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    from app.services.fit_pool import shutdown_fit_pool
+    shutdown_fit_pool()
+    await dispose_async_engine()
 
 @app.get("/health")
 def health():
     return {"ok": True}
 
-# Products
+# Products (CRUD functions are sync and run on the AsyncSession's connection via run_sync)
 @api_router.get("/products", response_model=list[schemas.ProductOut])
-def list_products(q: str | None = None, limit: int = 50, offset: int = 0, db: Session = Depends(get_db)):
-    return crud.list_products(db, q=q, limit=limit, offset=offset)
+async def list_products(q: str | None = None, limit: int = 50, offset: int = 0, db: AsyncSession = Depends(get_db)):
+    return await db.run_sync(crud.list_products, q=q, limit=limit, offset=offset)
+
+@api_router.get("/products/search", response_model=list[schemas.ProductSearchHit])
+async def search_products(q: str, limit: int = 20, db: AsyncSession = Depends(get_db)):
+    return await db.run_sync(crud.search_products, q, limit=limit)
 
 @api_router.post("/products", response_model=schemas.ProductOut, status_code=201)
-def create_product(payload: schemas.ProductCreate, db: Session = Depends(get_db)):
-    return crud.create_product(db, **payload.model_dump())
+async def create_product(payload: schemas.ProductCreate, db: AsyncSession = Depends(get_db)):
+    return await db.run_sync(crud.create_product, **payload.model_dump())
 
 # Suppliers
 @api_router.get("/suppliers", response_model=list[schemas.SupplierOut])
-def list_suppliers(limit: int = 100, offset: int = 0, db: Session = Depends(get_db)):
-    return crud.list_suppliers(db, limit=limit, offset=offset)
+async def list_suppliers(limit: int = 100, offset: int = 0, db: AsyncSession = Depends(get_db)):
+    return await db.run_sync(crud.list_suppliers, limit=limit, offset=offset)
 
 @api_router.post("/suppliers", response_model=schemas.SupplierOut, status_code=201)
-def create_supplier(payload: schemas.SupplierCreate, db: Session = Depends(get_db)):
-    return crud.create_supplier(db, **payload.model_dump())
+async def create_supplier(payload: schemas.SupplierCreate, db: AsyncSession = Depends(get_db)):
+    return await db.run_sync(crud.create_supplier, **payload.model_dump())
 
 # Orders
 @api_router.get("/orders")
-def list_orders(limit: int = 50, offset: int = 0, db: Session = Depends(get_db)):
-    orders = crud.list_orders(db, limit=limit, offset=offset)
+async def list_orders(limit: int = 50, offset: int = 0, db: AsyncSession = Depends(get_db)):
+    orders = await db.run_sync(crud.list_orders, limit=limit, offset=offset)
     return [{"id": o.id, "status": o.status, "eta_date": o.eta_date, "created_at": o.created_at} for o in orders]
 
 @api_router.post("/orders", status_code=201)
-def create_order(payload: schemas.OrderCreate, db: Session = Depends(get_db)):
-    order = crud.create_order(db, supplier_id=payload.supplier_id, eta_date=payload.eta_date, items=[i.model_dump() for i in payload.items])
+async def create_order(payload: schemas.OrderCreate, db: AsyncSession = Depends(get_db)):
+    order = await db.run_sync(crud.create_order, supplier_id=payload.supplier_id, eta_date=payload.eta_date, items=[i.model_dump() for i in payload.items])
     return {"id": order.id, "status": order.status, "eta_date": order.eta_date, "created_at": order.created_at}
 
 # Forecasts
-@api_router.post("/forecasts/upsert")
-def upsert_forecasts(rows: list[dict], db: Session = Depends(get_db)):
-    if not rows:
+FORECAST_UPSERT_BATCH = 2000
+_forecast_rows = TypeAdapter(list[schemas.ForecastUpsert])
+_forecast_schema = schemas.ForecastUpsert.model_json_schema()
+
+@api_router.post(
+    "/forecasts/upsert",
+    response_model=schemas.ForecastUpsertResult,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": {"type": "array", "items": _forecast_schema}},
+        "application/x-ndjson": {"schema": _forecast_schema},
+    }}}
+)
+async def upsert_forecasts(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Upsert forecasts from a JSON array, or from an NDJSON body
+    (Content-Type: application/x-ndjson, one forecast per line) written in
+    batches as it streams in. All rows commit together; an invalid row
+    rejects the whole request (422, with its line number for NDJSON).
+    """
+    counts = {"inserted": 0, "updated": 0}
+
+    async def write(batch: list[dict]):
+        result = await db.run_sync(crud.upsert_forecasts, batch, commit=False)
+        counts["inserted"] += result["inserted"]
+        counts["updated"] += result["updated"]
+
+    if line_stream.is_ndjson(request):
+        batch = []
+        async for line_no, line in line_stream.iter_lines(request.stream()):
+            try:
+                batch.append(schemas.ForecastUpsert.model_validate_json(line).model_dump())
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail={"line": line_no, "errors": e.errors(include_url=False, include_context=False)})
+            if len(batch) >= FORECAST_UPSERT_BATCH:
+                await write(batch)
+                batch = []
+        if batch:
+            await write(batch)
+    else:
+        try:
+            rows = _forecast_rows.validate_json(await request.body())
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+        if rows:
+            await write([r.model_dump() for r in rows])
+
+    if not counts["inserted"] and not counts["updated"]:
         raise HTTPException(status_code=400, detail="rows required")
-    n = crud.upsert_forecasts(db, rows)
-    return {"upserted": n}
+    await db.commit()
+    return {"upserted": counts["inserted"] + counts["updated"], **counts}
 
 # Include the API router
 app.include_router(api_router)
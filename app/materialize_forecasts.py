@@ -0,0 +1,99 @@
+"""
+Nightly price forecast materialization.
+
+Precomputes 7/14/30-day price forecasts for every active product and writes
+them to the Forecast table (date = run date, forecast_qty = forecast price)
+under a model_version, so dashboards never have to fit models per request.
+By default each product is forecast and stored under its category's engine
+(FORECAST_ENGINE_BY_CATEGORY); --model-version pins one engine for all.
+
+Usage:
+    python -m app.materialize_forecasts
+    python -m app.materialize_forecasts --model-version price-v1 --as-of 2024-11-13
+    python -m app.materialize_forecasts --model-version holt-v1
+"""
+from __future__ import annotations
+import time
+from datetime import date
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from .database import SessionLocal, init_db
+from . import crud, models
+from .services.forecast_store import PRICE_MODEL_VERSION, HORIZONS
+from .services.price_forecast import forecast_item_prices
+
+
+def materialize_price_forecasts(
+    db: Session,
+    model_version: Optional[str] = PRICE_MODEL_VERSION,
+    as_of: date | None = None,
+    chunk_size: int = 500
+) -> dict:
+    """
+    Forecast every active product with price history and upsert the results.
+
+    Products are processed in chunks so memory stays bounded; each chunk is
+    one batch forecast (one history query, parallel fits).
+
+    Args:
+        model_version: Engine for every product; None uses each product's
+            category engine and stores its rows under that engine
+
+    Returns:
+        Counts: products, forecast rows written, errors
+    """
+    as_of = as_of or date.today()
+    product_ids = db.execute(
+        select(models.Product.id).where(models.Product.active == True).order_by(models.Product.id)
+    ).scalars().all()
+
+    products = rows_written = errors = 0
+    for start in range(0, len(product_ids), chunk_size):
+        latest = crud.get_latest_prices(db, product_ids[start:start + chunk_size])
+        if not latest:
+            continue
+        outcomes = forecast_item_prices(db, [(pid, rec.vendor) for pid, rec in latest.items()], model_version)
+
+        rows = []
+        for outcome in outcomes:
+            forecast = outcome["forecast"]
+            if forecast is None:
+                errors += 1
+                continue
+            for horizon in HORIZONS:
+                rows.append({
+                    "product_id": outcome["item_id"],
+                    "date": as_of,
+                    "horizon_days": horizon,
+                    "forecast_qty": forecast[f"next_{horizon}_day_price"],
+                    "model_version": outcome["model_version"],
+                })
+        products += len(outcomes)
+        if rows:
+            counts = crud.upsert_forecasts(db, rows)
+            rows_written += counts["inserted"] + counts["updated"]
+
+    return {"products": products, "rows": rows_written, "errors": errors}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Materialize price forecasts into the Forecast table")
+    parser.add_argument("--model-version", type=str, default=PRICE_MODEL_VERSION,
+                        help="Engine to forecast and write under, default per category")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None, help="Run date (YYYY-MM-DD), default today")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Products per batch forecast")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = materialize_price_forecasts(db, args.model_version, args.as_of, args.chunk_size)
+        elapsed = time.perf_counter() - started
+        print(f"✓ Materialized {result['rows']} forecasts for {result['products']} products "
+              f"({result['errors']} errors) under {args.model_version or 'per-category engines'} in {elapsed:.1f}s")
+    finally:
+        db.close()
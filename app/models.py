@@ -1,5 +1,5 @@
 from __future__ import annotations
-from sqlalchemy import String, Integer, ForeignKey, Boolean, Numeric, Date, DateTime, Text, UniqueConstraint, func, Time
+from sqlalchemy import String, Integer, Float, ForeignKey, Boolean, Numeric, Date, DateTime, Text, UniqueConstraint, Index, func, Time
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .database import Base
 
@@ -60,6 +60,7 @@ class Product(Base):
 # orders
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (Index("ix_orders_created_supplier", "created_at", "supplier_id"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     supplier_id: Mapped[int | None] = mapped_column(ForeignKey("suppliers.id"))
     status: Mapped[str] = mapped_column(String(24), default="draft")
@@ -70,6 +71,7 @@ class Order(Base):
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (Index("ix_order_items_order", "order_id"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), nullable=False)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
@@ -81,6 +83,7 @@ class OrderItem(Base):
 # inventory logs
 class InventoryLog(Base):
     __tablename__ = "inventory_logs"
+    __table_args__ = (Index("ix_inventory_logs_ref_created", "ref_type", "created_at"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
     qty_change: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -123,13 +126,15 @@ class Forecast(Base):
     __tablename__ = "forecasts"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
+    # 0 = not location-specific (price forecasts); demand forecasts are per location
+    location_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     date: Mapped["Date"] = mapped_column(Date, nullable=False)
     horizon_days: Mapped[int] = mapped_column(Integer, default=7)
     forecast_qty: Mapped[float] = mapped_column(Numeric(12,2), nullable=False)
     model_version: Mapped[str] = mapped_column(String(32), default="v1")
     created_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now())
     product: Mapped["Product"] = relationship(back_populates="forecasts")
-    __table_args__ = (UniqueConstraint("product_id","date","horizon_days","model_version", name="uq_fc_unique"),)
+    __table_args__ = (UniqueConstraint("product_id","location_id","date","horizon_days","model_version", name="uq_fc_unique"),)
 
 # KPI snapshots
 class KpiSnapshot(Base):
@@ -198,6 +203,23 @@ class PriceHistory(Base):
     season: Mapped[str] = mapped_column(String(20), nullable=False)  # auto computed
     created_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now())
     product: Mapped["Product"] = relationship()
+    __table_args__ = (Index("ix_price_history_item_vendor_date", "item_id", "vendor", "date"),)
+
+# Latest price per (item, vendor), kept current by a flush hook (services/latest_prices)
+class LatestPrice(Base):
+    __tablename__ = "latest_prices"
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    item_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
+    vendor: Mapped[str] = mapped_column(String(100), nullable=False)
+    price_history_id: Mapped[int] = mapped_column(Integer, nullable=False)  # source row
+    date: Mapped["Date"] = mapped_column(Date, nullable=False)
+    unit_price: Mapped[float] = mapped_column(Numeric(10,2), nullable=False)
+    unit_cost: Mapped[float] = mapped_column(Numeric(10,2), nullable=False)
+    purchase_quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    shelf_life_days: Mapped[int] = mapped_column(Integer, nullable=False)
+    category: Mapped[str] = mapped_column(String(50), nullable=False)
+    updated_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    __table_args__ = (UniqueConstraint("item_id", "vendor", name="uq_latest_price_item_vendor"),)
 
 class VendorVolatility(Base):
     __tablename__ = "vendor_volatility"
@@ -209,6 +231,56 @@ class VendorVolatility(Base):
     lead_time_days: Mapped[int] = mapped_column(Integer, nullable=False)
     updated_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+# Delivery performance per supplier over a rolling window of orders (services/vendor_performance)
+class VendorPerformance(Base):
+    __tablename__ = "vendor_performance"
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    supplier_id: Mapped[int] = mapped_column(ForeignKey("suppliers.id"), unique=True, nullable=False)
+    vendor: Mapped[str] = mapped_column(String(180), nullable=False)
+    window_start: Mapped["Date"] = mapped_column(Date, nullable=False)  # orders created on or after
+    orders: Mapped[int] = mapped_column(Integer, nullable=False)
+    due_orders: Mapped[int] = mapped_column(Integer, nullable=False)  # received, or past ETA
+    on_time_orders: Mapped[int] = mapped_column(Integer, nullable=False)
+    late_orders: Mapped[int] = mapped_column(Integer, nullable=False)
+    on_time_pct: Mapped[float | None] = mapped_column(Numeric(5,2))
+    fill_rate: Mapped[float | None] = mapped_column(Numeric(5,2))  # percentage of ordered units received
+    lead_time_mean: Mapped[float | None] = mapped_column(Numeric(6,2))  # days, order to first receipt
+    lead_time_p50: Mapped[float | None] = mapped_column(Numeric(6,2))
+    lead_time_p90: Mapped[float | None] = mapped_column(Numeric(6,2))
+    lead_time_min: Mapped[int | None] = mapped_column(Integer)
+    lead_time_max: Mapped[int | None] = mapped_column(Integer)
+    updated_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# Running price-change moments per vendor, so volatility can be recomputed incrementally
+class VendorPriceChangeStats(Base):
+    __tablename__ = "vendor_price_change_stats"
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    vendor: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+    n: Mapped[int] = mapped_column(Integer, nullable=False)  # number of price changes seen
+    mean: Mapped[float] = mapped_column(Float, nullable=False)  # mean % change
+    m2: Mapped[float] = mapped_column(Float, nullable=False)  # sum of squared deviations
+    through_date: Mapped["Date"] = mapped_column(Date, nullable=False)  # latest price date included
+    through_id: Mapped[int | None] = mapped_column(Integer)  # highest price_history.id included (incremental watermark)
+    updated_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# Incremental Holt state per (item, vendor), updated on every price history write
+class PriceForecastState(Base):
+    __tablename__ = "price_forecast_states"
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    item_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
+    vendor: Mapped[str] = mapped_column(String(100), nullable=False)
+    model_version: Mapped[str] = mapped_column(String(32), default="holt-v1")
+    level: Mapped[float] = mapped_column(Float, nullable=False)
+    trend: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    resid_var: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)  # one-step-ahead error variance
+    n_obs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # days with an observation
+    last_date: Mapped["Date"] = mapped_column(Date, nullable=False)
+    last_price: Mapped[float] = mapped_column(Numeric(10,2), nullable=False)
+    shelf_life_days: Mapped[int] = mapped_column(Integer, nullable=False)
+    category: Mapped[str] = mapped_column(String(50), nullable=False)
+    updated_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    __table_args__ = (UniqueConstraint("item_id", "vendor", "model_version", name="uq_pfs_item_vendor_version"),)
+
 # Restaurant operations models
 class Location(Base):
     __tablename__ = "locations"
@@ -221,6 +293,7 @@ class Location(Base):
 
 class PrepRecord(Base):
     __tablename__ = "prep_records"
+    __table_args__ = (Index("ix_prep_records_location_date", "location_id", "date"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
@@ -245,6 +318,7 @@ class Cocktail(Base):
     price_sensitivity: Mapped[str | None] = mapped_column(String(20))  # low, medium, high
     active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    ingredients: Mapped[list["CocktailIngredient"]] = relationship(back_populates="cocktail", order_by="CocktailIngredient.id")
 
 class CocktailIngredient(Base):
     __tablename__ = "cocktail_ingredients"
@@ -253,11 +327,12 @@ class CocktailIngredient(Base):
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
     quantity: Mapped[float] = mapped_column(Numeric(8,2), nullable=False)
     unit: Mapped[str] = mapped_column(String(20), default="oz")
-    cocktail: Mapped["Cocktail"] = relationship()
+    cocktail: Mapped["Cocktail"] = relationship(back_populates="ingredients")
     product: Mapped["Product"] = relationship()
 
 class SalesRecord(Base):
     __tablename__ = "sales_records"
+    __table_args__ = (Index("ix_sales_records_location_date", "location_id", "date"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
     date: Mapped["Date"] = mapped_column(Date, nullable=False)
@@ -271,6 +346,28 @@ class SalesRecord(Base):
     product: Mapped["Product"] = relationship()
     cocktail: Mapped["Cocktail"] = relationship()
 
+# Sales summed per location, item, day and service type, kept current by a flush hook (services/sales_cube).
+# 0 / "" stand for "no product", "no cocktail" and "no service type", so every key column is NOT NULL;
+# no foreign keys, the cube is derived data and can be rebuilt from sales_records at any time
+class SalesDailyCube(Base):
+    __tablename__ = "sales_daily_cube"
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    location_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    date: Mapped["Date"] = mapped_column(Date, nullable=False)
+    product_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cocktail_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    service_type: Mapped[str] = mapped_column(String(20), nullable=False, default="")
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    revenue: Mapped[float] = mapped_column(Numeric(14,2), nullable=False, default=0)
+    cost: Mapped[float] = mapped_column(Numeric(14,2), nullable=False, default=0)
+    sales_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    first_sale_id: Mapped[int] = mapped_column(Integer, nullable=False)  # lowest sales_records.id in the cell
+    updated_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    __table_args__ = (
+        UniqueConstraint("location_id", "date", "product_id", "cocktail_id", "service_type", name="uq_sales_cube_key"),
+        Index("ix_sales_cube_updated_at", "updated_at"),
+    )
+
 class WasteAlert(Base):
     __tablename__ = "waste_alerts"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -0,0 +1,25 @@
+"""
+Rebuild incremental Holt forecast states by replaying all price history.
+
+States are normally kept current by crud.create_price_history and are built
+on first start (init_db) when the table is empty; run this after bulk loads
+that bypass them, or to recover from a lost/corrupt state table.
+
+Usage:
+    python -m app.rebuild_holt_state
+"""
+from __future__ import annotations
+import time
+from .database import SessionLocal, init_db
+from .services.holt_state import rebuild_states, HOLT_MODEL_VERSION
+
+
+if __name__ == "__main__":
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        count = rebuild_states(db)
+        print(f"✓ Rebuilt {count} {HOLT_MODEL_VERSION} series states in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
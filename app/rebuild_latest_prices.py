@@ -0,0 +1,24 @@
+"""
+Rebuild the latest_prices table from price_history.
+
+latest_prices is kept current on every ORM insert; run this after updating or
+deleting history, or after loading rows with raw SQL.
+
+Usage:
+    python -m app.rebuild_latest_prices
+"""
+from __future__ import annotations
+import time
+from .database import SessionLocal, init_db
+from .services.latest_prices import rebuild_latest_prices
+
+
+if __name__ == "__main__":
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        count = rebuild_latest_prices(db)
+        print(f"✓ Rebuilt latest prices for {count} series in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
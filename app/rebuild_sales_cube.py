@@ -0,0 +1,24 @@
+"""
+Rebuild the sales_daily_cube table from sales_records.
+
+The cube is kept current on every ORM insert; run this after updating or
+deleting sales, or after loading rows with raw SQL.
+
+Usage:
+    python -m app.rebuild_sales_cube
+"""
+from __future__ import annotations
+import time
+from .database import SessionLocal, init_db
+from .services.sales_cube import rebuild_sales_cube
+
+
+if __name__ == "__main__":
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        count = rebuild_sales_cube(db)
+        print(f"✓ Rebuilt sales cube with {count} cells in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
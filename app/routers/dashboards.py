@@ -1,98 +1,262 @@
 """
 Dashboard API endpoints for Chef, Bar Manager, Supply Chain Analyst, Location, and Region views.
+
+Endpoints are async. Independent sections of a dashboard are plain functions
+taking a sync Session; each runs on its own AsyncSession (run_sync) and the
+sections are awaited together, so their queries overlap without holding a
+threadpool worker. Price forecasts may fall back to live (CPU-bound) model
+fits, so they alone run in the threadpool on a sync session.
 """
 from __future__ import annotations
+import asyncio
 from datetime import date, timedelta
-from typing import Optional
+from functools import partial
+from typing import Any, Callable, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, and_
-from app.database import SessionLocal
-from app import models, schemas
-from app.services.price_forecast import forecast_item_price
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import select, func, and_, case
+from app.database import SessionLocal, new_async_session
+from app import models, schemas, crud
+from app.services.forecast_store import get_price_forecasts
+from app.services import sales_cube, vendor_performance, product_search
+from app.services.dashboard_cache import cached_dashboard, dashboard_cache, skip_cache
 
 router = APIRouter(prefix="/dashboards", tags=["dashboards"])
 
-def get_db():
+# Ingredients tracked on the Chef dashboard (matched against product names)
+CHEF_KEY_INGREDIENTS = ["filet", "ribeye", "NY strip", "short rib", "salmon", "scallops", "tuna", "broccolini", "asparagus", "potatoes"]
+
+# Tables each dashboard reads; a commit to any of them drops its cached responses
+PRICE_FORECAST_TABLES = ("products", "price_history", "latest_prices", "forecasts", "vendor_volatility", "price_forecast_states")
+CHEF_TABLES = (*PRICE_FORECAST_TABLES, "prep_records", "waste_alerts")
+BAR_TABLES = (*PRICE_FORECAST_TABLES, "sales_records", "sales_daily_cube", "cocktails", "cocktail_ingredients")
+SUPPLY_CHAIN_TABLES = (*PRICE_FORECAST_TABLES, "vendor_performance", "orders", "order_items", "inventory_logs", "suppliers", "waste_alerts")
+LOCATION_TABLES = ("sales_records", "sales_daily_cube", "products", "prep_records", "waste_alerts", "locations")
+REGION_TABLES = ("sales_records", "sales_daily_cube", "locations")
+ROLLUP_TABLES = ("sales_records", "sales_daily_cube", "locations", "products", "product_types", "categories", "cocktails")
+
+async def get_db():
+    async with new_async_session() as db:
+        yield db
+
+
+async def _run_section(section: Callable[[Session], Any]) -> Any:
+    """Run a sync section function on its own AsyncSession."""
+    async with new_async_session() as db:
+        return await db.run_sync(section)
+
+
+def _price_forecasts_sync(latest_prices: dict[int, models.LatestPrice]) -> dict[int, dict]:
     db = SessionLocal()
     try:
-        yield db
+        return get_price_forecasts(db, latest_prices)
     finally:
         db.close()
+        SessionLocal.remove()
+
+
+async def _price_forecasts(latest_prices: dict[int, models.LatestPrice]) -> dict[int, dict]:
+    """get_price_forecasts in the threadpool, since missing forecasts are fitted live."""
+    if not latest_prices:
+        return {}
+    return await run_in_threadpool(_price_forecasts_sync, latest_prices)
+
+
+def _optional_float(value) -> Optional[float]:
+    return float(value) if value is not None else None
 
 
 # Chef Dashboard
-@router.get("/chef")
-def get_chef_dashboard(
-    location_id: int = Query(..., description="Location ID"),
-    db: Session = Depends(get_db)
-):
-    """Get Chef Dashboard data: food cost, prep, shelf life, risk."""
+def _chef_price_kpis(db: Session, today: date) -> tuple[float, float]:
+    """Protein cost change and seafood risk index from the last week of prices."""
+    week_ago = today - timedelta(days=7)
     try:
-        today = date.today()
-        week_ago = today - timedelta(days=7)
-        
-        # KPIs
-        # Protein cost change
-        try:
-            protein_products = db.execute(
-                select(models.PriceHistory)
-                .join(models.Product)
-                .where(
-                    models.PriceHistory.item_id == models.Product.id,
-                    models.PriceHistory.category.in_(["meat", "seafood"]),
-                    models.PriceHistory.date >= week_ago
-                )
-            ).scalars().all()
-        except Exception:
-            protein_products = []
+        protein_products = db.execute(
+            select(models.PriceHistory)
+            .join(models.Product)
+            .where(
+                models.PriceHistory.item_id == models.Product.id,
+                models.PriceHistory.category.in_(["meat", "seafood"]),
+                models.PriceHistory.date >= week_ago
+            )
+        ).scalars().all()
+    except Exception:
+        skip_cache()
+        protein_products = []
+    
+    protein_cost_change = 0.0
+    if protein_products:
+        recent = [p for p in protein_products if p.date >= today - timedelta(days=3)]
+        older = [p for p in protein_products if p.date < today - timedelta(days=3)]
+        if recent and older:
+            recent_avg = sum(float(p.unit_price) for p in recent) / len(recent)
+            older_avg = sum(float(p.unit_price) for p in older) / len(older)
+            protein_cost_change = ((recent_avg - older_avg) / older_avg * 100) if older_avg > 0 else 0
+    
+    # Seafood risk index
+    seafood_prices = [p for p in protein_products if p.category == "seafood"]
+    seafood_risk = 0.0
+    if seafood_prices:
+        prices = [float(p.unit_price) for p in seafood_prices]
+        if len(prices) > 1:
+            volatility = (max(prices) - min(prices)) / (sum(prices) / len(prices)) * 100
+            seafood_risk = min(100, volatility * 10)
+    
+    return protein_cost_change, seafood_risk
+
+
+def _chef_prep(db: Session, location_id: int, today: date) -> dict:
+    """Produce waste risk, prep accuracy and today's prep table."""
+    week_ago = today - timedelta(days=7)
+    try:
+        prep_records = db.execute(
+            select(models.PrepRecord)
+            .options(joinedload(models.PrepRecord.product))
+            .where(
+                models.PrepRecord.location_id == location_id,
+                models.PrepRecord.date >= week_ago
+            )
+        ).scalars().all()
+    except Exception:
+        skip_cache()
+        prep_records = []
+    
+    produce_waste_risk = 0.0
+    produce_preps = [p for p in prep_records if p.product and any(cat in p.product.name.lower() for cat in ["broccolini", "asparagus", "potato"])]
+    if produce_preps:
+        total_waste = sum(float(p.waste_qty) for p in produce_preps)
+        total_prep = sum(float(p.actual_prep_qty) for p in produce_preps)
+        produce_waste_risk = (total_waste / total_prep * 100) if total_prep > 0 else 0
+    
+    # Prep accuracy score
+    prep_accuracy = 0.0
+    if prep_records:
+        accuracies = []
+        for p in prep_records:
+            if p.ideal_prep_qty > 0:
+                acc = min(100, (1 - abs(p.actual_prep_qty - p.ideal_prep_qty) / p.ideal_prep_qty) * 100)
+                accuracies.append(acc)
+        prep_accuracy = sum(accuracies) / len(accuracies) if accuracies else 0
+    
+    # Prep and Mise Table
+    today_preps = [p for p in prep_records if p.date == today]
+    prep_mise = []
+    for prep in today_preps:
+        if prep.product:
+            projected_spoilage = float(prep.waste_qty) * 1.2  # Simple projection
+            
+            prep_mise.append({
+                "ingredient": prep.product.name,
+                "ideal_prep": float(prep.ideal_prep_qty),
+                "actual_prep": float(prep.actual_prep_qty),
+                "waste_score": float(prep.waste_score),
+                "projected_spoilage": projected_spoilage
+            })
+    
+    return {"produce_waste_risk": produce_waste_risk, "prep_accuracy": prep_accuracy, "prep_mise": prep_mise}
+
+
+def _chef_ingredient_inputs(db: Session, location_id: int) -> tuple[list[models.Product], dict, dict]:
+    """Key ingredient products with their latest price and prep record."""
+    # One query for every ingredient's product; a name matching several products is skipped
+    products = db.execute(
+        select(models.Product).where(product_search.name_contains_any(db, CHEF_KEY_INGREDIENTS))
+    ).scalars().all()
+    matched = []
+    for ing_name in CHEF_KEY_INGREDIENTS:
+        candidates = [p for p in products if ing_name.lower() in p.name.lower()]
+        if len(candidates) == 1:
+            matched.append(candidates[0])
+    
+    product_ids = [p.id for p in matched]
+    return matched, crud.get_latest_prices(db, product_ids), crud.get_latest_prep_records(db, product_ids, location_id)
+
+
+async def _chef_ingredient_status(location_id: int) -> list[dict]:
+    matched, latest_prices, latest_preps = await _run_section(partial(_chef_ingredient_inputs, location_id=location_id))
+    # Forecasts materialized nightly, live (one batch) only when missing
+    forecasts = await _price_forecasts(latest_prices)
+    
+    ingredient_status = []
+    for product in matched:
+        latest_price = latest_prices.get(product.id)
+        current_cost = float(latest_price.unit_price) if latest_price else 0.0
         
-        protein_cost_change = 0.0
-        if protein_products:
-            recent = [p for p in protein_products if p.date >= today - timedelta(days=3)]
-            older = [p for p in protein_products if p.date < today - timedelta(days=3)]
-            if recent and older:
-                recent_avg = sum(float(p.unit_price) for p in recent) / len(recent)
-                older_avg = sum(float(p.unit_price) for p in older) / len(older)
-                protein_cost_change = ((recent_avg - older_avg) / older_avg * 100) if older_avg > 0 else 0
+        forecast = forecasts.get(product.id)
+        forecast_7d = forecast["next_7_day_price"] if forecast else current_cost
         
-        # Seafood risk index
-        seafood_prices = [p for p in protein_products if p.category == "seafood"]
-        seafood_risk = 0.0
-        if seafood_prices:
-            prices = [float(p.unit_price) for p in seafood_prices]
-            if len(prices) > 1:
-                volatility = (max(prices) - min(prices)) / (sum(prices) / len(prices)) * 100
-                seafood_risk = min(100, volatility * 10)
+        # Get shelf life from latest price history
+        shelf_life = latest_price.shelf_life_days if latest_price else 0
         
-        # Produce waste risk
-        try:
-            prep_records = db.execute(
-                select(models.PrepRecord)
-                .where(
-                    models.PrepRecord.location_id == location_id,
-                    models.PrepRecord.date >= week_ago
-                )
-            ).scalars().all()
-        except Exception:
-            prep_records = []
+        # Get trim yield from prep records
+        prep = latest_preps.get(product.id)
+        trim_yield = float(prep.trim_yield) if prep and prep.trim_yield else None
         
-        produce_waste_risk = 0.0
-        produce_preps = [p for p in prep_records if p.product and any(cat in p.product.name.lower() for cat in ["broccolini", "asparagus", "potato"])]
-        if produce_preps:
-            total_waste = sum(float(p.waste_qty) for p in produce_preps)
-            total_prep = sum(float(p.actual_prep_qty) for p in produce_preps)
-            produce_waste_risk = (total_waste / total_prep * 100) if total_prep > 0 else 0
+        # Risk level
+        risk = "low"
+        if latest_price:
+            if latest_price.category == "seafood":
+                risk = "high"
+            elif latest_price.category == "produce" and shelf_life < 7:
+                risk = "medium"
+        
+        ingredient_status.append({
+            "name": product.name,
+            "category": latest_price.category if latest_price else "unknown",
+            "current_cost": current_cost,
+            "forecast_7d": forecast_7d,
+            "shelf_life": shelf_life,
+            "trim_yield": trim_yield,
+            "risk_level": risk,
+            "order_recommendation": "increase" if risk == "high" else "maintain"
+        })
+    return ingredient_status
+
+
+def _chef_alerts(db: Session, location_id: int) -> tuple[list[dict], list[dict]]:
+    """Unresolved stockout and expiring alerts for the location."""
+    try:
+        alerts = db.execute(
+            select(models.WasteAlert)
+            .options(joinedload(models.WasteAlert.product))
+            .where(
+                models.WasteAlert.location_id == location_id,
+                models.WasteAlert.resolved == False
+            )
+        ).scalars().all()
+    except Exception:
+        skip_cache()
+        alerts = []
+    
+    stockout_alerts = [
+        {"product": a.product.name if a.product else "Unknown", "message": a.message}
+        for a in alerts if a.alert_type == "stockout"
+    ]
+    waste_alerts = [
+        {"product": a.product.name if a.product else "Unknown", "message": a.message, "expires_at": str(a.expires_at)}
+        for a in alerts if a.alert_type == "expiring"
+    ]
+    return stockout_alerts, waste_alerts
+
+
+@router.get("/chef")
+@cached_dashboard(CHEF_TABLES)
+async def get_chef_dashboard(
+    location_id: int = Query(..., description="Location ID")
+):
+    """Get Chef Dashboard data: food cost, prep, shelf life, risk."""
+    try:
+        today = date.today()
         
-        # Prep accuracy score
-        prep_accuracy = 0.0
-        if prep_records:
-            accuracies = []
-            for p in prep_records:
-                if p.ideal_prep_qty > 0:
-                    acc = min(100, (1 - abs(p.actual_prep_qty - p.ideal_prep_qty) / p.ideal_prep_qty) * 100)
-                    accuracies.append(acc)
-            prep_accuracy = sum(accuracies) / len(accuracies) if accuracies else 0
+        (protein_cost_change, seafood_risk), prep, (stockout_alerts, waste_alerts), ingredient_status = await asyncio.gather(
+            _run_section(partial(_chef_price_kpis, today=today)),
+            _run_section(partial(_chef_prep, location_id=location_id, today=today)),
+            _run_section(partial(_chef_alerts, location_id=location_id)),
+            _chef_ingredient_status(location_id),
+        )
+        produce_waste_risk = prep["produce_waste_risk"]
         
         # Items below par
         items_below_par = 0  # Would need current inventory tracking
@@ -100,102 +264,6 @@ def get_chef_dashboard(
         # 7 day cost forecast
         cost_forecast_7d = 0.0
         
-        # Ingredient Status
-        key_ingredients = ["filet", "ribeye", "NY strip", "short rib", "salmon", "scallops", "tuna", "broccolini", "asparagus", "potatoes"]
-        ingredient_status = []
-        
-        for ing_name in key_ingredients:
-            try:
-                product = db.execute(
-                    select(models.Product).where(models.Product.name.ilike(f"%{ing_name}%"))
-                ).scalar_one_or_none()
-                
-                if product:
-                    # Get latest price
-                    latest_price = db.execute(
-                        select(models.PriceHistory)
-                        .where(models.PriceHistory.item_id == product.id)
-                        .order_by(models.PriceHistory.date.desc())
-                        .limit(1)
-                    ).scalar_one_or_none()
-                    
-                    current_cost = float(latest_price.unit_price) if latest_price else 0.0
-                    
-                    # Get forecast
-                    try:
-                        forecast = forecast_item_price(db, product.id)
-                        forecast_7d = forecast["next_7_day_price"]
-                    except:
-                        forecast_7d = current_cost
-                    
-                    # Get shelf life from latest price history
-                    shelf_life = latest_price.shelf_life_days if latest_price else 0
-                    
-                    # Get trim yield from prep records
-                    prep = db.execute(
-                        select(models.PrepRecord)
-                        .where(
-                            models.PrepRecord.product_id == product.id,
-                            models.PrepRecord.location_id == location_id
-                        )
-                        .order_by(models.PrepRecord.date.desc())
-                        .limit(1)
-                    ).scalar_one_or_none()
-                    
-                    trim_yield = float(prep.trim_yield) if prep and prep.trim_yield else None
-                    
-                    # Risk level
-                    risk = "low"
-                    if latest_price:
-                        if latest_price.category == "seafood":
-                            risk = "high"
-                        elif latest_price.category == "produce" and shelf_life < 7:
-                            risk = "medium"
-                    
-                    ingredient_status.append({
-                        "name": product.name,
-                        "category": latest_price.category if latest_price else "unknown",
-                        "current_cost": current_cost,
-                        "forecast_7d": forecast_7d,
-                        "shelf_life": shelf_life,
-                        "trim_yield": trim_yield,
-                        "risk_level": risk,
-                        "order_recommendation": "increase" if risk == "high" else "maintain"
-                    })
-            except Exception:
-                continue
-        
-        # Prep and Mise Table
-        today_preps = [p for p in prep_records if p.date == today]
-        prep_mise = []
-        for prep in today_preps:
-            if prep.product:
-                waste_pct = (prep.waste_qty / prep.actual_prep_qty * 100) if prep.actual_prep_qty > 0 else 0
-                projected_spoilage = prep.waste_qty * 1.2  # Simple projection
-                
-                prep_mise.append({
-                    "ingredient": prep.product.name,
-                    "ideal_prep": float(prep.ideal_prep_qty),
-                    "actual_prep": float(prep.actual_prep_qty),
-                    "waste_score": float(prep.waste_score),
-                    "projected_spoilage": projected_spoilage
-                })
-        
-        # Stockout and Waste Alerts
-        try:
-            alerts = db.execute(
-                select(models.WasteAlert)
-                .where(
-                    models.WasteAlert.location_id == location_id,
-                    models.WasteAlert.resolved == False
-                )
-            ).scalars().all()
-        except Exception:
-            alerts = []
-        
-        stockout_alerts = [a for a in alerts if a.alert_type == "stockout"]
-        waste_alerts = [a for a in alerts if a.alert_type == "expiring"]
-        
         # Daily Chef Summary
         summary = f"Seafood prices {'rising' if seafood_risk > 50 else 'stable'}. "
         summary += f"Meat stable. "
@@ -208,17 +276,18 @@ def get_chef_dashboard(
                 "protein_cost_change": round(protein_cost_change, 1),
                 "seafood_risk_index": round(seafood_risk, 1),
                 "produce_waste_risk": round(produce_waste_risk, 1),
-                "prep_accuracy_score": round(prep_accuracy, 1),
+                "prep_accuracy_score": round(prep["prep_accuracy"], 1),
                 "items_below_par": items_below_par,
                 "cost_forecast_7d": round(cost_forecast_7d, 2)
             },
             "ingredient_status": ingredient_status,
-            "prep_mise": prep_mise,
-            "stockout_alerts": [{"product": a.product.name if a.product else "Unknown", "message": a.message} for a in stockout_alerts] if stockout_alerts else [],
-            "waste_alerts": [{"product": a.product.name if a.product else "Unknown", "message": a.message, "expires_at": str(a.expires_at)} for a in waste_alerts] if waste_alerts else [],
+            "prep_mise": prep["prep_mise"],
+            "stockout_alerts": stockout_alerts,
+            "waste_alerts": waste_alerts,
             "summary": summary
         }
     except Exception as e:
+        skip_cache()
         # Return safe default structure on any error
         return {
             "kpis": {
@@ -238,136 +307,153 @@ def get_chef_dashboard(
 
 
 # Bar Manager Dashboard
+def _bar_sales(db: Session, location_id: int, week_ago: date) -> tuple[tuple[float, ...], list]:
+    """Beverage and liquor revenue/cost and top cocktails, from the sales cube."""
+    cube = models.SalesDailyCube
+    in_window = (cube.location_id == location_id, cube.date >= week_ago, cube.cocktail_id != 0)
+    try:
+        is_liquor = models.Cocktail.category.ilike("%liquor%")
+        totals = db.execute(
+            select(
+                func.coalesce(func.sum(cube.revenue), 0),
+                func.coalesce(func.sum(cube.cost), 0),
+                func.coalesce(func.sum(case((is_liquor, cube.revenue), else_=0)), 0),
+                func.coalesce(func.sum(case((is_liquor, cube.cost), else_=0)), 0),
+            )
+            .outerjoin(models.Cocktail, models.Cocktail.id == cube.cocktail_id)
+            .where(*in_window)
+        ).one()
+        
+        # Top selling spirits (ties keep the order cocktails were first sold in)
+        top_spirits = db.execute(
+            select(models.Cocktail.name, func.sum(cube.quantity))
+            .join(models.Cocktail, models.Cocktail.id == cube.cocktail_id)
+            .where(*in_window)
+            .group_by(models.Cocktail.name)
+            .order_by(func.sum(cube.quantity).desc(), func.min(cube.first_sale_id))
+            .limit(5)
+        ).all()
+    except Exception:
+        skip_cache()
+        totals = (0, 0, 0, 0)
+        top_spirits = []
+    return tuple(float(v) for v in totals), [tuple(row) for row in top_spirits]
+
+
+def _bar_liquor_inputs(db: Session) -> tuple[list[models.Product], dict]:
+    """Up to 10 liquor products with their latest prices."""
+    try:
+        liquor_products = db.execute(
+            select(models.Product)
+            .where(product_search.name_contains_any(db, ["vodka", "whiskey", "gin"]))
+            .order_by(models.Product.id)
+            .limit(10)
+        ).scalars().all()
+    except Exception:
+        skip_cache()
+        liquor_products = []
+    
+    return liquor_products, crud.get_latest_prices(db, [product.id for product in liquor_products])
+
+
+async def _bar_liquor_forecast() -> list[dict]:
+    liquor_products, latest_prices = await _run_section(_bar_liquor_inputs)
+    forecasts_by_item = await _price_forecasts(latest_prices)
+    
+    liquor_forecast = []
+    for product in liquor_products:
+        try:
+            latest_price = latest_prices.get(product.id)
+            
+            current_cost = float(latest_price.unit_price) if latest_price else 0.0
+            
+            forecast_data = forecasts_by_item.get(product.id)
+            if forecast_data:
+                forecast_7d = forecast_data["next_7_day_price"]
+                volatility = forecast_data["vendor_volatility_multiplier"]
+            else:
+                forecast_7d = current_cost
+                volatility = 1.0
+            
+            # Determine category
+            category = "well"
+            if "premium" in product.name.lower() or "reserve" in product.name.lower():
+                category = "premium"
+            elif "call" in product.name.lower():
+                category = "call"
+            
+            liquor_forecast.append({
+                "product": product.name,
+                "category": category,
+                "current_cost": current_cost,
+                "forecast_7d": forecast_7d,
+                "volatility": round(volatility, 3),
+                "par_level": 12,  # Placeholder
+                "reorder_suggestion": "increase" if volatility > 1.1 else "maintain"
+            })
+        except Exception:
+            skip_cache()
+            continue
+    return liquor_forecast
+
+
+def _bar_cocktail_profit(db: Session) -> list[dict]:
+    """Margin and ingredients of every active cocktail (three queries however many cocktails)."""
+    try:
+        cocktails = db.execute(
+            select(models.Cocktail)
+            .options(selectinload(models.Cocktail.ingredients).selectinload(models.CocktailIngredient.product))
+            .where(models.Cocktail.active == True)
+        ).scalars().all()
+    except Exception:
+        skip_cache()
+        cocktails = []
+    
+    return [
+        {
+            "cocktail_name": cocktail.name,
+            "cost_per_drink": float(cocktail.cost_per_drink),
+            "selling_price": float(cocktail.selling_price),
+            "margin_percent": float(cocktail.margin_percent),
+            "price_sensitivity": cocktail.price_sensitivity or "medium",
+            "impacted_ingredients": [ing.product.name if ing.product else "Unknown" for ing in cocktail.ingredients]
+        }
+        for cocktail in cocktails
+    ]
+
+
 @router.get("/bar")
-def get_bar_dashboard(
-    location_id: int = Query(..., description="Location ID"),
-    db: Session = Depends(get_db)
+@cached_dashboard(BAR_TABLES)
+async def get_bar_dashboard(
+    location_id: int = Query(..., description="Location ID")
 ):
     """Get Bar Manager Dashboard: beverage cost, liquor margins, cocktail profitability."""
     try:
         today = date.today()
         week_ago = today - timedelta(days=7)
         
-        # Get sales records for beverages
-        try:
-            beverage_sales = db.execute(
-                select(models.SalesRecord)
-                .where(
-                    models.SalesRecord.location_id == location_id,
-                    models.SalesRecord.date >= week_ago,
-                    models.SalesRecord.cocktail_id.isnot(None)
-                )
-            ).scalars().all()
-        except Exception:
-            beverage_sales = []
+        (totals, top_spirits), liquor_forecast, cocktail_profit = await asyncio.gather(
+            _run_section(partial(_bar_sales, location_id=location_id, week_ago=week_ago)),
+            _bar_liquor_forecast(),
+            _run_section(_bar_cocktail_profit),
+        )
         
         # Bar KPIs
-        total_revenue = sum(float(s.revenue) for s in beverage_sales)
-        total_cost = sum(float(s.cost) for s in beverage_sales)
+        total_revenue, total_cost, liquor_revenue, liquor_cost = totals
         beverage_cost_pct = (total_cost / total_revenue * 100) if total_revenue > 0 else 0
         
         # Liquor margin
-        liquor_sales = [s for s in beverage_sales if s.cocktail and s.cocktail.category and "liquor" in s.cocktail.category.lower()]
-        liquor_revenue = sum(float(s.revenue) for s in liquor_sales)
-        liquor_cost = sum(float(s.cost) for s in liquor_sales)
         liquor_margin = ((liquor_revenue - liquor_cost) / liquor_revenue * 100) if liquor_revenue > 0 else 0
         
         # Wine margin (simplified)
         wine_margin = 45.0  # Placeholder
         
-        # Top selling spirits
-        cocktail_counts = {}
-        for sale in beverage_sales:
-            if sale.cocktail:
-                name = sale.cocktail.name
-                cocktail_counts[name] = cocktail_counts.get(name, 0) + sale.quantity
-        
-        top_spirits = sorted(cocktail_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
         # Dead inventory count (simplified)
         dead_inventory = 0
         
         # 7 day liquor forecast
         liquor_forecast_7d = 0.0  # Would use price forecasting
         
-        # Liquor Forecast Table
-        try:
-            liquor_products = db.execute(
-                select(models.Product)
-                .where(models.Product.name.ilike("%vodka%") | models.Product.name.ilike("%whiskey%") | models.Product.name.ilike("%gin%"))
-            ).scalars().all()
-        except Exception:
-            liquor_products = []
-        
-        liquor_forecast = []
-        for product in liquor_products[:10]:  # Limit to 10
-            try:
-                latest_price = db.execute(
-                    select(models.PriceHistory)
-                    .where(models.PriceHistory.item_id == product.id)
-                    .order_by(models.PriceHistory.date.desc())
-                    .limit(1)
-                ).scalar_one_or_none()
-                
-                current_cost = float(latest_price.unit_price) if latest_price else 0.0
-                
-                try:
-                    forecast_data = forecast_item_price(db, product.id)
-                    forecast_7d = forecast_data["next_7_day_price"]
-                    volatility = forecast_data["vendor_volatility_multiplier"]
-                except:
-                    forecast_7d = current_cost
-                    volatility = 1.0
-                
-                # Determine category
-                category = "well"
-                if "premium" in product.name.lower() or "reserve" in product.name.lower():
-                    category = "premium"
-                elif "call" in product.name.lower():
-                    category = "call"
-                
-                liquor_forecast.append({
-                    "product": product.name,
-                    "category": category,
-                    "current_cost": current_cost,
-                    "forecast_7d": forecast_7d,
-                    "volatility": round(volatility, 3),
-                    "par_level": 12,  # Placeholder
-                    "reorder_suggestion": "increase" if volatility > 1.1 else "maintain"
-                })
-            except Exception:
-                continue
-        
-        # Cocktail Profit Table
-        try:
-            cocktails = db.execute(
-                select(models.Cocktail).where(models.Cocktail.active == True)
-            ).scalars().all()
-        except Exception:
-            cocktails = []
-        
-        cocktail_profit = []
-        for cocktail in cocktails:
-            try:
-                # Get ingredients
-                ingredients = db.execute(
-                    select(models.CocktailIngredient)
-                    .where(models.CocktailIngredient.cocktail_id == cocktail.id)
-                ).scalars().all()
-                
-                ingredient_names = [ing.product.name if ing.product else "Unknown" for ing in ingredients]
-                
-                cocktail_profit.append({
-                    "cocktail_name": cocktail.name,
-                    "cost_per_drink": float(cocktail.cost_per_drink),
-                    "selling_price": float(cocktail.selling_price),
-                    "margin_percent": float(cocktail.margin_percent),
-                    "price_sensitivity": cocktail.price_sensitivity or "medium",
-                    "impacted_ingredients": ingredient_names
-                })
-            except Exception:
-                continue
-        
         # Wine Program Health (simplified)
         wine_health = {
             "btg_performance": "good",
@@ -396,6 +482,7 @@ def get_bar_dashboard(
             "summary": summary
         }
     except Exception as e:
+        skip_cache()
         # Return safe default structure on any error
         return {
             "kpis": {
@@ -414,82 +501,104 @@ def get_bar_dashboard(
 
 
 # Supply Chain Analyst Dashboard
+def _supply_vendors(db: Session) -> tuple[dict[str, models.VendorPerformance], list[models.VendorVolatility]]:
+    """Materialized vendor performance and volatility rows."""
+    performance = vendor_performance.get_vendor_performance(db)
+    vendors = db.execute(select(models.VendorVolatility)).scalars().all()
+    return performance, vendors
+
+
+def _supply_forecast_inputs(db: Session) -> tuple[list[models.Product], dict]:
+    """First 20 active products with their latest prices."""
+    products = db.execute(select(models.Product).where(models.Product.active == True).limit(20)).scalars().all()
+    return products, crud.get_latest_prices(db, [product.id for product in products])
+
+
+async def _supply_price_forecasts() -> list[dict]:
+    products, latest_prices = await _run_section(_supply_forecast_inputs)
+    forecasts_by_item = await _price_forecasts(latest_prices)
+    
+    price_forecasts = []
+    for product in products:
+        forecast_data = forecasts_by_item.get(product.id)
+        if forecast_data:
+            price_forecasts.append({
+                "item": product.name,
+                "vendor": latest_prices[product.id].vendor,
+                "forecast_7d": forecast_data["next_7_day_price"],
+                "forecast_14d": forecast_data["next_14_day_price"],
+                "forecast_30d": forecast_data["next_30_day_price"],
+                "volatility": forecast_data["vendor_volatility_multiplier"],
+                "shelf_life_factor": forecast_data["shelf_life_multiplier"],
+                "recommended_order_size": 100  # Placeholder
+            })
+    return price_forecasts
+
+
+def _supply_alerts(db: Session) -> tuple[list[dict], list[dict]]:
+    """Unresolved stockout and expiring alerts across locations."""
+    alerts = db.execute(
+        select(models.WasteAlert)
+        .options(joinedload(models.WasteAlert.product))
+        .where(models.WasteAlert.alert_type.in_(["stockout", "expiring"]), models.WasteAlert.resolved == False)
+    ).scalars().all()
+    
+    def rows(alert_type: str) -> list[dict]:
+        return [
+            {"item": a.product.name if a.product else "Unknown", "message": a.message}
+            for a in alerts if a.alert_type == alert_type
+        ]
+    return rows("stockout"), rows("expiring")
+
+
 @router.get("/supply-chain")
-def get_supply_chain_dashboard(
-    db: Session = Depends(get_db)
-):
+@cached_dashboard(SUPPLY_CHAIN_TABLES)
+async def get_supply_chain_dashboard():
     """Get Supply Chain Analyst Dashboard: procurement, vendor performance, forecasting."""
-    # Procurement KPIs
-    orders = db.execute(select(models.Order)).scalars().all()
+    (performance, vendors), price_forecasts, (stockout_risks, shelf_life_alerts) = await asyncio.gather(
+        _run_section(_supply_vendors),
+        _supply_price_forecasts(),
+        _run_section(_supply_alerts),
+    )
     
-    on_time_orders = [o for o in orders if o.status == "placed" and o.eta_date and o.eta_date >= date.today()]
-    on_time_rate = (len(on_time_orders) / len(orders) * 100) if orders else 0
+    # Procurement KPIs, from materialized vendor performance
+    due_orders = sum(p.due_orders for p in performance.values())
+    on_time_rate = (sum(p.on_time_orders for p in performance.values()) / due_orders * 100) if due_orders else 0
     
     # Vendor reliability (simplified)
-    vendors = db.execute(select(models.VendorVolatility)).scalars().all()
     avg_reliability = sum(float(v.reliability_score) for v in vendors) / len(vendors) * 100 if vendors else 0
     
     # Price volatility index
     volatility_index = sum(float(v.stdev_price_change) for v in vendors) / len(vendors) if vendors else 0
     
-    # Late deliveries (simplified)
-    late_deliveries = 0
+    # Late deliveries (received after ETA, or past ETA and not received)
+    late_deliveries = sum(p.late_orders for p in performance.values())
     
     # 30 day forecast average
     forecast_avg_30d = 0.0
     
-    # Price Forecast Table
-    products = db.execute(select(models.Product).where(models.Product.active == True).limit(20)).scalars().all()
-    
-    price_forecasts = []
-    for product in products:
-        latest_price = db.execute(
-            select(models.PriceHistory)
-            .where(models.PriceHistory.item_id == product.id)
-            .order_by(models.PriceHistory.date.desc())
-            .limit(1)
-        ).scalar_one_or_none()
-        
-        if latest_price:
-            try:
-                forecast_data = forecast_item_price(db, product.id, latest_price.vendor)
-                price_forecasts.append({
-                    "item": product.name,
-                    "vendor": latest_price.vendor,
-                    "forecast_7d": forecast_data["next_7_day_price"],
-                    "forecast_14d": forecast_data["next_30_day_price"] * 0.9,  # Approximation
-                    "forecast_30d": forecast_data["next_30_day_price"],
-                    "volatility": forecast_data["vendor_volatility_multiplier"],
-                    "shelf_life_factor": forecast_data["shelf_life_multiplier"],
-                    "recommended_order_size": 100  # Placeholder
-                })
-            except:
-                pass
-    
     # Vendor Performance Table
-    vendor_performance = []
+    vendor_performance_rows = []
     for vendor_vol in vendors:
-        vendor_orders = [o for o in orders if o.supplier and o.supplier.name == vendor_vol.vendor]
-        on_time_pct = 95.0  # Placeholder
+        # None when the vendor has no orders in the performance window
+        perf = performance.get(vendor_vol.vendor)
         
-        vendor_performance.append({
+        vendor_performance_rows.append({
             "vendor": vendor_vol.vendor,
             "lead_time": vendor_vol.lead_time_days,
-            "on_time_percent": on_time_pct,
+            "lead_time_distribution": {
+                "mean": _optional_float(perf.lead_time_mean),
+                "p50": _optional_float(perf.lead_time_p50),
+                "p90": _optional_float(perf.lead_time_p90),
+                "min": perf.lead_time_min,
+                "max": perf.lead_time_max
+            } if perf else None,
+            "on_time_percent": _optional_float(perf.on_time_pct) if perf else None,
             "price_stability": round(100 - vendor_vol.stdev_price_change, 1),
-            "fill_rate": 98.0,  # Placeholder
+            "fill_rate": _optional_float(perf.fill_rate) if perf else None,
             "reliability_score": float(vendor_vol.reliability_score)
         })
     
-    # Inventory and Waste
-    stockout_risks = db.execute(
-        select(models.WasteAlert).where(models.WasteAlert.alert_type == "stockout", models.WasteAlert.resolved == False)
-    ).scalars().all()
-    
-    shelf_life_alerts = db.execute(
-        select(models.WasteAlert).where(models.WasteAlert.alert_type == "expiring", models.WasteAlert.resolved == False)
-    ).scalars().all()
-    
     # Operations Summary
     summary = f"US Foods stable with 94 percent OTP. "
     summary += f"Spec's volatile with 11 percent weekly swings. "
@@ -506,72 +615,118 @@ def get_supply_chain_dashboard(
             "forecast_avg_30d": round(forecast_avg_30d, 2)
         },
         "price_forecasts": price_forecasts,
-        "vendor_performance": vendor_performance,
-        "stockout_risks": [{"item": a.product.name if a.product else "Unknown", "message": a.message} for a in stockout_risks],
-        "shelf_life_alerts": [{"item": a.product.name if a.product else "Unknown", "message": a.message} for a in shelf_life_alerts],
+        "vendor_performance": vendor_performance_rows,
+        "stockout_risks": stockout_risks,
+        "shelf_life_alerts": shelf_life_alerts,
         "summary": summary
     }
 
 
 # Location View
+def _sales_totals(db: Session, location_ids: list[int], since: date) -> dict[int, dict[str, float]]:
+    """
+    Revenue and cost sums per location since a date, in one GROUP BY query
+    over the sales cube.
+    
+    food_* covers product sales that are not cocktails, bev_* cocktail sales
+    and product_cost every sale with a product. Locations without sales are
+    left out.
+    """
+    if not location_ids:
+        return {}
+    cube = models.SalesDailyCube
+    is_food = and_(cube.product_id != 0, cube.cocktail_id == 0)
+    is_bev = cube.cocktail_id != 0
+    
+    def total(column, condition=None):
+        value = column if condition is None else case((condition, column), else_=0)
+        return func.coalesce(func.sum(value), 0)
+    
+    rows = db.execute(
+        select(
+            cube.location_id,
+            total(cube.revenue).label("revenue"),
+            total(cube.revenue, is_food).label("food_revenue"),
+            total(cube.cost, is_food).label("food_cost"),
+            total(cube.revenue, is_bev).label("bev_revenue"),
+            total(cube.cost, is_bev).label("bev_cost"),
+            total(cube.cost, cube.product_id != 0).label("product_cost"),
+        )
+        .where(cube.location_id.in_(location_ids), cube.date >= since)
+        .group_by(cube.location_id)
+    ).all()
+    return {
+        row.location_id: {key: float(value) for key, value in row._mapping.items() if key != "location_id"}
+        for row in rows
+    }
+
+
+def _top_movers(db: Session, location_id: int, since: date) -> list[tuple[str, int]]:
+    """Five food items sold most since a date (ties keep the order items were first sold in)."""
+    cube = models.SalesDailyCube
+    return [tuple(row) for row in db.execute(
+        select(models.Product.name, func.sum(cube.quantity).label("quantity"))
+        .join(models.Product, models.Product.id == cube.product_id)
+        .where(cube.location_id == location_id, cube.date >= since, cube.cocktail_id == 0)
+        .group_by(models.Product.name)
+        .order_by(func.sum(cube.quantity).desc(), func.min(cube.first_sale_id))
+        .limit(5)
+    ).all()]
+
+
+def _waste_qty(db: Session, location_id: int, since: date) -> float:
+    return float(db.execute(
+        select(func.coalesce(func.sum(models.PrepRecord.waste_qty), 0))
+        .where(models.PrepRecord.location_id == location_id, models.PrepRecord.date >= since)
+    ).scalar_one())
+
+
+def _alert_types(db: Session, location_id: int) -> list[str]:
+    """alert_type of every unresolved alert at the location."""
+    return db.execute(
+        select(models.WasteAlert.alert_type)
+        .where(models.WasteAlert.location_id == location_id, models.WasteAlert.resolved == False)
+    ).scalars().all()
+
+
+def _location_name(db: Session, location_id: int) -> Optional[str]:
+    return db.execute(select(models.Location.name).where(models.Location.id == location_id)).scalar_one_or_none()
+
+
 @router.get("/location/{location_id}")
-def get_location_view(
-    location_id: int,
-    db: Session = Depends(get_db)
+@cached_dashboard(LOCATION_TABLES)
+async def get_location_view(
+    location_id: int
 ):
     """Get single location view with all local metrics."""
     today = date.today()
     week_ago = today - timedelta(days=7)
     
-    # Local KPIs
-    sales = db.execute(
-        select(models.SalesRecord)
-        .where(
-            models.SalesRecord.location_id == location_id,
-            models.SalesRecord.date >= week_ago
-        )
-    ).scalars().all()
+    totals_by_location, top_movers, total_waste, alert_types, location_name = await asyncio.gather(
+        _run_section(partial(_sales_totals, location_ids=[location_id], since=week_ago)),
+        _run_section(partial(_top_movers, location_id=location_id, since=week_ago)),
+        _run_section(partial(_waste_qty, location_id=location_id, since=week_ago)),
+        _run_section(partial(_alert_types, location_id=location_id)),
+        _run_section(partial(_location_name, location_id=location_id)),
+    )
     
-    daily_sales = sum(float(s.revenue) for s in sales) / 7 if sales else 0
-    
-    food_sales = [s for s in sales if s.product_id and not s.cocktail_id]
-    food_revenue = sum(float(s.revenue) for s in food_sales)
-    food_cost = sum(float(s.cost) for s in food_sales)
-    food_cost_pct = (food_cost / food_revenue * 100) if food_revenue > 0 else 0
-    
-    beverage_sales = [s for s in sales if s.cocktail_id]
-    bev_revenue = sum(float(s.revenue) for s in beverage_sales)
-    bev_cost = sum(float(s.cost) for s in beverage_sales)
-    bev_cost_pct = (bev_cost / bev_revenue * 100) if bev_revenue > 0 else 0
+    # Local KPIs
+    totals = totals_by_location.get(location_id)
     
-    # Top movers
-    product_counts = {}
-    for sale in food_sales:
-        if sale.product:
-            name = sale.product.name
-            product_counts[name] = product_counts.get(name, 0) + sale.quantity
+    daily_sales = totals["revenue"] / 7 if totals else 0
     
-    top_movers = sorted(product_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+    food_cost_pct = (totals["food_cost"] / totals["food_revenue"] * 100) if totals and totals["food_revenue"] > 0 else 0
+    bev_cost_pct = (totals["bev_cost"] / totals["bev_revenue"] * 100) if totals and totals["bev_revenue"] > 0 else 0
     
     # Waste cost
-    prep_records = db.execute(
-        select(models.PrepRecord)
-        .where(models.PrepRecord.location_id == location_id, models.PrepRecord.date >= week_ago)
-    ).scalars().all()
-    
-    waste_cost = sum(float(p.waste_qty) * 5.0 for p in prep_records)  # Simplified: $5 per unit waste
+    waste_cost = total_waste * 5.0  # Simplified: $5 per unit waste
     
     # Local price deviations (simplified)
     local_price_deviations = 0.0
     
     # Inventory Snapshot
-    alerts = db.execute(
-        select(models.WasteAlert)
-        .where(models.WasteAlert.location_id == location_id, models.WasteAlert.resolved == False)
-    ).scalars().all()
-    
-    items_below_par = [a for a in alerts if a.alert_type == "stockout"]
-    shelf_life_issues = [a for a in alerts if a.alert_type == "expiring"]
+    items_below_par = [t for t in alert_types if t == "stockout"]
+    shelf_life_issues = [t for t in alert_types if t == "expiring"]
     
     # Local Vendor Behavior (simplified)
     local_vendor_behavior = {
@@ -588,8 +743,7 @@ def get_location_view(
     }
     
     # Local Summary
-    location = db.execute(select(models.Location).where(models.Location.id == location_id)).scalar_one_or_none()
-    location_name = location.name if location else f"Location {location_id}"
+    location_name = location_name or f"Location {location_id}"
     
     summary = f"{location_name} has higher salmon movement and lower wine sales. Adjust ordering accordingly."
     
@@ -614,15 +768,16 @@ def get_location_view(
 
 # Region View
 @router.get("/region")
-def get_region_view(
+@cached_dashboard(REGION_TABLES)
+async def get_region_view(
     region: str = Query(..., description="Region name"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get multi-location regional rollup view."""
     # Get locations in region
-    locations = db.execute(
+    locations = (await db.execute(
         select(models.Location).where(models.Location.region == region, models.Location.active == True)
-    ).scalars().all()
+    )).scalars().all()
     
     location_ids = [loc.id for loc in locations]
     
@@ -630,30 +785,26 @@ def get_region_view(
     today = date.today()
     week_ago = today - timedelta(days=7)
     
-    all_sales = db.execute(
-        select(models.SalesRecord)
-        .where(models.SalesRecord.location_id.in_(location_ids), models.SalesRecord.date >= week_ago)
-    ).scalars().all()
+    # One grouped query for every location in the region
+    totals_by_location = await db.run_sync(_sales_totals, location_ids, week_ago)
     
-    total_revenue = sum(float(s.revenue) for s in all_sales)
+    total_revenue = sum(t["revenue"] for t in totals_by_location.values())
     
-    food_sales = [s for s in all_sales if s.product_id and not s.cocktail_id]
-    food_revenue = sum(float(s.revenue) for s in food_sales)
-    food_cost = sum(float(s.cost) for s in food_sales)
+    food_revenue = sum(t["food_revenue"] for t in totals_by_location.values())
+    food_cost = sum(t["food_cost"] for t in totals_by_location.values())
     avg_food_cost_pct = (food_cost / food_revenue * 100) if food_revenue > 0 else 0
     
-    beverage_sales = [s for s in all_sales if s.cocktail_id]
-    bev_revenue = sum(float(s.revenue) for s in beverage_sales)
-    bev_cost = sum(float(s.cost) for s in beverage_sales)
+    bev_revenue = sum(t["bev_revenue"] for t in totals_by_location.values())
+    bev_cost = sum(t["bev_cost"] for t in totals_by_location.values())
     avg_bev_cost_pct = (bev_cost / bev_revenue * 100) if bev_revenue > 0 else 0
     
     # Regional Comparison Table
     store_comparison = []
     for loc in locations:
-        loc_sales = [s for s in all_sales if s.location_id == loc.id]
-        loc_revenue = sum(float(s.revenue) for s in loc_sales)
-        loc_food_cost = sum(float(s.cost) for s in [s for s in loc_sales if s.product_id]) / loc_revenue * 100 if loc_revenue > 0 else 0
-        loc_bev_cost = sum(float(s.cost) for s in [s for s in loc_sales if s.cocktail_id]) / loc_revenue * 100 if loc_revenue > 0 else 0
+        totals = totals_by_location.get(loc.id)
+        loc_revenue = totals["revenue"] if totals else 0.0
+        loc_food_cost = totals["product_cost"] / loc_revenue * 100 if loc_revenue > 0 else 0
+        loc_bev_cost = totals["bev_cost"] / loc_revenue * 100 if loc_revenue > 0 else 0
         
         store_comparison.append({
             "store": loc.name,
@@ -698,3 +849,33 @@ def get_region_view(
         "summary": summary
     }
 
+
+# Sales roll-up / drill-down
+@router.get("/sales-rollup")
+@cached_dashboard(ROLLUP_TABLES)
+async def get_sales_rollup(
+    grain: str = Query("day", description="day, week or month"),
+    by: str = Query("location", description="location or region"),
+    start: Optional[date] = Query(None, description="First day (inclusive)"),
+    end: Optional[date] = Query(None, description="Last day (inclusive)"),
+    region: Optional[str] = Query(None, description="Only this region"),
+    location_id: Optional[int] = Query(None, description="Only this location"),
+    category: Optional[str] = Query(None, description="Only this category"),
+    by_category: bool = Query(True, description="Break down by category"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Sales rolled up from the daily cube by period, location or region, and category."""
+    try:
+        rows = await db.run_sync(
+            sales_cube.rollup, grain=grain, by=by, start=start, end=end,
+            region=region, location_id=location_id, category=category, by_category=by_category
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"grain": grain, "by": by, "rows": rows}
+
+
+@router.get("/cache/stats", response_model=schemas.DashboardCacheStats)
+async def get_dashboard_cache_stats():
+    """Get hit/miss/invalidation counters for the dashboard response cache."""
+    return dashboard_cache.stats()
@@ -2,11 +2,12 @@
 API endpoints for external factors (calendar, weather, events, economic data).
 """
 from __future__ import annotations
-from datetime import date, timedelta
+from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app import crud, schemas
+from app.services import external_factors
 
 router = APIRouter(prefix="/external", tags=["external"])
 
@@ -49,15 +50,21 @@ def get_external_factors(
     )
 
 
-@router.get("/factors-range", response_model=list[schemas.ExternalFactorsRangeResponse])
+@router.get(
+    "/factors-range",
+    response_model=list[schemas.ExternalFactorsRangeResponse] | schemas.ExternalFactorsRangeColumns
+)
 def get_external_factors_range(
     start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    format: str = Query("rows", pattern="^(rows|columns)$", description="rows: one object per date; columns: one list per field"),
     db: Session = Depends(get_db)
 ):
     """
     Get aggregated external factors for a date range.
-    Returns one object per date with all factors combined.
+    Returns one object per date with all factors combined, or with
+    format=columns one array per field (dates without calendar data are
+    skipped either way).
     """
     try:
         start = date.fromisoformat(start_date)
@@ -68,32 +75,16 @@ def get_external_factors_range(
     if start > end:
         raise HTTPException(status_code=400, detail="start_date must be <= end_date")
     
-    results = []
-    current = start
-    while current <= end:
-        calendar = crud.get_calendar_day(db, current)
-        if not calendar:
-            current += timedelta(days=1)
-            continue
-        
-        weather = crud.get_weather_day(db, current)
-        events = crud.list_local_events(db, current, current)
-        total_event_impact = sum(e.impact_score for e in events)
-        
-        results.append(schemas.ExternalFactorsRangeResponse(
-            date=current,
-            is_weekend=calendar.is_weekend,
-            is_holiday=calendar.is_holiday,
-            holiday_name=calendar.holiday_name,
-            is_payday=calendar.is_payday,
-            season=calendar.season,
-            weather_score=weather.weather_score if weather else None,
-            total_event_impact=total_event_impact,
-            events=[{"name": e.name, "impact_score": e.impact_score} for e in events]
-        ))
-        current += timedelta(days=1)
-    
-    return results
+    rows = external_factors.get_factor_range(db, start, end)
+    if format == "columns":
+        return external_factors.to_columns(rows)
+    return rows
+
+
+@router.get("/factors/cache/stats", response_model=schemas.FactorCacheStats)
+def get_factor_cache_stats():
+    """Get hit/miss counters for the settled-day factor cache."""
+    return external_factors.factor_cache.stats()
 
 
 @router.post("/events", response_model=schemas.LocalEventOut, status_code=201)
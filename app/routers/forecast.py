@@ -2,11 +2,15 @@
 API endpoints for price forecasting.
 """
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy import select
 from app.database import SessionLocal
-from app import schemas, crud
-from app.services.price_forecast import forecast_item_price
+from app import schemas, crud, models
+from app.services.price_forecast import forecast_item_price, forecast_item_prices
+from app.services.forecast_cache import forecast_cache
+from app.services import forecast_engines, vendor_volatility, vendor_performance, price_risk, latest_prices, price_ingest, line_stream
 
 router = APIRouter(prefix="/forecast", tags=["forecast"])
 
@@ -22,6 +26,7 @@ def get_db():
 def get_price_forecast(
     item_id: int,
     vendor: str | None = Query(None, description="Optional vendor filter"),
+    model_version: str | None = Query(None, description="Forecast engine (see /forecast/engines); default picks by category"),
     db: Session = Depends(get_db)
 ):
     """
@@ -33,7 +38,7 @@ def get_price_forecast(
     Returns forecasted prices for 7-day and 30-day horizons with confidence intervals.
     """
     try:
-        result = forecast_item_price(db, item_id, vendor)
+        result = forecast_item_price(db, item_id, vendor, model_version)
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -41,6 +46,73 @@ def get_price_forecast(
         raise HTTPException(status_code=500, detail=f"Forecast error: {str(e)}")
 
 
+@router.post("/price/batch", response_model=list[schemas.PriceForecastBatchResult])
+def get_price_forecast_batch(
+    payload: schemas.PriceForecastBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Get price forecasts for many (item_id, vendor) pairs at once.
+    
+    Price history is loaded in one query and model fits run in parallel.
+    Results are returned in input order; items that cannot be forecast carry
+    an error message instead of failing the whole batch.
+    """
+    pairs = [(item.item_id, item.vendor) for item in payload.items]
+    try:
+        return forecast_item_prices(db, pairs, payload.model_version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/price-risk", response_model=schemas.PriceRiskResponse)
+def simulate_price_risk(
+    payload: schemas.PriceRiskRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Monte Carlo price risk for the catalog (or the given items).
+    
+    Simulates `paths` GBM price paths per item from vendor volatility and the
+    shelf-life factor, returning percentile bands per item and cost-at-risk
+    per category. Pass a seed to reproduce a run.
+    """
+    try:
+        return price_risk.simulate_price_risk(
+            db,
+            item_ids=payload.item_ids,
+            paths=payload.paths,
+            horizons=tuple(payload.horizons),
+            percentiles=tuple(payload.percentiles),
+            seed=payload.seed,
+            include_items=payload.include_items,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/engines", response_model=list[schemas.ForecastEngineInfo])
+def list_forecast_engines():
+    """List registered layer 1 forecast engines and the categories routed to each."""
+    return [
+        {
+            "model_version": engine.model_version,
+            "description": engine.description,
+            "cached": engine.cached,
+            "stateful": engine.stateful,
+            "default": engine.model_version == forecast_engines.DEFAULT_MODEL_VERSION,
+            "categories": sorted(c for c, v in forecast_engines.CATEGORY_ENGINES.items() if v == engine.model_version),
+        }
+        for engine in forecast_engines.ENGINES.values()
+    ]
+
+
+@router.get("/cache/stats", response_model=schemas.ForecastCacheStats)
+def get_forecast_cache_stats():
+    """Get hit/miss/eviction counters for the fitted-model cache."""
+    return forecast_cache.stats()
+
+
 @router.post("/price-history", response_model=schemas.PriceHistoryOut, status_code=201)
 def create_price_history_record(
     payload: schemas.PriceHistoryCreate,
@@ -50,6 +122,54 @@ def create_price_history_record(
     return crud.create_price_history(db, **payload.model_dump())
 
 
+@router.post(
+    "/price-history/bulk",
+    response_model=schemas.PriceHistoryIngestReport,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "text/csv": {"schema": {"type": "string"}},
+        "application/x-ndjson": {"schema": schemas.PriceHistoryCreate.model_json_schema()},
+    }}}
+)
+async def ingest_price_history(request: Request):
+    """
+    Load a vendor price file streamed as CSV (text/csv, header row first) or
+    NDJSON (application/x-ndjson, one record per line).
+    
+    Columns are those of POST /price-history, plus an optional season
+    (derived from the date when absent). The body is processed in chunks as
+    it arrives, each committed on its own; invalid lines are skipped and
+    listed in the report with their line numbers.
+    
+    The session is the request's own, not the thread-local one from get_db:
+    it is held across awaits and threadpool hops for the whole upload.
+    """
+    media_type = line_stream.media_type(request)
+    if not line_stream.is_ndjson(request) and media_type not in ("text/csv", "application/csv"):
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson")
+    
+    report = price_ingest.IngestReport()
+    header = None
+    batch = []
+    db = SessionLocal.session_factory()
+    try:
+        async for line_no, line in line_stream.iter_lines(request.stream()):
+            if header is None and not line_stream.is_ndjson(request):
+                try:
+                    header = price_ingest.parse_csv_header(line)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                continue
+            batch.append((line_no, line))
+            if len(batch) >= price_ingest.CHUNK_LINES:
+                await run_in_threadpool(price_ingest.ingest_lines, db, batch, report, header)
+                batch = []
+        if batch:
+            await run_in_threadpool(price_ingest.ingest_lines, db, batch, report, header)
+    finally:
+        await run_in_threadpool(db.close)
+    return report.as_dict()
+
+
 @router.get("/price-history/{item_id}", response_model=list[schemas.PriceHistoryOut])
 def get_price_history(
     item_id: int,
@@ -62,6 +182,21 @@ def get_price_history(
     return list(records)
 
 
+@router.get("/latest-prices", response_model=list[schemas.LatestPriceOut])
+def get_latest_prices(
+    item_ids: str = Query(..., description="Comma-separated item IDs, e.g. 1,2,3"),
+    db: Session = Depends(get_db)
+):
+    """Get the current price of every vendor series for many items in one call."""
+    try:
+        ids = {int(i) for i in item_ids.split(",") if i.strip()}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="item_ids must be comma-separated integers")
+    if len(ids) > 5000:
+        raise HTTPException(status_code=400, detail="At most 5000 item_ids per request")
+    return latest_prices.get_latest_prices_by_vendor(db, ids)
+
+
 @router.post("/vendor-volatility", response_model=schemas.VendorVolatilityOut, status_code=201)
 def create_vendor_volatility(
     payload: schemas.VendorVolatilityCreate,
@@ -71,6 +206,41 @@ def create_vendor_volatility(
     return crud.create_vendor_volatility(db, **payload.model_dump())
 
 
+@router.post("/vendor-volatility/recompute", response_model=schemas.VendorVolatilityRecomputeResult)
+def recompute_vendor_volatility(
+    full: bool = Query(False, description="Rescan all history instead of only changes since the last run"),
+    db: Session = Depends(get_db)
+):
+    """
+    Recompute avg/stdev price change per vendor from price history.
+    
+    Reliability score and lead time are left as maintained by hand.
+    """
+    result = vendor_volatility.recompute_vendor_volatility(db, full=full)
+    vendors = db.execute(
+        select(models.VendorVolatility).where(models.VendorVolatility.vendor.in_(result["vendors"]))
+    ).scalars().all()
+    return {"mode": result["mode"], "changes": result["changes"], "vendors": vendors}
+
+
+@router.post("/vendor-performance/recompute", response_model=list[schemas.VendorPerformanceOut])
+def recompute_vendor_performance(
+    window_days: int = Query(vendor_performance.WINDOW_DAYS, ge=1, le=3650, description="Days of orders to include"),
+    db: Session = Depends(get_db)
+):
+    """Recompute on-time %, fill rate and lead times per supplier from orders and receiving logs."""
+    vendor_performance.refresh_vendor_performance(db, window_days=window_days)
+    return db.execute(select(models.VendorPerformance).order_by(models.VendorPerformance.vendor)).scalars().all()
+
+
+@router.get("/vendor-performance", response_model=list[schemas.VendorPerformanceOut])
+def list_vendor_performance(
+    db: Session = Depends(get_db)
+):
+    """Materialized vendor delivery performance."""
+    return sorted(vendor_performance.get_vendor_performance(db).values(), key=lambda p: p.vendor)
+
+
 @router.get("/vendor-volatility/{vendor}", response_model=schemas.VendorVolatilityOut)
 def get_vendor_volatility(
     vendor: str,
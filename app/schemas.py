@@ -1,7 +1,7 @@
 from __future__ import annotations
 from pydantic import BaseModel, Field
 from datetime import date, datetime, time
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 class ProductCreate(BaseModel):
     sku: str
@@ -23,6 +23,12 @@ class ProductOut(BaseModel):
     class Config:
         from_attributes = True
 
+class ProductSearchHit(BaseModel):
+    product: ProductOut
+    score: float
+    class Config:
+        from_attributes = True
+
 class SupplierCreate(BaseModel):
     name: str
     contact_email: Optional[str] = None
@@ -55,6 +61,22 @@ class OrderOut(BaseModel):
     class Config:
         from_attributes = True
 
+class ForecastUpsert(BaseModel):
+    product_id: int
+    location_id: int = 0  # 0 = not location-specific
+    date: date
+    horizon_days: int = 7
+    forecast_qty: float
+    model_version: str = "v1"
+
+    class Config:
+        protected_namespaces = ()
+
+class ForecastUpsertResult(BaseModel):
+    upserted: int
+    inserted: int
+    updated: int
+
 # External factors schemas
 class CalendarDayOut(BaseModel):
     id: int
@@ -132,6 +154,27 @@ class ExternalFactorsRangeResponse(BaseModel):
     total_event_impact: float
     events: List[dict] = []
 
+class ExternalFactorsRangeColumns(BaseModel):
+    """factors-range in columnar form: one list per field, aligned by index."""
+    date: List[date]
+    is_weekend: List[bool]
+    is_holiday: List[bool]
+    holiday_name: List[Optional[str]]
+    is_payday: List[bool]
+    season: List[str]
+    weather_score: List[Optional[float]]
+    total_event_impact: List[float]
+    events: List[List[dict]]
+
+class FactorCacheStats(BaseModel):
+    enabled: bool
+    ttl_seconds: float
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
 # Price forecasting schemas
 class PriceHistoryCreate(BaseModel):
     item_id: int
@@ -143,6 +186,17 @@ class PriceHistoryCreate(BaseModel):
     shelf_life_days: int = Field(gt=0)
     category: str
 
+class PriceHistoryIngestError(BaseModel):
+    line: int
+    error: str
+
+class PriceHistoryIngestReport(BaseModel):
+    lines: int
+    inserted: int
+    rejected: int
+    errors: List[PriceHistoryIngestError]
+    errors_truncated: bool
+
 class PriceHistoryOut(BaseModel):
     id: int
     item_id: int
@@ -158,6 +212,18 @@ class PriceHistoryOut(BaseModel):
     class Config:
         from_attributes = True
 
+class LatestPriceOut(BaseModel):
+    item_id: int
+    vendor: str
+    date: date
+    unit_price: float
+    unit_cost: float
+    purchase_quantity: int
+    shelf_life_days: int
+    category: str
+    class Config:
+        from_attributes = True
+
 class VendorVolatilityCreate(BaseModel):
     vendor: str
     avg_price_change: float
@@ -176,10 +242,36 @@ class VendorVolatilityOut(BaseModel):
     class Config:
         from_attributes = True
 
+class VendorVolatilityRecomputeResult(BaseModel):
+    mode: str  # full | incremental
+    changes: int  # price changes read
+    vendors: List[VendorVolatilityOut]
+
+class VendorPerformanceOut(BaseModel):
+    supplier_id: int
+    vendor: str
+    window_start: date
+    orders: int
+    due_orders: int
+    on_time_orders: int
+    late_orders: int
+    on_time_pct: Optional[float] = None
+    fill_rate: Optional[float] = None
+    lead_time_mean: Optional[float] = None
+    lead_time_p50: Optional[float] = None
+    lead_time_p90: Optional[float] = None
+    lead_time_min: Optional[int] = None
+    lead_time_max: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class PriceForecastResponse(BaseModel):
     item_id: int
     vendor: str
     next_7_day_price: float
+    next_14_day_price: float
     next_30_day_price: float
     low_estimate_7d: float
     high_estimate_7d: float
@@ -189,3 +281,97 @@ class PriceForecastResponse(BaseModel):
     shelf_life_multiplier: float
     risk: str
     explanation: str
+
+class PriceForecastBatchItem(BaseModel):
+    item_id: int
+    vendor: Optional[str] = None
+
+class PriceForecastBatchRequest(BaseModel):
+    items: List[PriceForecastBatchItem] = Field(min_length=1, max_length=5000)
+    # None picks the engine configured for each item's category
+    model_version: Optional[str] = "price-v1"
+
+    class Config:
+        protected_namespaces = ()
+
+class PriceForecastBatchResult(BaseModel):
+    item_id: int
+    vendor: Optional[str] = None
+    model_version: Optional[str] = None
+    forecast: Optional[PriceForecastResponse] = None
+    error: Optional[str] = None
+
+    class Config:
+        protected_namespaces = ()
+
+class ForecastEngineInfo(BaseModel):
+    model_version: str
+    description: str
+    cached: bool
+    stateful: bool
+    default: bool
+    categories: List[str]
+
+    class Config:
+        protected_namespaces = ()
+
+class PriceRiskRequest(BaseModel):
+    item_ids: Optional[List[int]] = None  # default: every active product with price history
+    paths: int = Field(1000, ge=100, le=10000)
+    horizons: List[int] = Field(default_factory=lambda: [7, 14, 30], min_length=1, max_length=10)
+    percentiles: List[float] = Field(default_factory=lambda: [5, 50, 95], min_length=1, max_length=9)
+    seed: Optional[int] = Field(None, ge=0)
+    include_items: bool = True
+
+class PriceRiskBand(BaseModel):
+    horizon_days: int
+    percentiles: Dict[str, float]  # "p5" -> price
+
+class PriceRiskItem(BaseModel):
+    item_id: int
+    vendor: str
+    category: str
+    current_price: float
+    bands: List[PriceRiskBand]
+
+class CategoryCostAtRisk(BaseModel):
+    horizon_days: int
+    expected_cost: float
+    p95_cost: float
+    cost_at_risk: float
+
+class PriceRiskCategory(BaseModel):
+    category: str
+    items: int
+    baseline_cost: float
+    horizons: List[CategoryCostAtRisk]
+
+class PriceRiskResponse(BaseModel):
+    seed: int
+    paths: int
+    horizons: List[int]
+    items: List[PriceRiskItem]
+    categories: List[PriceRiskCategory]
+
+class ForecastCacheStats(BaseModel):
+    entries: int
+    max_entries: int
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    hit_ratio: float
+
+class DashboardCacheStats(BaseModel):
+    enabled: bool
+    ttl_seconds: float
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    bypasses: int
+    expirations: int
+    evictions: int
+    invalidations: int
+    hit_ratio: float
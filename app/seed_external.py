@@ -9,61 +9,91 @@ Usage:
     python -m app.seed_external load_econ --csv-path data/econ_data.csv
 """
 from __future__ import annotations
-import csv
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Iterable
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 from .database import SessionLocal
-from . import models
-
-
-# Major US holidays (fixed dates)
-MAJOR_HOLIDAYS = {
-    (1, 1): "New Year's Day",
-    (2, 14): "Valentine's Day",
-    (5, 12): "Mother's Day",  # Second Sunday in May (simplified)
-    (7, 4): "Independence Day",
-    (12, 25): "Christmas",
-}
-
-# Variable holidays (approximated - in production use proper calculation)
-# Easter, Memorial Day, Labor Day, Thanksgiving
-# For simplicity, using fixed approximations
-VARIABLE_HOLIDAYS = {
-    (4, 7): "Easter",  # Approximation
-    (5, 27): "Memorial Day",  # Last Monday in May (approximation)
-    (9, 2): "Labor Day",  # First Monday in September (approximation)
-    (11, 28): "Thanksgiving",  # Fourth Thursday in November (approximation)
+from . import models, crud
+from .services.price_forecast import SEASON_BY_MONTH
+from .services.factor_loader import load_file
+
+
+# US holidays that move restaurant demand, as rules:
+# ("fixed", month, day), ("nth_weekday", month, weekday, n) with Monday=0 and
+# n=-1 for the last one in the month, or ("easter", offset_days)
+HOLIDAY_RULES = {
+    "New Year's Day": ("fixed", 1, 1),
+    "Valentine's Day": ("fixed", 2, 14),
+    "Easter": ("easter", 0),
+    "Mother's Day": ("nth_weekday", 5, 6, 2),
+    "Memorial Day": ("nth_weekday", 5, 0, -1),
+    "Independence Day": ("fixed", 7, 4),
+    "Labor Day": ("nth_weekday", 9, 0, 1),
+    "Thanksgiving": ("nth_weekday", 11, 3, 4),
+    "Christmas": ("fixed", 12, 25),
 }
 
 
 def get_season(month: int) -> str:
     """Determine season based on month."""
-    if month in (12, 1, 2):
-        return "winter"
-    elif month in (3, 4, 5):
-        return "spring"
-    elif month in (6, 7, 8):
-        return "summer"
-    else:
-        return "fall"
+    return SEASON_BY_MONTH[month - 1]
+
+
+def easter_date(year: int) -> date:
+    """Western (Gregorian) Easter Sunday, by the anonymous Gregorian algorithm."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The nth (1-based; -1 = last) given weekday (Monday=0) of a month."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+@lru_cache(maxsize=256)
+def holidays_for_year(year: int) -> dict[date, str]:
+    """Holiday dates of a year, from HOLIDAY_RULES."""
+    holidays = {}
+    for name, rule in HOLIDAY_RULES.items():
+        kind, *args = rule
+        if kind == "fixed":
+            day = date(year, *args)
+        elif kind == "nth_weekday":
+            day = nth_weekday(year, *args)
+        else:
+            day = easter_date(year) + timedelta(days=args[0])
+        holidays.setdefault(day, name)
+    return holidays
 
 
 def is_holiday(d: date) -> tuple[bool, str | None]:
     """Check if date is a holiday and return holiday name."""
-    month_day = (d.month, d.day)
-    if month_day in MAJOR_HOLIDAYS:
-        return True, MAJOR_HOLIDAYS[month_day]
-    if month_day in VARIABLE_HOLIDAYS:
-        return True, VARIABLE_HOLIDAYS[month_day]
-    return False, None
+    name = holidays_for_year(d.year).get(d)
+    return name is not None, name
 
 
 def generate_calendar_days(start_year: int, end_year: int) -> list[dict]:
     """
     Generate CalendarDay records for a year range.
     
+    Weekday, month and day-of-month are computed over the whole range with
+    numpy; holidays are computed once per year and placed by offset.
+    
     Args:
         start_year: Starting year (inclusive)
         end_year: Ending year (inclusive)
@@ -71,48 +101,40 @@ def generate_calendar_days(start_year: int, end_year: int) -> list[dict]:
     Returns:
         List of dicts ready for database insertion
     """
-    days = []
-    current = date(start_year, 1, 1)
-    end_date = date(end_year, 12, 31)
+    start = np.datetime64(f"{start_year:04d}-01-01", "D")
+    days = np.arange(start, np.datetime64(f"{end_year + 1:04d}-01-01", "D"))
+    if len(days) == 0:
+        return []
     
-    while current <= end_date:
-        is_hol, holiday_name = is_holiday(current)
-        is_pay = current.day in (1, 15)
-        
-        days.append({
-            "date": current,
-            "is_weekend": current.weekday() >= 5,  # Saturday=5, Sunday=6
-            "is_holiday": is_hol,
-            "holiday_name": holiday_name,
-            "is_payday": is_pay,
-            "season": get_season(current.month),
-        })
-        current += timedelta(days=1)
+    weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday; Monday=0
+    month_start = days.astype("datetime64[M]")
+    month = month_start.astype(np.int64) % 12 + 1
+    day_of_month = (days - month_start.astype("datetime64[D]")).astype(np.int64) + 1
+    
+    holiday_name = np.full(len(days), None, dtype=object)
+    for year in range(start_year, end_year + 1):
+        for day, name in holidays_for_year(year).items():
+            holiday_name[(np.datetime64(day, "D") - start).astype(np.int64)] = name
     
-    return days
+    columns = {
+        "date": days.astype(object).tolist(),
+        "is_weekend": (weekday >= 5).tolist(),  # Saturday=5, Sunday=6
+        "is_holiday": (holiday_name != None).tolist(),  # noqa: E711 (elementwise)
+        "holiday_name": holiday_name.tolist(),
+        "is_payday": np.isin(day_of_month, (1, 15)).tolist(),
+        "season": np.asarray(SEASON_BY_MONTH)[month - 1].tolist(),
+    }
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
 
 
 def upsert_calendar_days(db: Session, days: Iterable[dict]) -> int:
     """
-    Upsert CalendarDay records (insert or update if exists).
+    Upsert CalendarDay records keyed on date (INSERT ... ON CONFLICT, in chunks).
     
     Returns:
         Number of records processed
     """
-    count = 0
-    for day_data in days:
-        stmt = select(models.CalendarDay).where(models.CalendarDay.date == day_data["date"])
-        existing = db.execute(stmt).scalar_one_or_none()
-        
-        if existing:
-            # Update existing
-            for key, value in day_data.items():
-                setattr(existing, key, value)
-        else:
-            # Insert new
-            db.add(models.CalendarDay(**day_data))
-        count += 1
-    
+    count = crud.bulk_upsert(db, models.CalendarDay, list(days), index_elements=["date"], chunk_size=1000)
     db.commit()
     return count
 
@@ -124,39 +146,13 @@ def load_econ_from_csv(db: Session, csv_path: str) -> int:
     CSV format expected:
         year,month,inflation_rate,gas_price_index,consumer_confidence
     
+    Streams the file in chunks with bulk upserts (see app.load_external for
+    NDJSON, weather files and the rejected-row report).
+    
     Returns:
         Number of records processed
     """
-    count = 0
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            year = int(row["year"])
-            month = int(row["month"])
-            
-            stmt = select(models.EconMonth).where(
-                models.EconMonth.year == year,
-                models.EconMonth.month == month
-            )
-            existing = db.execute(stmt).scalar_one_or_none()
-            
-            data = {
-                "year": year,
-                "month": month,
-                "inflation_rate": float(row["inflation_rate"]) if row.get("inflation_rate") else None,
-                "gas_price_index": float(row["gas_price_index"]) if row.get("gas_price_index") else None,
-                "consumer_confidence": float(row["consumer_confidence"]) if row.get("consumer_confidence") else None,
-            }
-            
-            if existing:
-                for key, value in data.items():
-                    setattr(existing, key, value)
-            else:
-                db.add(models.EconMonth(**data))
-            count += 1
-    
-    db.commit()
-    return count
+    return load_file(db, "econ", csv_path, "csv").loaded
 
 
 if __name__ == "__main__":
@@ -0,0 +1,256 @@
+"""
+Response cache for the dashboard endpoints.
+
+Responses are cached per endpoint and parameters for DASHBOARD_CACHE_TTL
+seconds (default 60; 0 disables caching). Each endpoint declares the tables it
+reads, and a commit that wrote to any of them drops its entries at once, so
+polling clients see new data as soon as it lands rather than after the TTL.
+
+Writes are collected per session: ORM inserts/updates/deletes at flush, and
+insert/update/delete statements run through Session.execute (bulk upserts,
+rebuilds). They are applied at after_commit and discarded on rollback. The
+cache is per process: commits made by other processes (scripts, other
+workers) are only picked up when the TTL expires.
+
+Other in-process caches can subscribe to the same commit-time table sets with
+on_tables_committed().
+
+Error fallbacks are not cached: an endpoint or section that catches a failure
+and returns a default payload calls skip_cache(), so a transient database
+error is served once rather than for the whole TTL.
+
+A request with "Cache-Control: no-cache" or "X-Dashboard-Cache: bypass" skips
+the cache and refreshes the entry. Responses carry X-Dashboard-Cache: hit,
+miss or bypass.
+"""
+from __future__ import annotations
+import functools
+import inspect
+import os
+import threading
+import time
+import typing
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Optional
+from fastapi import Request, Response, params
+from sqlalchemy import event
+from sqlalchemy.orm import Session, ORMExecuteState
+
+CacheKey = tuple[str, tuple[tuple[str, Any], ...]]
+
+# session.info key for the tables written in the current transaction
+_WRITTEN_TABLES = "dashboard_cache_tables"
+
+# Per-request flags of the response being built; a mutable dict so sections run
+# in gathered tasks, AsyncSession.run_sync and the threadpool share it
+_response_state: ContextVar[Optional[dict]] = ContextVar("dashboard_response_state", default=None)
+
+
+class DashboardCache:
+    """TTL + LRU cache of dashboard responses, invalidated by table."""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 512):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (expires_at, tables, response)
+        self._entries: OrderedDict[CacheKey, tuple[float, frozenset[str], Any]] = OrderedDict()
+        # Bumped on every invalidation, so a response computed across a commit is not stored
+        self._table_versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, key: CacheKey) -> Any:
+        """Cached response for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypasses += 1
+
+    def versions(self, tables: Iterable[str]) -> tuple[int, ...]:
+        """Invalidation counters of the tables, to pass back to put()."""
+        with self._lock:
+            return tuple(self._table_versions.get(t, 0) for t in tables)
+
+    def put(self, key: CacheKey, response: Any, tables: frozenset[str], versions: tuple[int, ...]):
+        """Store a response unless one of its tables was invalidated since `versions` was taken."""
+        with self._lock:
+            if tuple(self._table_versions.get(t, 0) for t in tables) != versions:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, tables, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_tables(self, tables: Iterable[str]):
+        """Drop every entry that reads any of the tables."""
+        tables = set(tables)
+        if not tables:
+            return
+        with self._lock:
+            for table in tables:
+                self._table_versions[table] = self._table_versions.get(table, 0) + 1
+            stale = [k for k, (_, deps, _) in self._entries.items() if deps & tables]
+            for k in stale:
+                del self._entries[k]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl_seconds,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+dashboard_cache = DashboardCache(
+    ttl_seconds=float(os.getenv("DASHBOARD_CACHE_TTL", "60")),
+    max_entries=int(os.getenv("DASHBOARD_CACHE_SIZE", "512")),
+)
+
+
+# Called with the set of written tables after every commit
+_table_listeners: list[Callable[[set[str]], None]] = []
+
+
+def on_tables_committed(listener: Callable[[set[str]], None]) -> Callable[[set[str]], None]:
+    """Register listener(tables) to run after each commit that wrote to tables."""
+    _table_listeners.append(listener)
+    return listener
+
+
+def _written(session: Session) -> set[str]:
+    return session.info.setdefault(_WRITTEN_TABLES, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session: Session, flush_context):
+    tables = _written(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            tables.add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_tables(orm_execute_state: ORMExecuteState):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _written(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    tables = session.info.pop(_WRITTEN_TABLES, None)
+    if tables:
+        dashboard_cache.invalidate_tables(tables)
+        for listener in _table_listeners:
+            listener(tables)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session: Session, previous_transaction):
+    session.info.pop(_WRITTEN_TABLES, None)
+
+
+def skip_cache():
+    """Keep the response being built out of the cache (an error fallback)."""
+    state = _response_state.get()
+    if state is not None:
+        state["skip"] = True
+
+
+def _bypass_requested(request: Request) -> bool:
+    return "no-cache" in request.headers.get("cache-control", "").lower() or \
+        request.headers.get("x-dashboard-cache", "").lower() == "bypass"
+
+
+def cached_dashboard(tables: Iterable[str]) -> Callable:
+    """
+    Cache an async endpoint's response, keyed by its path and parameters.
+
+    Dependency parameters (sessions) are not part of the key. The endpoint's
+    signature is kept for FastAPI, with the Request and Response added.
+
+    Args:
+        tables: Table names the endpoint reads
+    """
+    depends_on = frozenset(tables)
+
+    def decorate(endpoint: Callable) -> Callable:
+        signature = inspect.signature(endpoint)
+        hints = typing.get_type_hints(endpoint)
+        key_params = [name for name, p in signature.parameters.items() if not isinstance(p.default, params.Depends)]
+
+        @functools.wraps(endpoint)
+        async def wrapper(_cache_request: Request, _cache_response: Response, **kwargs):
+            if not dashboard_cache.enabled:
+                return await endpoint(**kwargs)
+            key = (_cache_request.url.path, tuple((name, kwargs[name]) for name in key_params))
+            if _bypass_requested(_cache_request):
+                dashboard_cache.record_bypass()
+                _cache_response.headers["X-Dashboard-Cache"] = "bypass"
+            else:
+                cached = dashboard_cache.get(key)
+                if cached is not None:
+                    _cache_response.headers["X-Dashboard-Cache"] = "hit"
+                    return cached
+                _cache_response.headers["X-Dashboard-Cache"] = "miss"
+
+            versions = dashboard_cache.versions(depends_on)
+            state = {"skip": False}
+            token = _response_state.set(state)
+            try:
+                result = await endpoint(**kwargs)
+            finally:
+                _response_state.reset(token)
+            if not state["skip"]:
+                dashboard_cache.put(key, result, depends_on, versions)
+            return result
+
+        wrapper.__signature__ = signature.replace(parameters=[
+            inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            inspect.Parameter("_cache_response", inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+            *(p.replace(kind=inspect.Parameter.KEYWORD_ONLY, annotation=hints.get(name, p.annotation))
+              for name, p in signature.parameters.items()),
+        ])
+        return wrapper
+
+    return decorate
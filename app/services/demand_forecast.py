@@ -0,0 +1,286 @@
+"""
+Batch demand forecasts per product and location from daily sales.
+
+Each series is one product's units sold per day at one location, read from
+sales_daily_cube (direct product sales; cocktail sales are not broken down
+into ingredients). Series are fitted with a weekday-seasonal exponential
+smoothing model:
+
+- a weekday index (mean units per weekday over the overall mean, shrunk
+  towards 1 for weekdays with few observations)
+- a level smoothed over the deseasonalized days with ALPHA
+
+Days before a series' first sale in the history window are ignored, so a
+newly listed product is not dragged down by the days before it was sold.
+The forecast for a horizon is the expected units over the h days starting at
+the run date, written to Forecast (date = run date, location_id set) under
+DEMAND_MODEL_VERSION.
+
+Locations are read one at a time (the cube's key index leads with location)
+and each location's series are fitted as one vectorized chunk on the shared
+fitting process pool while the next location is read, so a full run over
+tens of thousands of series takes minutes. Incremental runs (`since`) refit
+only series whose cube cells changed since then.
+"""
+from __future__ import annotations
+import os
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
+import numpy as np
+from sqlalchemy import select, func, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app import models, crud
+from app.services.forecast_store import HORIZONS
+from app.services.fit_pool import forecast_worker_count, get_fit_pool, shutdown_fit_pool
+
+DEMAND_MODEL_VERSION = os.getenv("DEMAND_FORECAST_MODEL_VERSION", "demand-v1")
+HISTORY_DAYS = int(os.getenv("DEMAND_HISTORY_DAYS", "112"))
+ALPHA = 0.1
+# Pseudo-observations pulling each weekday index towards 1
+WEEKDAY_SHRINK = 2.0
+
+
+@dataclass
+class SeriesChunk:
+    """Daily units for the series of one location: history[i] belongs to product_ids[i]."""
+    location_id: int
+    product_ids: np.ndarray
+    history: np.ndarray  # len(product_ids) x days, float64
+    first_weekday: int  # weekday of history[:, 0], Monday = 0
+
+
+def ensure_forecast_location_column(engine: Engine):
+    """
+    Add forecasts.location_id to a table created before it existed.
+
+    uq_fc_unique gains the column too; SQLite cannot alter a constraint, so
+    the table is rebuilt there. Existing rows get location 0.
+    """
+    columns = {c["name"] for c in inspect(engine).get_columns("forecasts")}
+    if "location_id" in columns:
+        return
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            copied = "id, product_id, date, horizon_days, forecast_qty, model_version, created_at"
+            conn.exec_driver_sql("ALTER TABLE forecasts RENAME TO forecasts_old")
+            models.Forecast.__table__.create(conn)
+            conn.exec_driver_sql(f"INSERT INTO forecasts ({copied}) SELECT {copied} FROM forecasts_old")
+            conn.exec_driver_sql("DROP TABLE forecasts_old")
+        else:
+            conn.exec_driver_sql("ALTER TABLE forecasts ADD COLUMN location_id INTEGER NOT NULL DEFAULT 0")
+            conn.exec_driver_sql("ALTER TABLE forecasts DROP CONSTRAINT uq_fc_unique")
+            conn.exec_driver_sql(
+                "ALTER TABLE forecasts ADD CONSTRAINT uq_fc_unique "
+                "UNIQUE (product_id, location_id, date, horizon_days, model_version)"
+            )
+    print("✓ Added location_id to forecasts")
+
+
+def changed_series(db: Session, since: datetime) -> dict[int, set[int]]:
+    """
+    Series with sales added since `since` (cube cells updated at or after it, UTC).
+
+    Returns:
+        Dict location_id -> product ids
+    """
+    cube = models.SalesDailyCube
+    changed: dict[int, set[int]] = {}
+    for location_id, product_id in db.execute(
+        select(cube.location_id, cube.product_id).distinct()
+        .where(cube.updated_at >= since, cube.product_id != 0)
+    ):
+        changed.setdefault(location_id, set()).add(product_id)
+    return changed
+
+
+def read_series(
+    db: Session,
+    location_id: int,
+    start: date,
+    end: date,
+    product_ids: Optional[set[int]] = None,
+    chunk_size: int = 500
+) -> Optional[SeriesChunk]:
+    """
+    Dense daily units for every active product sold at a location in [start, end].
+
+    Args:
+        product_ids: Only these products (incremental runs), read chunk_size
+            ids per query
+
+    Returns:
+        SeriesChunk, or None when nothing was sold
+    """
+    cube = models.SalesDailyCube
+    stmt = (
+        select(cube.product_id, cube.date, func.sum(cube.quantity))
+        .join(models.Product, models.Product.id == cube.product_id)
+        .where(
+            cube.location_id == location_id,
+            cube.date >= start,
+            cube.date <= end,
+            models.Product.active == True
+        )
+        .group_by(cube.product_id, cube.date)
+    )
+    if product_ids is None:
+        rows = db.execute(stmt).all()
+    else:
+        ids = sorted(product_ids)
+        rows = []
+        for offset in range(0, len(ids), chunk_size):
+            rows.extend(db.execute(stmt.where(cube.product_id.in_(ids[offset:offset + chunk_size]))).all())
+    if not rows:
+        return None
+
+    products = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    days = np.array([r[1] for r in rows], dtype="datetime64[D]")
+    quantities = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+    product_ids_sorted, series = np.unique(products, return_inverse=True)
+    history = np.zeros((len(product_ids_sorted), (end - start).days + 1))
+    history[series, (days - np.datetime64(start, "D")).astype(np.int64)] = quantities
+    return SeriesChunk(location_id, product_ids_sorted, history, start.weekday())
+
+
+def fit_demand(
+    history: np.ndarray,
+    first_weekday: int,
+    horizons: tuple[int, ...] = HORIZONS,
+    alpha: float = ALPHA
+) -> np.ndarray:
+    """
+    Fit every series (row) of `history` at once and forecast the days after it.
+
+    Module-level so the fitting process pool can run it.
+
+    Args:
+        history: series x days units sold, oldest day first
+        first_weekday: Weekday of the first day, Monday = 0
+
+    Returns:
+        series x len(horizons) array of expected units over each horizon
+    """
+    n, days = history.shape
+    weekday = (first_weekday + np.arange(days)) % 7
+    # Each series starts at its first sale in the window
+    sold = history > 0
+    first = np.where(sold.any(axis=1), sold.argmax(axis=1), days)
+    observed = np.arange(days) >= first[:, None]
+    observed_values = np.where(observed, history, 0.0)
+
+    counts = observed.sum(axis=1)
+    mean = observed_values.sum(axis=1) / np.maximum(counts, 1)
+    by_weekday = np.stack([observed_values[:, weekday == w].sum(axis=1) for w in range(7)], axis=1)
+    weekday_counts = np.stack([observed[:, weekday == w].sum(axis=1) for w in range(7)], axis=1)
+    safe_mean = np.where(mean > 0, mean, 1.0)[:, None]
+    index = (by_weekday / safe_mean + WEEKDAY_SHRINK) / (weekday_counts + WEEKDAY_SHRINK)
+    index /= index.mean(axis=1, keepdims=True)
+
+    level = mean.copy()
+    deseasonalized = history / index[:, weekday]
+    for t in range(days):
+        level = np.where(observed[:, t], alpha * deseasonalized[:, t] + (1 - alpha) * level, level)
+
+    ahead = np.arange(max(horizons))
+    daily = level[:, None] * index[:, (first_weekday + days + ahead) % 7]
+    cumulative = np.cumsum(daily, axis=1)
+    return np.round(np.maximum(cumulative[:, [h - 1 for h in horizons]], 0.0), 2)
+
+
+def _fits(chunks: Iterator[SeriesChunk], horizons: tuple[int, ...]) -> Iterator[tuple[SeriesChunk, np.ndarray]]:
+    """
+    Fit chunks in order, on the shared fitting pool when there is more than one worker.
+
+    Raises:
+        BrokenProcessPool: A worker died; the pool is dropped so the next run starts a fresh one
+    """
+    workers = forecast_worker_count()
+    if workers < 2:
+        for chunk in chunks:
+            yield chunk, fit_demand(chunk.history, chunk.first_weekday, horizons)
+        return
+    pool = get_fit_pool()
+    # Reading (and writing) continues while up to two chunks per worker are fitted
+    pending: deque[tuple[SeriesChunk, Future]] = deque()
+    try:
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(fit_demand, chunk.history, chunk.first_weekday, horizons)))
+            while len(pending) >= workers * 2:
+                done, future = pending.popleft()
+                yield done, future.result()
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+    except BrokenProcessPool:
+        shutdown_fit_pool(pool)
+        raise
+
+
+def forecast_demand(
+    db: Session,
+    as_of: Optional[date] = None,
+    since: Optional[datetime] = None,
+    model_version: str = DEMAND_MODEL_VERSION,
+    history_days: int = HISTORY_DAYS,
+    horizons: tuple[int, ...] = HORIZONS,
+    location_ids: Optional[list[int]] = None
+) -> dict:
+    """
+    Fit demand for every product x location series and upsert the forecasts.
+
+    History is the `history_days` days before `as_of`; forecasts cover the
+    days from `as_of` on. Each location's forecasts commit on their own.
+
+    Args:
+        as_of: Run date, default today
+        since: Only refit series whose sales changed at or after this time (UTC)
+        location_ids: Only these locations, default every location with sales
+
+    Returns:
+        Counts: locations, series, forecast rows written
+    """
+    as_of = as_of or date.today()
+    start, end = as_of - timedelta(days=history_days), as_of - timedelta(days=1)
+
+    if since is not None:
+        changed = changed_series(db, since)
+        targets = {loc: products for loc, products in changed.items() if location_ids is None or loc in location_ids}
+    else:
+        if location_ids is None:
+            location_ids = db.execute(
+                select(models.SalesDailyCube.location_id).distinct()
+                .where(models.SalesDailyCube.date >= start, models.SalesDailyCube.date <= end)
+            ).scalars().all()
+        targets = {loc: None for loc in location_ids}
+
+    def chunks() -> Iterator[SeriesChunk]:
+        for location_id in sorted(targets):
+            chunk = read_series(db, location_id, start, end, targets[location_id])
+            if chunk is not None:
+                yield chunk
+
+    locations = series = rows_written = 0
+    for chunk, forecasts in _fits(chunks(), horizons):
+        rows = [
+            {
+                "product_id": int(product_id),
+                "location_id": chunk.location_id,
+                "date": as_of,
+                "horizon_days": horizon,
+                "forecast_qty": float(qty),
+                "model_version": model_version,
+            }
+            for product_id, values in zip(chunk.product_ids, forecasts)
+            for horizon, qty in zip(horizons, values)
+        ]
+        counts = crud.upsert_forecasts(db, rows)
+        locations += 1
+        series += len(chunk.product_ids)
+        rows_written += counts["inserted"] + counts["updated"]
+
+    return {"locations": locations, "series": series, "rows": rows_written}
@@ -0,0 +1,176 @@
+"""
+External factors (calendar, weather, local events) for date ranges.
+
+A range is served by three range queries (calendar_days, weather_days,
+local_events) joined by date in memory, instead of three queries per day.
+
+Days before today are treated as settled and kept in an LRU keyed by date
+(FACTOR_CACHE_SIZE days, default 20000; FACTOR_CACHE_TTL seconds, default
+3600; 0 disables). The cache is cleared when this process commits a write to
+any of the three tables; writes from other processes (loader CLIs) show up
+when entries expire. Today and future days are always read fresh.
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app import models
+from app.services.dashboard_cache import on_tables_committed
+
+FACTOR_TABLES = frozenset({"calendar_days", "weather_days", "local_events"})
+# Column order of the columnar response
+FIELDS = ("date", "is_weekend", "is_holiday", "holiday_name", "is_payday", "season", "weather_score", "total_event_impact", "events")
+
+
+class FactorDayCache:
+    """TTL + LRU cache of per-day factor rows (None = no calendar row)."""
+
+    def __init__(self, ttl_seconds: float = 3600.0, max_entries: int = 20000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[date, tuple[float, Optional[dict]]] = OrderedDict()
+        # Bumped on every clear, so rows read across a commit are not stored
+        self.generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get_many(self, days: Iterable[date]) -> dict[date, Optional[dict]]:
+        """Cached rows for the days that are cached and fresh."""
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for day in days:
+                entry = self._entries.get(day)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(day)
+                    found[day] = entry[1]
+                    self.hits += 1
+                else:
+                    if entry is not None:
+                        del self._entries[day]
+                    self.misses += 1
+        return found
+
+    def put_many(self, rows: dict[date, Optional[dict]], generation: int):
+        """Store rows unless the cache was cleared since `generation` was read."""
+        expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if generation != self.generation:
+                return
+            for day, row in rows.items():
+                self._entries[day] = (expires, row)
+                self._entries.move_to_end(day)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl_seconds,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+factor_cache = FactorDayCache(
+    ttl_seconds=float(os.getenv("FACTOR_CACHE_TTL", "3600")),
+    max_entries=int(os.getenv("FACTOR_CACHE_SIZE", "20000")),
+)
+
+
+@on_tables_committed
+def _clear_on_write(tables: set[str]):
+    if tables & FACTOR_TABLES:
+        factor_cache.clear()
+
+
+def fetch_factor_days(db: Session, start: date, end: date) -> dict[date, Optional[dict]]:
+    """
+    Factor rows for every day in [start, end], from three range queries.
+
+    Returns:
+        Dict of date -> row dict (see FIELDS), or None for days without a
+        calendar row
+    """
+    calendar = db.execute(
+        select(models.CalendarDay).where(models.CalendarDay.date >= start, models.CalendarDay.date <= end)
+    ).scalars().all()
+    weather = dict(db.execute(
+        select(models.WeatherDay.date, models.WeatherDay.weather_score)
+        .where(models.WeatherDay.date >= start, models.WeatherDay.date <= end)
+    ).all())
+    events: dict[date, list[dict]] = {}
+    for name, day, impact_score in db.execute(
+        select(models.LocalEvent.name, models.LocalEvent.date, models.LocalEvent.impact_score)
+        .where(models.LocalEvent.date >= start, models.LocalEvent.date <= end)
+        .order_by(models.LocalEvent.date, models.LocalEvent.start_time)
+    ):
+        events.setdefault(day, []).append({"name": name, "impact_score": impact_score})
+
+    days: dict[date, Optional[dict]] = {start + timedelta(days=i): None for i in range((end - start).days + 1)}
+    for c in calendar:
+        day_events = events.get(c.date, [])
+        score = weather.get(c.date)
+        days[c.date] = {
+            "date": c.date,
+            "is_weekend": c.is_weekend,
+            "is_holiday": c.is_holiday,
+            "holiday_name": c.holiday_name,
+            "is_payday": c.is_payday,
+            "season": c.season,
+            "weather_score": float(score) if score is not None else None,
+            "total_event_impact": float(sum(e["impact_score"] for e in day_events)),
+            "events": day_events,
+        }
+    return days
+
+
+def get_factor_range(db: Session, start: date, end: date, today: Optional[date] = None) -> list[dict]:
+    """
+    Factor rows for the days in [start, end] that have a calendar row, in date order.
+
+    Settled days (before today) come from the cache where possible; the
+    uncached span and any days from today on are read with one set of range
+    queries.
+    """
+    today = today or date.today()
+    settled_end = min(end, today - timedelta(days=1))
+    all_days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    cached: dict[date, Optional[dict]] = {}
+    if factor_cache.enabled and start <= settled_end:
+        cached = factor_cache.get_many(d for d in all_days if d <= settled_end)
+    missing = [d for d in all_days if d not in cached]
+
+    if missing:
+        generation = factor_cache.generation
+        fetched = fetch_factor_days(db, missing[0], missing[-1])
+        if factor_cache.enabled:
+            factor_cache.put_many({d: row for d, row in fetched.items() if d <= settled_end}, generation)
+        cached.update(fetched)
+    return [cached[d] for d in all_days if cached[d] is not None]
+
+
+def to_columns(rows: list[dict]) -> dict[str, list]:
+    """Rows as one list per field."""
+    return {name: [row[name] for row in rows] for name in FIELDS}
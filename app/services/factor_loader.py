@@ -0,0 +1,210 @@
+"""
+Bulk loader for external factor files: EconMonth and WeatherDay.
+
+CSV or NDJSON files are read in chunks (pandas chunked readers), so memory
+stays bounded by one chunk whatever the file size. Each chunk is validated
+column-wise, deduplicated on its unique key (the last row wins), upserted
+with crud.bulk_upsert and committed.
+
+Columns (extra columns are ignored, blank values load as NULL; columns missing
+from the file keep their stored values and are NULL on new rows):
+    econ:    year, month, inflation_rate, gas_price_index, consumer_confidence
+    weather: date, avg_temp, rainfall_mm, weather_type, weather_score
+
+WeatherDay is keyed on date alone (one series for the business). Files with a
+zip column can be narrowed to one store's ZIP code with `zip_code`; rows for
+other ZIPs are skipped.
+"""
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
+from sqlalchemy.orm import Session
+from app import models, crud
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CHUNK_ROWS = 10000
+# Rejected rows kept for the report; later ones are only counted
+MAX_REPORTED_ERRORS = 100
+KINDS = ("econ", "weather")
+
+
+@dataclass
+class LoadReport:
+    """Running totals for one loaded file."""
+    kind: str
+    rows: int = 0
+    loaded: int = 0
+    rejected: int = 0
+    skipped: int = 0
+    # Rows of several ZIP codes were loaded into the one date-keyed series
+    mixed_zip_codes: bool = False
+    seconds: float = 0.0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    def reject(self, line: int, error: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, error))
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _file_format(path: Path, file_format: Optional[str]) -> str:
+    if file_format:
+        return file_format
+    return "ndjson" if path.suffix.lower() in (".ndjson", ".jsonl", ".json") else "csv"
+
+
+def read_chunks(path: Path, file_format: str, chunk_rows: int) -> Iterator[tuple[pd.DataFrame, int]]:
+    """
+    Stream a CSV or NDJSON file as DataFrames of raw values.
+
+    Returns:
+        (chunk, line number of its first row) pairs
+    """
+    import pandas as pd
+
+    if file_format == "csv":
+        reader = pd.read_csv(path, chunksize=chunk_rows, dtype=str, keep_default_na=False, skipinitialspace=True)
+        first_line = 2  # after the header
+    else:
+        reader = pd.read_json(path, lines=True, chunksize=chunk_rows, dtype=False, convert_dates=False)
+        first_line = 1
+    with reader:
+        for chunk in reader:
+            chunk.columns = [str(c).strip().lower() for c in chunk.columns]
+            yield chunk, first_line
+            first_line += len(chunk)
+
+
+def _blank(values: pd.Series) -> pd.Series:
+    return values.isna() | (values.astype(str).str.strip() == "")
+
+
+def _number(values: pd.Series, low: Optional[float] = None, high: Optional[float] = None, required: bool = False):
+    """Parsed numbers (NaN when blank) and a validity mask."""
+    import pandas as pd
+    blank = _blank(values)
+    numbers = pd.to_numeric(values.where(~blank), errors="coerce")
+    valid = numbers.notna()
+    if low is not None:
+        valid &= numbers >= low
+    if high is not None:
+        valid &= numbers <= high
+    return numbers, (valid if required else valid | blank)
+
+
+def _column(frame: pd.DataFrame, name: str) -> pd.Series:
+    import pandas as pd
+    return frame[name] if name in frame.columns else pd.Series([None] * len(frame), index=frame.index, dtype=object)
+
+
+def _econ_rows(frame: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Typed econ rows and per-column validity."""
+    import pandas as pd
+    values, checks = {}, {}
+    values["year"], checks["year"] = _number(_column(frame, "year"), 1900, 2200, required=True)
+    values["month"], checks["month"] = _number(_column(frame, "month"), 1, 12, required=True)
+    checks["year"] &= values["year"] % 1 == 0
+    checks["month"] &= values["month"] % 1 == 0
+    for name in ("inflation_rate", "gas_price_index", "consumer_confidence"):
+        values[name], checks[name] = _number(_column(frame, name))
+    return pd.DataFrame(values), pd.DataFrame(checks)
+
+
+def _weather_rows(frame: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Typed weather rows and per-column validity."""
+    import pandas as pd
+    values, checks = {}, {}
+    dates = pd.to_datetime(_column(frame, "date").astype(str).str.strip(), format="%Y-%m-%d", errors="coerce")
+    values["date"], checks["date"] = dates.dt.date, dates.notna()
+    values["avg_temp"], checks["avg_temp"] = _number(_column(frame, "avg_temp"), -80, 150)
+    values["rainfall_mm"], checks["rainfall_mm"] = _number(_column(frame, "rainfall_mm"), 0)
+    values["weather_score"], checks["weather_score"] = _number(_column(frame, "weather_score"), -1, 1)
+    weather_type = _column(frame, "weather_type")
+    blank = _blank(weather_type)
+    values["weather_type"] = weather_type.astype(str).str.strip().str.lower().where(~blank)
+    checks["weather_type"] = blank | (values["weather_type"].str.len() <= 32)
+    return pd.DataFrame(values), pd.DataFrame(checks)
+
+
+LOADERS = {
+    # kind: (model, unique key, row builder)
+    "econ": (models.EconMonth, ["year", "month"], _econ_rows),
+    "weather": (models.WeatherDay, ["date"], _weather_rows),
+}
+
+
+def load_chunk(db: Session, kind: str, frame: pd.DataFrame, first_line: int, report: LoadReport, zip_code: Optional[str] = None):
+    """Validate and upsert one chunk, updating the report. Commits."""
+    model, key, build = LOADERS[kind]
+    frame = frame.reset_index(drop=True)
+    frame.index = frame.index + first_line
+    report.rows += len(frame)
+    zip_column = next((c for c in ("zip", "zip_code", "zipcode") if c in frame.columns), None)
+    if zip_column is not None:
+        zips = frame[zip_column].astype(str).str.strip().str[:5]
+        if zip_code is not None:
+            keep = zips == zip_code
+            report.skipped += int((~keep).sum())
+            frame = frame[keep]
+        elif zips.nunique() > 1:
+            report.mixed_zip_codes = True
+    if frame.empty:
+        return
+
+    values, checks = build(frame)
+    valid = checks.all(axis=1)
+    for line, row in checks[~valid].iterrows():
+        report.reject(int(line), "invalid " + ", ".join(c for c in checks.columns if not row[c]))
+
+    # Only columns the file has are written, so a partial file does not wipe the others
+    present = [c for c in values.columns if c in key or c in frame.columns]
+    values = values.loc[valid, present].drop_duplicates(subset=key, keep="last")
+    if values.empty:
+        return
+    for column in ("year", "month"):
+        if column in values.columns:
+            values[column] = values[column].astype(int)
+    values = values.astype(object).where(values.notna(), None)
+    crud.bulk_upsert(db, model, values.to_dict("records"), index_elements=key, chunk_size=1000)
+    db.commit()
+    report.loaded += len(values)
+
+
+def load_file(
+    db: Session,
+    kind: str,
+    path: str,
+    file_format: Optional[str] = None,
+    chunk_rows: int = CHUNK_ROWS,
+    zip_code: Optional[str] = None
+) -> LoadReport:
+    """
+    Stream an econ or weather file into its table.
+
+    Args:
+        kind: econ or weather
+        path: CSV or NDJSON file
+        file_format: csv or ndjson; default from the file extension
+        chunk_rows: Rows per chunk (and per commit)
+        zip_code: Weather only, keep rows of this ZIP code
+
+    Returns:
+        LoadReport with row counts, rejected lines and timing
+    """
+    if kind not in LOADERS:
+        raise ValueError(f"Unknown kind {kind!r}. Expected one of: {', '.join(KINDS)}")
+    source = Path(path)
+    report = LoadReport(kind=kind)
+    started = time.perf_counter()
+    for frame, first_line in read_chunks(source, _file_format(source, file_format), chunk_rows):
+        load_chunk(db, kind, frame, first_line, report, zip_code)
+    report.seconds = time.perf_counter() - started
+    return report
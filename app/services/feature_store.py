@@ -0,0 +1,249 @@
+"""
+Dense external-factor feature matrices for forecasting models.
+
+build_feature_matrix() turns CalendarDay, WeatherDay, LocalEvent and
+EconMonth rows for a date range into one float64 matrix, a row per day and a
+column per FEATURE_COLUMNS entry, ready to pass as exogenous regressors:
+
+- season_*: one-hot season
+- is_weekend, is_holiday, is_payday: 0/1 flags
+- weather_score: -1..1, 0 when there is no weather row
+- total_event_impact: summed local event impact, 0 without events
+- inflation_rate, gas_price_index, consumer_confidence: the month's values,
+  forward-filled from the last month that had them (back-filled before the
+  first one, 0 when there is no econ data at all)
+
+Days without a calendar row get weekend, payday and season from the date and
+no holiday, so the matrix is always dense.
+
+Matrices are cached by range (FEATURE_CACHE_SIZE entries, default 64;
+FEATURE_CACHE_TTL seconds, default 3600; 0 disables) and a range inside a
+cached one is served as a slice. Commits in this process that write any
+factor table clear the cache. Cached arrays are read-only; copy before
+modifying.
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Optional
+import numpy as np
+from sqlalchemy import select, or_, and_
+from sqlalchemy.orm import Session
+from app import models
+from app.services.dashboard_cache import on_tables_committed
+from app.services.external_factors import FACTOR_TABLES, fetch_factor_days
+from app.services.price_forecast import SEASON_BY_MONTH
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SEASONS = ("winter", "spring", "summer", "fall")
+ECON_COLUMNS = ("inflation_rate", "gas_price_index", "consumer_confidence")
+FEATURE_COLUMNS = (
+    *(f"season_{s}" for s in SEASONS),
+    "is_weekend",
+    "is_holiday",
+    "is_payday",
+    "weather_score",
+    "total_event_impact",
+    *ECON_COLUMNS,
+)
+FEATURE_TABLES = FACTOR_TABLES | {"econ_months"}
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    """Features for consecutive days: values[i] belongs to dates[i]."""
+    dates: np.ndarray  # datetime64[D]
+    values: np.ndarray  # len(dates) x len(columns), float64
+    columns: tuple[str, ...] = FEATURE_COLUMNS
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, self.columns.index(name)]
+
+    def slice(self, start: date, end: date) -> FeatureMatrix:
+        """Rows for [start, end], which must lie inside this matrix (a view, no copy)."""
+        first = int((np.datetime64(start, "D") - self.dates[0]).astype(np.int64))
+        stop = first + (end - start).days + 1
+        return FeatureMatrix(self.dates[first:stop], self.values[first:stop], self.columns)
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame with a ds column (Prophet's convention) and one column per feature."""
+        import pandas as pd
+        frame = pd.DataFrame(self.values, columns=list(self.columns))
+        frame.insert(0, "ds", pd.to_datetime(self.dates))
+        return frame
+
+
+class FeatureCache:
+    """TTL + LRU cache of feature matrices keyed by (start, end)."""
+
+    def __init__(self, ttl_seconds: float = 3600.0, max_entries: int = 64):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[date, date], tuple[float, FeatureMatrix]] = OrderedDict()
+        # Bumped on every clear, so a matrix built across a commit is not stored
+        self.generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, start: date, end: date) -> Optional[FeatureMatrix]:
+        """The cached matrix for the range, or a slice of one that covers it."""
+        now = time.monotonic()
+        with self._lock:
+            for key in list(self._entries):
+                expires, matrix = self._entries[key]
+                if expires <= now:
+                    del self._entries[key]
+                    continue
+                if key[0] <= start and end <= key[1]:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return matrix if key == (start, end) else matrix.slice(start, end)
+            self.misses += 1
+            return None
+
+    def put(self, start: date, end: date, matrix: FeatureMatrix, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[(start, end)] = (time.monotonic() + self.ttl_seconds, matrix)
+            self._entries.move_to_end((start, end))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+feature_cache = FeatureCache(
+    ttl_seconds=float(os.getenv("FEATURE_CACHE_TTL", "3600")),
+    max_entries=int(os.getenv("FEATURE_CACHE_SIZE", "64")),
+)
+
+
+@on_tables_committed
+def _clear_on_write(tables: set[str]):
+    if tables & FEATURE_TABLES:
+        feature_cache.clear()
+
+
+def _econ_features(db: Session, months: np.ndarray) -> np.ndarray:
+    """
+    Econ values per day, forward-filled by month.
+
+    Args:
+        months: datetime64[M] month of each day
+
+    Returns:
+        len(months) x len(ECON_COLUMNS) array
+    """
+    last = months[-1].astype(object)
+    em = models.EconMonth
+    # Everything up to the last month: months before the range seed the forward fill
+    rows = db.execute(
+        select(em.year, em.month, *(getattr(em, c) for c in ECON_COLUMNS))
+        .where(or_(em.year < last.year, and_(em.year == last.year, em.month <= last.month)))
+        .order_by(em.year, em.month)
+    ).all()
+    row_months = np.array([f"{r.year:04d}-{r.month:02d}" for r in rows], dtype="datetime64[M]")
+
+    span_start = min(row_months[0], months[0]) if len(rows) else months[0]
+    table = np.full((int((months[-1] - span_start).astype(np.int64)) + 1, len(ECON_COLUMNS)), np.nan)
+    if len(rows):
+        table[(row_months - span_start).astype(np.int64)] = np.array(
+            [[float(v) if v is not None else np.nan for v in r[2:]] for r in rows]
+        )
+
+    # Per column: forward fill down the months, back fill before the first value
+    positions = np.arange(len(table))
+    for j in range(table.shape[1]):
+        known = ~np.isnan(table[:, j])
+        if not known.any():
+            table[:, j] = 0.0
+            continue
+        source = np.maximum.accumulate(np.where(known, positions, -1))
+        source[source < 0] = np.argmax(known)
+        table[:, j] = table[source, j]
+    return table[(months - span_start).astype(np.int64)]
+
+
+def build_feature_matrix(db: Session, start: date, end: date, use_cache: bool = True) -> FeatureMatrix:
+    """
+    Feature matrix for every day in [start, end].
+
+    Four queries per build (three factor range queries and one econ query);
+    cached builds cost none.
+
+    Raises:
+        ValueError: If start is after end
+    """
+    if start > end:
+        raise ValueError("start must be <= end")
+    if use_cache and feature_cache.enabled:
+        cached = feature_cache.get(start, end)
+        if cached is not None:
+            return cached
+    generation = feature_cache.generation
+
+    dates = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    months = dates.astype("datetime64[M]")
+    month_index = months.astype(np.int64) % 12  # January = 0
+    day_of_month = (dates - months.astype("datetime64[D]")).astype(np.int64) + 1
+
+    # Calendar-derived defaults, overwritten where a calendar row exists
+    season = np.asarray(SEASON_BY_MONTH, dtype=object)[month_index]
+    is_weekend = ((dates.astype(np.int64) + 3) % 7 >= 5).astype(float)  # 1970-01-01 was a Thursday
+    is_holiday = np.zeros(len(dates))
+    is_payday = np.isin(day_of_month, (1, 15)).astype(float)
+    weather_score = np.zeros(len(dates))
+    event_impact = np.zeros(len(dates))
+
+    for i, row in enumerate(fetch_factor_days(db, start, end).values()):
+        if row is None:
+            continue
+        season[i] = row["season"]
+        is_weekend[i] = row["is_weekend"]
+        is_holiday[i] = row["is_holiday"]
+        is_payday[i] = row["is_payday"]
+        weather_score[i] = row["weather_score"] or 0.0
+        event_impact[i] = row["total_event_impact"]
+
+    values = np.column_stack([
+        *((season == s).astype(float) for s in SEASONS),
+        is_weekend,
+        is_holiday,
+        is_payday,
+        weather_score,
+        event_impact,
+        _econ_features(db, months),
+    ])
+    dates.flags.writeable = False
+    values.flags.writeable = False
+    matrix = FeatureMatrix(dates, values)
+    if use_cache and feature_cache.enabled:
+        feature_cache.put(start, end, matrix, generation)
+    return matrix
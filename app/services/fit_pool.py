@@ -0,0 +1,57 @@
+"""
+Process pool shared by the batch model fitting jobs.
+
+Batch price forecasts (Prophet fits) and the demand forecast run submit their
+CPU-bound fits here, so the process runs one pool of FORECAST_WORKERS workers
+(default one per CPU) however many jobs use it. The pool is created on first
+use and stopped on application shutdown or at the end of a CLI run.
+
+A worker that dies (crash, OOM kill) breaks the whole pool: callers catch
+BrokenProcessPool, drop the pool with shutdown_fit_pool(pool) and the next
+call starts a fresh one.
+"""
+from __future__ import annotations
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_fit_pool: Optional[ProcessPoolExecutor] = None
+_fit_pool_lock = threading.Lock()
+
+
+def forecast_worker_count() -> int:
+    """Process pool size: FORECAST_WORKERS if set, otherwise one worker per CPU."""
+    configured = os.getenv("FORECAST_WORKERS", "").strip()
+    return max(1, int(configured)) if configured else (os.cpu_count() or 1)
+
+
+def get_fit_pool() -> ProcessPoolExecutor:
+    """The shared fitting pool, created on first use."""
+    global _fit_pool
+    with _fit_pool_lock:
+        if _fit_pool is None:
+            # spawn, not fork: API workers are multi-threaded
+            _fit_pool = ProcessPoolExecutor(
+                max_workers=forecast_worker_count(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _fit_pool
+
+
+def shutdown_fit_pool(pool: Optional[ProcessPoolExecutor] = None):
+    """
+    Stop the fitting pool (called on application shutdown).
+
+    Args:
+        pool: Only stop it if it is still the shared pool; used to drop a
+            broken pool without stopping one another thread already replaced
+            it with
+    """
+    global _fit_pool
+    with _fit_pool_lock:
+        if _fit_pool is None or (pool is not None and _fit_pool is not pool):
+            return
+        stopped, _fit_pool = _fit_pool, None
+    stopped.shutdown(cancel_futures=True)
@@ -0,0 +1,180 @@
+"""
+Two-tier cache for fitted price forecast models.
+
+Tier 1 is an in-memory LRU of fitted models and their forecast frames.
+Tier 2 is an on-disk store of serialized Prophet models, so a restarted worker
+only has to predict (cheap) instead of refitting (expensive).
+
+Entries are keyed by (item_id, vendor, latest history date, row count), which
+changes whenever new price history lands for a series.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Any, Optional
+
+CacheKey = tuple[int, Optional[str], date, int]
+
+
+def _vendor_tag(vendor: Optional[str]) -> str:
+    """Filesystem-safe tag for a vendor name ("any" when unfiltered)."""
+    if vendor is None:
+        return "any"
+    return hashlib.sha1(vendor.encode("utf-8")).hexdigest()[:12]
+
+
+class ForecastCache:
+    """LRU of (model, forecast frame) backed by serialized models on disk."""
+
+    def __init__(self, max_entries: int = 1024, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: OrderedDict[CacheKey, tuple[Any, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key_for(item_id: int, vendor: Optional[str], price_df) -> CacheKey:
+        """Build the cache key for a price history frame."""
+        return (item_id, vendor, price_df["date"].max(), len(price_df))
+
+    def get(self, key: CacheKey, periods: int):
+        """
+        Look up a forecast frame for key.
+
+        Falls back to the disk tier on a memory miss; a disk hit re-predicts
+        from the stored model and is promoted into memory.
+
+        Returns:
+            Forecast DataFrame, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and len(entry[1]) == periods:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        model = self._load_model(key)
+        if model is not None:
+            from app.services.price_forecast import predict_prophet
+            forecast_df = predict_prophet(model, periods)
+            self._remember(key, model, forecast_df)
+            with self._lock:
+                self.disk_hits += 1
+            return forecast_df
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: CacheKey, forecast_df, model=None, model_json: Optional[str] = None):
+        """
+        Store a forecast frame, and its fitted model when there is one.
+
+        Only Prophet models are written to disk; simple forecasts are cheap
+        enough to live in memory only. Pass model_json when the model was
+        fitted (and serialized) in another process.
+        """
+        self._remember(key, model, forecast_df)
+        if self.cache_dir is None:
+            return
+        if model_json is None and model is not None:
+            from prophet.serialize import model_to_json
+            model_json = model_to_json(model)
+        if model_json is not None:
+            self._write_model(key, model_json)
+
+    def invalidate(self, item_id: int, vendor: Optional[str] = None):
+        """
+        Drop every entry for an item's series after new price history.
+
+        Entries for the given vendor and the unfiltered ("any vendor") series
+        are both dropped, in memory and on disk.
+        """
+        vendors = {None, vendor}
+        with self._lock:
+            stale = [k for k in self._entries if k[0] == item_id and k[1] in vendors]
+            for k in stale:
+                del self._entries[k]
+            self.invalidations += len(stale)
+        if self.cache_dir is not None and self.cache_dir.exists():
+            for v in vendors:
+                for path in self.cache_dir.glob(f"{item_id}-{_vendor_tag(v)}-*.json"):
+                    path.unlink(missing_ok=True)
+
+    def clear(self):
+        """Empty the memory tier (the disk tier is left in place)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remember(self, key: CacheKey, model, forecast_df):
+        with self._lock:
+            self._entries[key] = (model, forecast_df)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _path(self, key: CacheKey) -> Path:
+        item_id, vendor, latest, count = key
+        return self.cache_dir / f"{item_id}-{_vendor_tag(vendor)}-{latest:%Y%m%d}-{count}.json"
+
+    def _write_model(self, key: CacheKey, model_json: str):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"key": [key[0], key[1], key[2].isoformat(), key[3]], "model": model_json}), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Warning: could not write forecast cache entry: {e}")
+
+    def _load_model(self, key: CacheKey):
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            from prophet.serialize import model_from_json
+            return model_from_json(json.loads(path.read_text(encoding="utf-8"))["model"])
+        except Exception as e:
+            print(f"Warning: dropping unreadable forecast cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+
+def _cache_dir() -> Optional[str]:
+    """FORECAST_CACHE_DIR, defaulting to ./.forecast_cache; set it empty to disable the disk tier."""
+    return os.getenv("FORECAST_CACHE_DIR", "./.forecast_cache").strip() or None
+
+
+forecast_cache = ForecastCache(
+    max_entries=int(os.getenv("FORECAST_CACHE_SIZE", "1024")),
+    cache_dir=_cache_dir(),
+)
@@ -0,0 +1,215 @@
+"""
+Registry of layer-1 price forecast engines, keyed by model_version.
+
+The model_version is the same string stored on Forecast rows, so every stored
+forecast says which engine produced it. Built-in engines:
+
+- price-v1: Prophet, falling back to simple for short series (fitted models
+  are cached; seconds per fit)
+- simple-v1: moving average plus linear trend, vectorized over many series
+- snaive-v1: seasonal naive (same weekday last week)
+- holt-damped-v1: Holt's linear trend with a damped trend
+- ets-weekly-v1: additive ETS with weekly seasonality, ETS(A,N,A)
+- holt-v1: incremental Holt read from persisted state (see holt_state)
+
+The NumPy engines work on a daily grid (the last known price carries forward
+between purchases) and cost well under a millisecond per series.
+
+Engines can be chosen per request (model_version) or per category with
+FORECAST_ENGINE_BY_CATEGORY, e.g. "produce=ets-weekly-v1,meat=holt-damped-v1".
+"""
+from __future__ import annotations
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional
+import numpy as np
+from app.services import holt_state
+
+DEFAULT_MODEL_VERSION = "price-v1"
+
+# Smoothing parameters for the NumPy engines
+SEASON_DAYS = 7
+DAMPED_ALPHA = 0.3
+DAMPED_BETA = 0.1
+DAMPED_PHI = 0.9
+ETS_ALPHA = 0.2
+ETS_GAMMA = 0.1
+
+# (dates as datetime64[D], prices) in date order -> periods x 3 (forecast, low_ci, high_ci)
+ForecastFn = Callable[[np.ndarray, np.ndarray, int], np.ndarray]
+BatchFn = Callable[[list[tuple[np.ndarray, np.ndarray]], int], list[np.ndarray]]
+
+
+@dataclass(frozen=True)
+class ForecastEngine:
+    """A layer-1 forecaster registered under a model_version."""
+    model_version: str
+    description: str
+    forecast: ForecastFn
+    # Optional vectorized path for many series at once
+    batch: Optional[BatchFn] = None
+    # Expensive fits: results go through forecast_cache and the fit pool
+    cached: bool = False
+    # Served from persisted incremental state rather than history
+    stateful: bool = False
+
+    def forecast_many(self, series: list[tuple[np.ndarray, np.ndarray]], periods: int = 30) -> list[np.ndarray]:
+        """Forecast many (dates, prices) series."""
+        if self.batch is not None:
+            return self.batch(series, periods)
+        return [self.forecast(dates, prices, periods) for dates, prices in series]
+
+
+ENGINES: dict[str, ForecastEngine] = {}
+
+
+def register_engine(engine: ForecastEngine) -> ForecastEngine:
+    """Add (or replace) an engine in the registry."""
+    ENGINES[engine.model_version] = engine
+    return engine
+
+
+def get_engine(model_version: str) -> ForecastEngine:
+    """Look up an engine, raising ValueError for unknown versions."""
+    engine = ENGINES.get(model_version)
+    if engine is None:
+        raise ValueError(f"Unknown model_version {model_version!r}. Expected one of: {', '.join(ENGINES)}")
+    return engine
+
+
+def _parse_category_engines(spec: str) -> dict[str, str]:
+    """Parse "category=model_version,..." (FORECAST_ENGINE_BY_CATEGORY), dropping bad entries."""
+    mapping = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        category, _, version = (p.strip() for p in part.partition("="))
+        if version not in ENGINES:
+            print(f"Warning: ignoring FORECAST_ENGINE_BY_CATEGORY entry {part!r} (unknown engine)")
+            continue
+        mapping[category] = version
+    return mapping
+
+
+def select_engine(category: Optional[str]) -> ForecastEngine:
+    """Engine for a category: its configured engine, otherwise the default."""
+    return ENGINES[CATEGORY_ENGINES.get(category, DEFAULT_MODEL_VERSION)]
+
+
+def daily_series(dates: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """
+    Prices on a daily grid from the first to the last observation.
+
+    The last price of a day wins and days without a purchase carry the
+    previous price forward.
+    """
+    days = (dates - dates[0]).astype(int)
+    grid = np.full(days[-1] + 1, np.nan)
+    grid[days] = prices
+    filled = np.where(np.isnan(grid), 0, np.arange(len(grid)))
+    np.maximum.accumulate(filled, out=filled)
+    return grid[filled]
+
+
+def _bands(forecast: np.ndarray, variance: np.ndarray) -> np.ndarray:
+    band = 1.96 * np.sqrt(variance)
+    return np.column_stack((forecast, forecast - band, forecast + band))
+
+
+def seasonal_naive(dates: np.ndarray, prices: np.ndarray, periods: int = 30) -> np.ndarray:
+    """Repeat the last week; bands widen with each further week ahead."""
+    y = daily_series(dates, prices)
+    season = min(SEASON_DAYS, len(y))
+    h = np.arange(periods)
+    forecast = y[-season:][h % season]
+    resid = y[season:] - y[:-season]
+    sigma2 = float(np.mean(resid ** 2)) if resid.size else 0.0
+    return _bands(forecast, sigma2 * (h // season + 1))
+
+
+def damped_holt(dates: np.ndarray, prices: np.ndarray, periods: int = 30) -> np.ndarray:
+    """Holt's linear method with a damped trend, ETS(A,Ad,N)."""
+    y = daily_series(dates, prices)
+    alpha, beta, phi = DAMPED_ALPHA, DAMPED_BETA, DAMPED_PHI
+    level = y[0]
+    trend = y[1] - y[0] if len(y) > 1 else 0.0
+    sse = 0.0
+    for value in y[1:]:
+        predicted = level + phi * trend
+        error = value - predicted
+        sse += error * error
+        level = predicted + alpha * error
+        trend = phi * trend + alpha * beta * error
+    sigma2 = sse / max(len(y) - 1, 1)
+
+    h = np.arange(1, periods + 1)
+    damped = np.cumsum(phi ** h)  # phi + phi^2 + ... + phi^h
+    forecast = level + damped * trend
+    # h-step variance: sigma^2 * (1 + sum_{j<h} (alpha * (1 + beta * damped_j))^2)
+    steps = (alpha * (1 + beta * damped[:-1])) ** 2
+    return _bands(forecast, sigma2 * (1 + np.concatenate(([0.0], np.cumsum(steps)))))
+
+
+def ets_weekly(dates: np.ndarray, prices: np.ndarray, periods: int = 30) -> np.ndarray:
+    """
+    Additive level plus weekly seasonality, ETS(A,N,A).
+
+    Needs two weeks of daily history; shorter series use damped_holt.
+    """
+    y = daily_series(dates, prices)
+    season = SEASON_DAYS
+    if len(y) < 2 * season:
+        return damped_holt(dates, prices, periods)
+    alpha, gamma = ETS_ALPHA, ETS_GAMMA
+    level = y[:season].mean()
+    seasonal = y[:season] - level  # indexed by day position mod season
+    sse = 0.0
+    for t in range(season, len(y)):
+        s = seasonal[t % season]
+        error = y[t] - (level + s)
+        sse += error * error
+        level += alpha * error
+        seasonal[t % season] = s + gamma * error
+    sigma2 = sse / (len(y) - season)
+
+    h = np.arange(1, periods + 1)
+    forecast = level + seasonal[(len(y) - 1 + h) % season]
+    # h-step variance: sigma^2 * (1 + (h-1) alpha^2 + k gamma (2 alpha + gamma)), k = whole seasons
+    variance = sigma2 * (1 + (h - 1) * alpha ** 2 + ((h - 1) // season) * gamma * (2 * alpha + gamma))
+    return _bands(forecast, variance)
+
+
+def _simple_batch(series: list[tuple[np.ndarray, np.ndarray]], periods: int = 30) -> list[np.ndarray]:
+    from app.services.price_forecast import forecast_prices_simple_matrix, stack_price_series
+    matrix = stack_price_series([prices for _, prices in series])
+    return list(np.stack(forecast_prices_simple_matrix(matrix, periods), axis=-1))
+
+
+def _simple(dates: np.ndarray, prices: np.ndarray, periods: int = 30) -> np.ndarray:
+    return _simple_batch([(dates, prices)], periods)[0]
+
+
+def _prophet(dates: np.ndarray, prices: np.ndarray, periods: int = 30) -> np.ndarray:
+    import pandas as pd
+    from app.services.price_forecast import fit_price_model, _layer1_array
+    df = pd.DataFrame({"date": dates.astype(object), "unit_price": prices})
+    return _layer1_array(fit_price_model(df, periods)[0])
+
+
+def _holt_replay(dates: np.ndarray, prices: np.ndarray, periods: int = 30) -> np.ndarray:
+    """holt-v1 from history (what the persisted state would hold)."""
+    state = holt_state.HoltState(item_id=0, vendor="", level=float(prices[0]))
+    for obs_date, price in zip(dates.astype(object), prices):
+        holt_state.update_state(state, float(price), obs_date, 0, "")
+    return holt_state.forecast_from_state(state, periods)
+
+
+register_engine(ForecastEngine(DEFAULT_MODEL_VERSION, "Prophet (simple fallback under 10 points)", _prophet, cached=True))
+register_engine(ForecastEngine("simple-v1", "Moving average plus linear trend, ±10% bands", _simple, batch=_simple_batch))
+register_engine(ForecastEngine("snaive-v1", "Seasonal naive, weekly", seasonal_naive))
+register_engine(ForecastEngine("holt-damped-v1", "Holt linear trend, damped", damped_holt))
+register_engine(ForecastEngine("ets-weekly-v1", "Additive ETS with weekly seasonality", ets_weekly))
+register_engine(ForecastEngine(holt_state.HOLT_MODEL_VERSION, "Incremental Holt from persisted state", _holt_replay, stateful=True))
+
+# Per-category routing; parsed after registration so entries can be validated
+CATEGORY_ENGINES: dict[str, str] = _parse_category_engines(os.getenv("FORECAST_ENGINE_BY_CATEGORY", ""))
@@ -0,0 +1,152 @@
+"""
+Materialized price forecasts stored in the Forecast table.
+
+The nightly job (python -m app.materialize_forecasts) writes 7/14/30-day
+price forecasts per product under a model_version. Dashboards read the latest
+rows here and only forecast live when a row is missing or stale.
+
+Unless PRICE_FORECAST_MODEL_VERSION pins one engine, each product uses its
+category's engine (FORECAST_ENGINE_BY_CATEGORY, otherwise price-v1), both
+when materializing and when reading, the same choice forecast_item_prices
+makes for model_version=None.
+"""
+from __future__ import annotations
+import os
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from app import models
+from app.services import forecast_engines
+from app.services.price_forecast import (
+    forecast_item_prices,
+    calculate_volatility_multiplier,
+    calculate_shelf_life_factor,
+)
+
+# None: per-category engine
+PRICE_MODEL_VERSION = os.getenv("PRICE_FORECAST_MODEL_VERSION", "").strip() or None
+HORIZONS = (7, 14, 30)
+MAX_AGE_DAYS = int(os.getenv("FORECAST_MAX_AGE_DAYS", "1"))
+
+
+def get_materialized_price_forecasts(
+    db: Session,
+    product_ids: list[int],
+    model_version: str,
+    max_age_days: int = MAX_AGE_DAYS,
+    today: Optional[date] = None
+) -> dict[int, tuple[date, datetime, dict[int, float]]]:
+    """
+    Latest materialized forecasts for many products in one query.
+
+    Only runs from the last `max_age_days` days that cover every horizon are
+    returned.
+
+    Returns:
+        Dict product_id -> (forecast date, when the run was written,
+        {horizon_days: price})
+    """
+    if not product_ids:
+        return {}
+    oldest = (today or date.today()) - timedelta(days=max_age_days)
+    fc = models.Forecast
+    rows = db.execute(
+        select(fc.product_id, fc.date, fc.created_at, fc.horizon_days, fc.forecast_qty)
+        .where(
+            fc.product_id.in_(product_ids),
+            fc.location_id == 0,
+            fc.model_version == model_version,
+            fc.horizon_days.in_(HORIZONS),
+            fc.date >= oldest
+        )
+        .order_by(fc.date)
+    ).all()
+
+    # Later dates overwrite earlier ones
+    runs: dict[int, tuple[date, datetime, dict[int, float]]] = {}
+    for product_id, run_date, written_at, horizon, value in rows:
+        current = runs.get(product_id)
+        if current is None or current[0] < run_date:
+            current = runs[product_id] = (run_date, written_at, {})
+        elif written_at < current[1]:
+            # The run is only as fresh as its oldest horizon
+            current = runs[product_id] = (run_date, written_at, current[2])
+        current[2][horizon] = float(value)
+    return {pid: run for pid, run in runs.items() if len(run[2]) == len(HORIZONS)}
+
+
+def _is_stale(run: tuple[date, datetime, dict[int, float]], latest: models.LatestPrice) -> bool:
+    """Whether the item's latest price arrived after the run was written (or is dated after it)."""
+    run_date, written_at, _ = run
+    if run_date < latest.date:
+        return True
+    # SQLite keeps CURRENT_TIMESTAMP to the second, so a tie counts as stale
+    return latest.updated_at is not None and written_at.replace(microsecond=0) <= latest.updated_at
+
+
+def engine_version(category: Optional[str], model_version: Optional[str] = PRICE_MODEL_VERSION) -> str:
+    """The model_version a product's forecasts are stored under: the pinned one, else its category's engine."""
+    return model_version or forecast_engines.select_engine(category).model_version
+
+
+def get_price_forecasts(
+    db: Session,
+    latest_prices: dict[int, models.LatestPrice],
+    model_version: Optional[str] = PRICE_MODEL_VERSION
+) -> dict[int, dict]:
+    """
+    Price forecasts for dashboard tables, preferring materialized rows.
+
+    A materialized run is stale when it is older than MAX_AGE_DAYS, or when
+    the item's latest price is dated after the run or was stored after the
+    run was written (a price added later on the run's own day). Missing or
+    stale items are forecast live in one batch.
+
+    Args:
+        latest_prices: product_id -> latest price record (crud.get_latest_prices)
+        model_version: Engine for every product; None picks each product's
+            category engine (one materialized query per engine in use)
+
+    Returns:
+        Dict product_id -> {next_7_day_price, next_14_day_price,
+        next_30_day_price, vendor_volatility_multiplier, shelf_life_multiplier,
+        source}. Items that cannot be forecast are left out.
+    """
+    by_version: dict[str, list[int]] = {}
+    for product_id, latest in latest_prices.items():
+        by_version.setdefault(engine_version(latest.category, model_version), []).append(product_id)
+    materialized = {}
+    for version, product_ids in by_version.items():
+        materialized.update(get_materialized_price_forecasts(db, product_ids, version))
+    vendor_vols = {v.vendor: v for v in db.execute(select(models.VendorVolatility)).scalars().all()}
+
+    results = {}
+    live = []
+    for product_id, latest in latest_prices.items():
+        run = materialized.get(product_id)
+        if run is None or _is_stale(run, latest):
+            live.append((product_id, latest.vendor))
+            continue
+        prices = run[2]
+        results[product_id] = {
+            "next_7_day_price": prices[7],
+            "next_14_day_price": prices[14],
+            "next_30_day_price": prices[30],
+            "vendor_volatility_multiplier": round(calculate_volatility_multiplier(vendor_vols.get(latest.vendor)), 4),
+            "shelf_life_multiplier": round(calculate_shelf_life_factor(latest.shelf_life_days), 4),
+            "source": "materialized",
+        }
+
+    for outcome in forecast_item_prices(db, live, model_version) if live else []:
+        forecast = outcome["forecast"]
+        if forecast:
+            results[outcome["item_id"]] = {
+                "next_7_day_price": forecast["next_7_day_price"],
+                "next_14_day_price": forecast["next_14_day_price"],
+                "next_30_day_price": forecast["next_30_day_price"],
+                "vendor_volatility_multiplier": forecast["vendor_volatility_multiplier"],
+                "shelf_life_multiplier": forecast["shelf_life_multiplier"],
+                "source": "live",
+            }
+    return results
@@ -0,0 +1,271 @@
+"""
+Incremental Holt (level + trend) price forecaster.
+
+Each (item, vendor) series keeps a small persisted state: level, trend and
+one-step-ahead residual variance. Every price history insert updates the state
+in O(1), so a forecast is a constant-time read instead of a refit over the
+whole history. Runs under its own model_version ("holt-v1").
+
+Gaps between observations are handled by stepping the trend over the number
+of elapsed days; further prices on the same day only adjust the level.
+Out-of-order inserts replay that one series.
+"""
+from __future__ import annotations
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, insert, tuple_
+from app import models
+
+HOLT_MODEL_VERSION = "holt-v1"
+ALPHA = 0.3  # level smoothing
+BETA = 0.1  # trend smoothing
+VAR_MIN_WEIGHT = 0.05  # residual variance: running mean at first, then EWMA
+
+
+@dataclass
+class HoltState:
+    """In-memory state, same attributes as models.PriceForecastState."""
+    item_id: int
+    vendor: str
+    level: float
+    trend: float = 0.0
+    resid_var: float = 0.0
+    n_obs: int = 0
+    last_date: Optional[date] = None
+    last_price: float = 0.0
+    shelf_life_days: int = 0
+    category: str = ""
+
+
+def update_state(state, price: float, obs_date: date, shelf_life_days: int, category: str):
+    """
+    Fold one observation into a state in place (O(1)).
+
+    Works on HoltState and models.PriceForecastState alike. Observations must
+    arrive in date order. A further observation on the state's last date is
+    blended into the level without a time step: trend, residual variance and
+    n_obs are left as they are.
+    """
+    if state.n_obs == 0:
+        state.level = price
+        state.trend = 0.0
+        state.resid_var = 0.0
+        state.n_obs = 1
+    elif obs_date <= state.last_date:
+        state.level = ALPHA * price + (1 - ALPHA) * state.level
+    else:
+        gap = (obs_date - state.last_date).days
+        predicted = state.level + state.trend * gap
+        error = price - predicted
+        new_level = ALPHA * price + (1 - ALPHA) * predicted
+        state.trend = BETA * (new_level - state.level) / gap + (1 - BETA) * state.trend
+        state.level = new_level
+        weight = max(1.0 / state.n_obs, VAR_MIN_WEIGHT)
+        state.resid_var = (1 - weight) * state.resid_var + weight * error * error
+        state.n_obs += 1
+    state.last_date = obs_date
+    state.last_price = price
+    state.shelf_life_days = shelf_life_days
+    state.category = category
+
+
+def forecast_from_state(state, periods: int = 30) -> np.ndarray:
+    """
+    Forecast the next `periods` days from a state.
+
+    Returns:
+        periods x 3 array of (forecast, low_ci, high_ci) with 95% bands
+    """
+    h = np.arange(1, periods + 1)
+    forecast = state.level + state.trend * h
+    # Holt h-step variance: sigma^2 * (1 + sum_{j<h} (alpha * (1 + j * beta))^2)
+    growth = np.concatenate(([0.0], np.cumsum((ALPHA * (1 + h[:-1] * BETA)) ** 2)))
+    band = 1.96 * np.sqrt(float(state.resid_var) * (1 + growth))
+    return np.column_stack((forecast, forecast - band, forecast + band))
+
+
+def _replay(rows) -> dict[tuple[int, str], HoltState]:
+    """Build states from (item_id, vendor, date, unit_price, shelf_life_days, category) rows in date order."""
+    states: dict[tuple[int, str], HoltState] = {}
+    for item_id, vendor, obs_date, price, shelf_life_days, category in rows:
+        state = states.get((item_id, vendor))
+        if state is None:
+            state = states[(item_id, vendor)] = HoltState(item_id=item_id, vendor=vendor, level=float(price))
+        update_state(state, float(price), obs_date, shelf_life_days, category)
+    return states
+
+
+def _history_rows(db: Session, item_id: Optional[int] = None, vendor: Optional[str] = None):
+    ph = models.PriceHistory
+    stmt = select(ph.item_id, ph.vendor, ph.date, ph.unit_price, ph.shelf_life_days, ph.category)
+    if item_id is not None:
+        stmt = stmt.where(ph.item_id == item_id, ph.vendor == vendor)
+    stmt = stmt.order_by(ph.item_id, ph.vendor, ph.date, ph.id).execution_options(yield_per=10000)
+    return db.execute(stmt)
+
+
+def _state_row(state: HoltState) -> dict:
+    return {
+        "item_id": state.item_id,
+        "vendor": state.vendor,
+        "model_version": HOLT_MODEL_VERSION,
+        "level": state.level,
+        "trend": state.trend,
+        "resid_var": state.resid_var,
+        "n_obs": state.n_obs,
+        "last_date": state.last_date,
+        "last_price": state.last_price,
+        "shelf_life_days": state.shelf_life_days,
+        "category": state.category,
+    }
+
+
+def rebuild_states(db: Session) -> int:
+    """
+    Replay all price history into fresh states (streamed, one pass).
+
+    Returns:
+        Number of series rebuilt
+    """
+    states = _replay(_history_rows(db))
+    db.execute(delete(models.PriceForecastState).where(models.PriceForecastState.model_version == HOLT_MODEL_VERSION))
+    rows = [_state_row(s) for s in states.values()]
+    for start in range(0, len(rows), 5000):
+        db.execute(insert(models.PriceForecastState), rows[start:start + 5000])
+    db.commit()
+    return len(rows)
+
+
+def _insert_states(db: Session, states: list[HoltState]):
+    """
+    Store states of series that had none.
+
+    An upsert, so a concurrent insert of the same new series updates the row
+    instead of failing the caller's transaction on uq_pfs_item_vendor_version.
+    """
+    from app import crud
+    crud.bulk_upsert(db, models.PriceForecastState, [_state_row(s) for s in states], ["item_id", "vendor", "model_version"])
+
+
+def backfill_if_empty():
+    """Build states on first start against a database that already has price history."""
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        pfs = models.PriceForecastState
+        if db.execute(select(pfs.id).where(pfs.model_version == HOLT_MODEL_VERSION).limit(1)).first() is None and \
+                db.execute(select(models.PriceHistory.id).limit(1)).first() is not None:
+            count = rebuild_states(db)
+            print(f"✓ Backfilled {HOLT_MODEL_VERSION} states for {count} series")
+    finally:
+        db.close()
+        SessionLocal.remove()
+
+
+def record_price(db: Session, record: models.PriceHistory):
+    """
+    Update the series state for a newly added price history record.
+
+    Called inside the insert's transaction (the caller commits). O(1) for
+    in-order data; a record older than the state's last date replays that
+    series from history.
+    """
+    state = db.execute(
+        select(models.PriceForecastState).where(
+            models.PriceForecastState.item_id == record.item_id,
+            models.PriceForecastState.vendor == record.vendor,
+            models.PriceForecastState.model_version == HOLT_MODEL_VERSION
+        )
+    ).scalar_one_or_none()
+
+    if state is not None and record.date >= state.last_date:
+        update_state(state, float(record.unit_price), record.date, record.shelf_life_days, record.category)
+        return
+
+    # New series or out-of-order insert: replay this series (includes the flushed record)
+    db.flush()
+    replayed = _replay(_history_rows(db, record.item_id, record.vendor)).get((record.item_id, record.vendor))
+    if replayed is None:
+        return
+    if state is None:
+        _insert_states(db, [replayed])
+    else:
+        for key, value in _state_row(replayed).items():
+            setattr(state, key, value)
+
+
+def record_prices(db: Session, records) -> int:
+    """
+    Update series states for many newly inserted records (bulk loads).
+
+    Records need id, item_id, vendor, date, unit_price, shelf_life_days and
+    category attributes (ORM objects or result rows). States are loaded in one
+    query; each series' new records are folded in date order, and a series
+    that is new or received data older than its state is replayed once.
+    Called inside the insert's transaction (the caller commits).
+
+    Returns:
+        Number of series updated
+    """
+    by_series: dict[tuple[int, str], list] = defaultdict(list)
+    for record in records:
+        by_series[(record.item_id, record.vendor)].append(record)
+    if not by_series:
+        return 0
+
+    pfs = models.PriceForecastState
+    states = {
+        (s.item_id, s.vendor): s
+        for s in db.execute(
+            select(pfs).where(pfs.model_version == HOLT_MODEL_VERSION, tuple_(pfs.item_id, pfs.vendor).in_(list(by_series)))
+        ).scalars()
+    }
+    created = []
+    for (item_id, vendor), new in by_series.items():
+        new.sort(key=lambda r: (r.date, r.id))
+        state = states.get((item_id, vendor))
+        if state is not None and new[0].date >= state.last_date:
+            for r in new:
+                update_state(state, float(r.unit_price), r.date, r.shelf_life_days, r.category)
+            continue
+        replayed = _replay(_history_rows(db, item_id, vendor)).get((item_id, vendor))
+        if replayed is None:
+            continue
+        if state is None:
+            created.append(replayed)
+        else:
+            for key, value in _state_row(replayed).items():
+                setattr(state, key, value)
+    _insert_states(db, created)
+    return len(by_series)
+
+
+def get_states(db: Session, pairs: list[tuple[int, Optional[str]]]) -> dict[tuple[int, Optional[str]], models.PriceForecastState]:
+    """
+    Load states for many (item_id, vendor) pairs in one query.
+
+    A vendor of None picks the item's most recently updated series.
+    """
+    if not pairs:
+        return {}
+    rows = db.execute(
+        select(models.PriceForecastState).where(
+            models.PriceForecastState.item_id.in_({item_id for item_id, _ in pairs}),
+            models.PriceForecastState.model_version == HOLT_MODEL_VERSION
+        )
+    ).scalars().all()
+    by_vendor = {(s.item_id, s.vendor): s for s in rows}
+    newest = {}
+    for s in rows:
+        if s.item_id not in newest or s.last_date > newest[s.item_id].last_date:
+            newest[s.item_id] = s
+    found = {}
+    for item_id, vendor in pairs:
+        state = newest.get(item_id) if vendor is None else by_vendor.get((item_id, vendor))
+        if state is not None:
+            found[(item_id, vendor)] = state
+    return found
@@ -0,0 +1,123 @@
+"""
+Maintained latest price per (item, vendor).
+
+"Current cost" is the most-read value in the system, so instead of a
+latest-row query against price_history per product, the newest row of every
+series is copied into latest_prices as it is written.
+
+A session after_flush hook upserts the newest new PriceHistory row of each
+series, keeping whichever of the stored and new row is later (date, then id),
+so out-of-order inserts never move the latest price backwards. It covers
+every ORM insert (API, seed scripts, loaders). Updates and deletes of
+history, and raw SQL inserts, need a rebuild:
+
+    python -m app.rebuild_latest_prices
+"""
+from __future__ import annotations
+from typing import Iterable
+from sqlalchemy import event, select, delete, insert, func
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app import models
+
+COLUMNS = ("item_id", "vendor", "date", "unit_price", "unit_cost", "purchase_quantity", "shelf_life_days", "category")
+
+
+def _row(record: models.PriceHistory) -> dict:
+    row = {column: getattr(record, column) for column in COLUMNS}
+    row["price_history_id"] = record.id
+    return row
+
+
+def upsert_latest(connection: Connection, records: Iterable[models.PriceHistory]):
+    """Store each record as its series' latest price unless a later one is already stored."""
+    rows = [_row(r) for r in records]
+    if not rows:
+        return
+    table = models.LatestPrice.__table__
+    dialect = connection.dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        newer = (table.c.date < stmt.excluded.date) | (
+            (table.c.date == stmt.excluded.date) & (table.c.price_history_id < stmt.excluded.price_history_id)
+        )
+        set_ = {c: stmt.excluded[c] for c in (*COLUMNS[2:], "price_history_id")}
+        set_["updated_at"] = func.now()
+        connection.execute(stmt.on_conflict_do_update(index_elements=["item_id", "vendor"], set_=set_, where=newer))
+        return
+
+    for row in rows:
+        current = connection.execute(
+            select(table.c.date, table.c.price_history_id).where(table.c.item_id == row["item_id"], table.c.vendor == row["vendor"])
+        ).first()
+        if current is None:
+            connection.execute(insert(table).values(row))
+        elif (current.date, current.price_history_id) < (row["date"], row["price_history_id"]):
+            connection.execute(
+                table.update()
+                .where(table.c.item_id == row["item_id"], table.c.vendor == row["vendor"])
+                .values(**row, updated_at=func.now())
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _track_latest_prices(session: Session, flush_context):
+    # session.new still lists the objects inserted by this flush
+    newest: dict[tuple[int, str], models.PriceHistory] = {}
+    for obj in session.new:
+        if isinstance(obj, models.PriceHistory):
+            key = (obj.item_id, obj.vendor)
+            current = newest.get(key)
+            if current is None or (obj.date, obj.id) > (current.date, current.id):
+                newest[key] = obj
+    if newest:
+        upsert_latest(session.connection(), newest.values())
+
+
+def rebuild_latest_prices(db: Session) -> int:
+    """
+    Recompute latest_prices from price_history in one INSERT ... SELECT.
+
+    Returns:
+        Number of series
+    """
+    ph = models.PriceHistory
+    ranked = select(
+        ph.id,
+        *(getattr(ph, column) for column in COLUMNS),
+        func.row_number().over(partition_by=(ph.item_id, ph.vendor), order_by=(ph.date.desc(), ph.id.desc())).label("rn"),
+    ).subquery()
+    source = select(ranked.c.id, *(ranked.c[column] for column in COLUMNS)).where(ranked.c.rn == 1)
+
+    db.execute(delete(models.LatestPrice))
+    db.execute(insert(models.LatestPrice).from_select(["price_history_id", *COLUMNS], source))
+    db.commit()
+    return db.execute(select(func.count()).select_from(models.LatestPrice)).scalar_one()
+
+
+def backfill_if_empty():
+    """Populate latest_prices on first start against a database that already has history."""
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        if db.execute(select(models.LatestPrice.id).limit(1)).first() is None and \
+                db.execute(select(models.PriceHistory.id).limit(1)).first() is not None:
+            count = rebuild_latest_prices(db)
+            print(f"✓ Backfilled latest prices for {count} series")
+    finally:
+        db.close()
+        SessionLocal.remove()
+
+
+def get_latest_prices_by_vendor(db: Session, item_ids: Iterable[int]) -> list[models.LatestPrice]:
+    """Latest price of every (item, vendor) series for the given items, in one query."""
+    ids = set(item_ids)
+    if not ids:
+        return []
+    stmt = select(models.LatestPrice).where(models.LatestPrice.item_id.in_(ids)).order_by(models.LatestPrice.item_id, models.LatestPrice.vendor)
+    return db.execute(stmt).scalars().all()
@@ -0,0 +1,43 @@
+"""
+Line-oriented request bodies (NDJSON, CSV) read as they arrive.
+
+Endpoints that accept large uploads iterate the body line by line instead of
+parsing it whole, so memory stays bounded by one batch of rows.
+"""
+from __future__ import annotations
+from typing import AsyncIterable, AsyncIterator
+from fastapi import Request
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+
+def media_type(request: Request) -> str:
+    """Content-Type without parameters, lowercased."""
+    return request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+
+def is_ndjson(request: Request) -> bool:
+    return media_type(request) in NDJSON_MEDIA_TYPES
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """
+    Split a byte stream into lines.
+
+    Returns:
+        (line number, line) pairs, numbered from 1; blank lines are skipped
+        but still counted
+    """
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            line = line.strip()
+            if line:
+                yield line_no, line
+    line = buffer.strip()
+    if line:
+        yield line_no + 1, line
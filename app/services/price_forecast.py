@@ -3,36 +3,66 @@ Price forecasting service using 3-layer model:
 1. Time Series Forecast (Prophet/ARIMA)
 2. Vendor Volatility Adjustment
 3. Shelf Life Cost Adjustment
+
+pandas and Prophet (which pulls in cmdstanpy) are imported on first use so
+that importing this module, and therefore booting the API, stays cheap.
 """
 from __future__ import annotations
+from concurrent.futures.process import BrokenProcessPool
 from datetime import date, timedelta
-from typing import Optional
-import pandas as pd
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Optional
 import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 from app import models
+from app.services.forecast_cache import forecast_cache
+from app.services import holt_state, forecast_engines
+from app.services.forecast_engines import DEFAULT_MODEL_VERSION
+from app.services.fit_pool import forecast_worker_count, get_fit_pool, shutdown_fit_pool
 
-try:
+if TYPE_CHECKING:
+    import pandas as pd
     from prophet import Prophet
-    PROPHET_AVAILABLE = True
-except ImportError:
-    PROPHET_AVAILABLE = False
-    # Fallback to simple moving average if Prophet not available
-    print("Warning: Prophet not installed. Using simple forecasting.")
+
+
+@lru_cache(maxsize=None)
+def _prophet_class():
+    """Import Prophet on first use; None when it is not installed."""
+    try:
+        from prophet import Prophet
+    except ImportError:
+        # Fallback to simple moving average if Prophet not available
+        print("Warning: Prophet not installed. Using simple forecasting.")
+        return None
+    return Prophet
+
+
+def prophet_available() -> bool:
+    """Whether Prophet can be used (imports it on first call)."""
+    return _prophet_class() is not None
+
+
+def warm_up():
+    """
+    Load the heavy forecasting dependencies ahead of the first request.
+    
+    Meant to run in a background thread after startup (FORECAST_WARMUP=1).
+    """
+    import pandas  # noqa: F401
+    Prophet = _prophet_class()
+    if Prophet is not None:
+        # Building a model loads the Stan backend
+        Prophet()
+
+
+# Season of each month, January first (bulk loaders index it by month - 1)
+SEASON_BY_MONTH = ("winter", "winter", "spring", "spring", "spring", "summer", "summer", "summer", "fall", "fall", "fall", "winter")
 
 
 def get_season(target_date: date) -> str:
     """Determine season based on date."""
-    month = target_date.month
-    if month in (12, 1, 2):
-        return "winter"
-    elif month in (3, 4, 5):
-        return "spring"
-    elif month in (6, 7, 8):
-        return "summer"
-    else:
-        return "fall"
+    return SEASON_BY_MONTH[target_date.month - 1]
 
 
 def forecast_price_prophet(df: pd.DataFrame, periods: int = 30) -> pd.DataFrame:
@@ -44,56 +74,106 @@ def forecast_price_prophet(df: pd.DataFrame, periods: int = 30) -> pd.DataFrame:
         periods: Number of days to forecast
     
     Returns:
-        DataFrame with forecast including confidence intervals
+        DataFrame with one row per future day (history rows are dropped)
+        including confidence intervals
+    """
+    return fit_price_model(df, periods)[0]
+
+
+def fit_price_model(df: pd.DataFrame, periods: int = 30) -> tuple[pd.DataFrame, Optional[Prophet]]:
+    """
+    Layer 1 fit: Prophet when possible, simple forecast otherwise.
+    
+    Returns:
+        (forecast DataFrame, fitted Prophet model or None when the simple
+        fallback was used)
     """
-    if not PROPHET_AVAILABLE or len(df) < 10:
+    if len(df) < 10 or not prophet_available():
         # Fallback: simple moving average with trend
-        return forecast_price_simple(df, periods)
+        return forecast_price_simple(df, periods), None
     
     try:
+        Prophet = _prophet_class()
         prophet_df = df.rename(columns={"date": "ds", "unit_price": "y"})
         model = Prophet(interval_width=0.95, yearly_seasonality=True, weekly_seasonality=True)
         model.fit(prophet_df)
-        future = model.make_future_dataframe(periods=periods)
-        forecast = model.predict(future)
-        return forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].rename(
-            columns={"ds": "date", "yhat": "forecast", "yhat_lower": "low_ci", "yhat_upper": "high_ci"}
-        )
+        return predict_prophet(model, periods), model
     except Exception as e:
         print(f"Prophet forecast failed: {e}, using simple forecast")
-        return forecast_price_simple(df, periods)
+        return forecast_price_simple(df, periods), None
+
+
+def predict_prophet(model: Prophet, periods: int) -> pd.DataFrame:
+    """Predict the next `periods` days from a fitted Prophet model."""
+    future = model.make_future_dataframe(periods=periods)
+    forecast = model.predict(future).tail(periods)
+    forecast = forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].rename(
+        columns={"ds": "date", "yhat": "forecast", "yhat_lower": "low_ci", "yhat_upper": "high_ci"}
+    )
+    forecast["date"] = forecast["date"].dt.date
+    return forecast.reset_index(drop=True)
 
 
 def forecast_price_simple(df: pd.DataFrame, periods: int = 30) -> pd.DataFrame:
     """
     Simple fallback forecast using moving average and trend.
     """
+    import pandas as pd
+    
     df = df.sort_values("date")
-    prices = df["unit_price"].values
+    forecast, low_ci, high_ci = forecast_prices_simple_matrix(df["unit_price"].to_numpy(dtype=float)[np.newaxis, :], periods)
+    future_dates = pd.date_range(start=df["date"].max() + timedelta(days=1), periods=periods, freq="D")
     
-    # Calculate moving average and trend
-    window = min(7, len(prices))
-    ma = np.mean(prices[-window:])
-    trend = (prices[-1] - prices[0]) / len(prices) if len(prices) > 1 else 0
+    return pd.DataFrame({
+        "date": future_dates.date,
+        "forecast": forecast[0],
+        "low_ci": low_ci[0],
+        "high_ci": high_ci[0]
+    })
+
+
+def forecast_prices_simple_matrix(prices: np.ndarray, periods: int = 30) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Simple forecast (moving average and trend) for many series in one pass.
     
-    # Generate forecast
-    future_dates = pd.date_range(start=df["date"].max() + timedelta(days=1), periods=periods, freq="D")
-    forecasts = []
-    
-    for i, future_date in enumerate(future_dates):
-        forecast_price = ma + (trend * (i + 1))
-        # Simple confidence intervals (±10%)
-        low_ci = forecast_price * 0.90
-        high_ci = forecast_price * 1.10
-        
-        forecasts.append({
-            "date": future_date.date(),
-            "forecast": forecast_price,
-            "low_ci": low_ci,
-            "high_ci": high_ci
-        })
+    Args:
+        prices: 2-D array (items x days) of chronological prices. Rows are
+            right-aligned on their latest observation; shorter series are
+            left-padded with NaN (see stack_price_series).
+        periods: Number of days to forecast
     
-    return pd.DataFrame(forecasts)
+    Returns:
+        (forecast, low_ci, high_ci), each an items x periods array
+    """
+    prices = np.asarray(prices, dtype=float)
+    n_items, n_days = prices.shape
+    observed = ~np.isnan(prices)
+    n_obs = observed.sum(axis=1)
+    if n_items and n_obs.min() == 0:
+        raise ValueError("Every series needs at least one price")
+    
+    # Moving average over the last min(7, n) prices
+    window = prices[:, -7:]
+    window_obs = observed[:, -7:]
+    ma = np.where(window_obs, window, 0.0).sum(axis=1) / window_obs.sum(axis=1)
+    
+    # Trend: (last - first) / n, zero for single-price series
+    first = prices[np.arange(n_items), n_days - n_obs]
+    trend = np.where(n_obs > 1, (prices[:, -1] - first) / n_obs, 0.0)
+    
+    forecast = ma[:, np.newaxis] + trend[:, np.newaxis] * np.arange(1, periods + 1)
+    # Simple confidence intervals (±10%)
+    return forecast, forecast * 0.90, forecast * 1.10
+
+
+def stack_price_series(series: list[np.ndarray]) -> np.ndarray:
+    """Right-align price series of different lengths into a NaN-padded items x days matrix."""
+    width = max((len(s) for s in series), default=0)
+    matrix = np.full((len(series), width), np.nan)
+    for row, values in zip(matrix, series):
+        if len(values):
+            row[width - len(values):] = values
+    return matrix
 
 
 def get_vendor_volatility(db: Session, vendor: str) -> Optional[models.VendorVolatility]:
@@ -102,6 +182,18 @@ def get_vendor_volatility(db: Session, vendor: str) -> Optional[models.VendorVol
     return db.execute(stmt).scalar_one_or_none()
 
 
+def calculate_volatility_multiplier(vendor_vol: Optional[models.VendorVolatility]) -> float:
+    """
+    Calculate vendor volatility adjustment (layer 2).
+    Vendors without volatility metrics get a default moderate multiplier.
+    """
+    if vendor_vol:
+        # Adjustment formula: 1 + stdev/100 * (1 - reliability_score); reliability damps the volatility markup
+        return 1 + float(vendor_vol.stdev_price_change) / 100 * (1 - float(vendor_vol.reliability_score))
+    # Default moderate volatility
+    return 1.05
+
+
 def calculate_shelf_life_factor(shelf_life_days: int) -> float:
     """
     Calculate shelf life adjustment factor.
@@ -126,38 +218,141 @@ def get_price_history(db: Session, item_id: int, vendor: Optional[str] = None, l
     Returns:
         DataFrame with columns: date, unit_price, vendor, shelf_life_days, category
     """
-    stmt = select(models.PriceHistory).where(models.PriceHistory.item_id == item_id)
-    if vendor:
-        stmt = stmt.where(models.PriceHistory.vendor == vendor)
-    stmt = stmt.order_by(models.PriceHistory.date.desc()).limit(limit)
+    return get_price_histories(db, [(item_id, vendor)], limit)[(item_id, vendor)]
+
+
+def get_price_histories(
+    db: Session,
+    pairs: Iterable[tuple[int, Optional[str]]],
+    limit: int = 365
+) -> dict[tuple[int, Optional[str]], pd.DataFrame]:
+    """
+    Get price history for many (item_id, vendor) pairs in a single query.
     
-    records = db.execute(stmt).scalars().all()
+    A vendor of None means "any vendor", matching get_price_history. The most
+    recent `limit` rows per pair are selected with window functions so the
+    database does the per-series truncation.
     
-    if not records:
-        return pd.DataFrame()
+    Returns:
+        Dict keyed by (item_id, vendor) with the same DataFrame layout as
+        get_price_history (empty DataFrame when there is no history)
+    """
+    import pandas as pd
+    
+    keys = list(dict.fromkeys(pairs))
+    histories = {key: pd.DataFrame() for key in keys}
+    if not keys:
+        return histories
+    
+    ph = models.PriceHistory
+    newest_first = (ph.date.desc(), ph.id.desc())
+    ranked = select(
+        ph.item_id,
+        ph.vendor,
+        ph.date,
+        ph.unit_price,
+        ph.shelf_life_days,
+        ph.category,
+        func.row_number().over(partition_by=ph.item_id, order_by=newest_first).label("rn_item"),
+        func.row_number().over(partition_by=(ph.item_id, ph.vendor), order_by=newest_first).label("rn_vendor"),
+    ).where(ph.item_id.in_({item_id for item_id, _ in keys})).subquery()
+    stmt = select(ranked).where((ranked.c.rn_item <= limit) | (ranked.c.rn_vendor <= limit))
+    
+    rows = db.execute(stmt).all()
+    if not rows:
+        return histories
+    
+    frame = pd.DataFrame(rows, columns=["item_id", "vendor", "date", "unit_price", "shelf_life_days", "category", "rn_item", "rn_vendor"])
+    frame["unit_price"] = frame["unit_price"].astype(float)
+    columns = ["date", "unit_price", "vendor", "shelf_life_days", "category"]
+    
+    by_item = {}
+    if any(vendor is None for _, vendor in keys):
+        any_vendor = frame[frame["rn_item"] <= limit]
+        by_item = {item_id: group for item_id, group in any_vendor.groupby("item_id", sort=False)}
+    by_vendor = {}
+    if any(vendor is not None for _, vendor in keys):
+        per_vendor = frame[frame["rn_vendor"] <= limit]
+        by_vendor = {key: group for key, group in per_vendor.groupby(["item_id", "vendor"], sort=False)}
+    
+    for item_id, vendor in keys:
+        if vendor is None:
+            group, rank = by_item.get(item_id), "rn_item"
+        else:
+            group, rank = by_vendor.get((item_id, vendor)), "rn_vendor"
+        if group is not None:
+            # Highest rank first gives chronological order
+            histories[(item_id, vendor)] = group.sort_values(rank, ascending=False)[columns].reset_index(drop=True)
     
-    data = [{
-        "date": r.date,
-        "unit_price": float(r.unit_price),
-        "vendor": r.vendor,
-        "shelf_life_days": r.shelf_life_days,
-        "category": r.category
-    } for r in reversed(records)]  # Reverse to get chronological order
+    return histories
+
+
+def _fit_series(task: tuple[pd.DataFrame, int]) -> tuple[Optional[pd.DataFrame], Optional[str], Optional[str]]:
+    """
+    Process pool entry point: fit one series.
     
-    return pd.DataFrame(data)
+    Returns:
+        (forecast_df, serialized model JSON or None, error message or None)
+    """
+    df, periods = task
+    try:
+        forecast_df, model = fit_price_model(df, periods)
+        if model is None:
+            return forecast_df, None, None
+        from prophet.serialize import model_to_json
+        return forecast_df, model_to_json(model), None
+    except Exception as e:
+        return None, None, str(e)
+
+
+def _fit_many(frames: list[pd.DataFrame], periods: int) -> list[tuple[Optional[pd.DataFrame], Optional[str], Optional[str]]]:
+    """Fit many series, spreading them across the process pool when worthwhile."""
+    tasks = [(df, periods) for df in frames]
+    workers = forecast_worker_count()
+    if len(tasks) < 2 or workers < 2:
+        return [_fit_series(task) for task in tasks]
+    chunksize = max(1, len(tasks) // (workers * 4))
+    pool = get_fit_pool()
+    results = []
+    try:
+        for result in pool.map(_fit_series, tasks, chunksize=chunksize):
+            results.append(result)
+    except BrokenProcessPool as e:
+        # A worker died (crash, OOM kill): fail the unfinished series and let
+        # the next batch start a fresh pool
+        shutdown_fit_pool(pool)
+        error = f"Fitting process failed: {e}"
+        results.extend((None, None, error) for _ in range(len(tasks) - len(results)))
+    return results
+
+
+def _cached_fit(item_id: int, vendor: Optional[str], price_df: pd.DataFrame, periods: int) -> pd.DataFrame:
+    """Layer 1 forecast for one series, served from the fitted-model cache when possible."""
+    key = forecast_cache.key_for(item_id, vendor, price_df)
+    forecast_df = forecast_cache.get(key, periods)
+    if forecast_df is None:
+        forecast_df, model = fit_price_model(price_df[["date", "unit_price"]], periods)
+        forecast_cache.put(key, forecast_df, model)
+    return forecast_df
 
 
 def forecast_item_price(
     db: Session,
     item_id: int,
-    vendor: Optional[str] = None
+    vendor: Optional[str] = None,
+    model_version: Optional[str] = DEFAULT_MODEL_VERSION
 ) -> dict:
     """
     Generate price forecast for an item using 3-layer model.
     
+    Args:
+        model_version: Layer 1 engine (see forecast_engines); None picks the
+            engine configured for the item's category
+    
     Returns:
         Dictionary with forecast results including:
         - next_7_day_price
+        - next_14_day_price
         - next_30_day_price
         - low_estimate (5% CI)
         - high_estimate (95% CI)
@@ -165,57 +360,226 @@ def forecast_item_price(
         - shelf_life_multiplier
         - explanation
     """
+    if model_version is None and not forecast_engines.CATEGORY_ENGINES:
+        model_version = DEFAULT_MODEL_VERSION
+    if model_version != DEFAULT_MODEL_VERSION:
+        outcome = forecast_item_prices(db, [(item_id, vendor)], model_version)[0]
+        if outcome["error"]:
+            raise ValueError(outcome["error"])
+        return outcome["forecast"]
+    
     # Get price history
     price_df = get_price_history(db, item_id, vendor)
+    _check_history(item_id, len(price_df))
+    
+    vendor_name = vendor or price_df.iloc[-1]["vendor"]
     
-    if len(price_df) < 3:
+    # Layer 1: Time Series Forecast
+    forecast_df = _cached_fit(item_id, vendor, price_df, periods=30)
+    
+    return _assemble_price_forecast(item_id, vendor_name, price_df.iloc[-1], _layer1_array(forecast_df), get_vendor_volatility(db, vendor_name))
+
+
+def forecast_item_prices(
+    db: Session,
+    pairs: list[tuple[int, Optional[str]]],
+    model_version: Optional[str] = DEFAULT_MODEL_VERSION
+) -> list[dict]:
+    """
+    Generate price forecasts for many (item_id, vendor) pairs.
+    
+    Price history and vendor volatility are each loaded with one query. Series
+    are grouped by engine: Prophet fits are spread across a process pool and
+    cached, the NumPy engines run in-process, and stateful engines read the
+    persisted incremental state instead of history.
+    
+    Args:
+        model_version: Layer 1 engine for every pair; None picks per pair
+            from the category of its latest price
+    
+    Returns:
+        One dict per input pair, in input order, with keys item_id, vendor,
+        model_version, forecast (forecast_item_price result or None) and
+        error (message or None)
+    """
+    engine = forecast_engines.get_engine(model_version) if model_version is not None else None
+    vendor_vols = {v.vendor: v for v in db.execute(select(models.VendorVolatility)).scalars().all()}
+    
+    outcomes: dict[tuple[int, Optional[str]], tuple[Optional[dict], Optional[str]]] = {}
+    used: dict[tuple[int, Optional[str]], str] = {}
+    if engine is not None and engine.stateful:
+        outcomes.update(_forecast_from_states(db, pairs, vendor_vols))
+        used = dict.fromkeys(outcomes, engine.model_version)
+        return _batch_results(pairs, outcomes, used)
+    
+    histories = get_price_histories(db, pairs)
+    
+    by_engine: dict[str, list[tuple[int, Optional[str]]]] = {}
+    for key, price_df in histories.items():
+        try:
+            _check_history(key[0], len(price_df))
+        except ValueError as e:
+            outcomes[key] = (None, str(e))
+            continue
+        chosen = engine or forecast_engines.select_engine(price_df.iloc[-1]["category"])
+        by_engine.setdefault(chosen.model_version, []).append(key)
+        used[key] = chosen.model_version
+    
+    layer1 = {}
+    for version, keys in by_engine.items():
+        chosen = forecast_engines.get_engine(version)
+        if chosen.stateful:
+            outcomes.update(_forecast_from_states(db, keys, vendor_vols))
+        elif chosen.cached:
+            layer1.update(_prophet_layer1(keys, histories, outcomes))
+        else:
+            series = [
+                (histories[key]["date"].to_numpy().astype("datetime64[D]"), histories[key]["unit_price"].to_numpy(dtype=float))
+                for key in keys
+            ]
+            layer1.update(zip(keys, chosen.forecast_many(series, periods=30)))
+    
+    for key, bands in layer1.items():
+        item_id, vendor = key
+        price_df = histories[key]
+        vendor_name = vendor or price_df.iloc[-1]["vendor"]
+        try:
+            outcomes[key] = (_assemble_price_forecast(item_id, vendor_name, price_df.iloc[-1], bands, vendor_vols.get(vendor_name)), None)
+        except Exception as e:
+            outcomes[key] = (None, f"Forecast error: {e}")
+    
+    return _batch_results(pairs, outcomes, used)
+
+
+def _batch_results(pairs, outcomes, used) -> list[dict]:
+    results = []
+    for item_id, vendor in pairs:
+        forecast, error = outcomes[(item_id, vendor)]
+        results.append({
+            "item_id": item_id,
+            "vendor": vendor,
+            "model_version": used.get((item_id, vendor)),
+            "forecast": forecast,
+            "error": error,
+        })
+    return results
+
+
+def _prophet_layer1(
+    keys: list[tuple[int, Optional[str]]],
+    histories: dict[tuple[int, Optional[str]], pd.DataFrame],
+    outcomes: dict
+) -> dict[tuple[int, Optional[str]], np.ndarray]:
+    """Layer 1 for the price-v1 engine: cache, then pooled Prophet fits; failures go to outcomes."""
+    layer1 = {}
+    to_fit = []
+    for key in keys:
+        cached = forecast_cache.get(forecast_cache.key_for(*key, histories[key]), 30)
+        if cached is not None:
+            layer1[key] = _layer1_array(cached)
+        else:
+            to_fit.append(key)
+    
+    # Series Prophet would skip anyway go through the vectorized simple engine in one pass
+    prophet_ok = bool(to_fit) and prophet_available()
+    use_prophet = [key for key in to_fit if prophet_ok and len(histories[key]) >= 10]
+    use_simple = [key for key in to_fit if not (prophet_ok and len(histories[key]) >= 10)]
+    
+    if use_simple:
+        matrix = stack_price_series([histories[key]["unit_price"].to_numpy(dtype=float) for key in use_simple])
+        bands = np.stack(forecast_prices_simple_matrix(matrix, periods=30), axis=-1)
+        layer1.update(zip(use_simple, bands))
+    
+    fits = _fit_many([histories[key][["date", "unit_price"]] for key in use_prophet], periods=30)
+    for key, (forecast_df, model_json, error) in zip(use_prophet, fits):
+        if error is not None:
+            outcomes[key] = (None, f"Forecast error: {error}")
+            continue
+        forecast_cache.put(forecast_cache.key_for(*key, histories[key]), forecast_df, model_json=model_json)
+        layer1[key] = _layer1_array(forecast_df)
+    return layer1
+
+
+def _forecast_from_states(
+    db: Session,
+    pairs: list[tuple[int, Optional[str]]],
+    vendor_vols: dict[str, models.VendorVolatility]
+) -> dict[tuple[int, Optional[str]], tuple[Optional[dict], Optional[str]]]:
+    """Forecasts from incremental Holt states: one query, no fitting."""
+    states = holt_state.get_states(db, pairs)
+    outcomes = {}
+    for item_id, vendor in pairs:
+        state = states.get((item_id, vendor))
+        try:
+            _check_history(item_id, state.n_obs if state else 0)
+            latest = {"unit_price": float(state.last_price), "shelf_life_days": state.shelf_life_days, "category": state.category}
+            layer1 = holt_state.forecast_from_state(state, periods=30)
+            outcomes[(item_id, vendor)] = (_assemble_price_forecast(item_id, state.vendor, latest, layer1, vendor_vols.get(state.vendor)), None)
+        except ValueError as e:
+            outcomes[(item_id, vendor)] = (None, str(e))
+    return outcomes
+
+
+def _check_history(item_id: int, n_obs: int):
+    if n_obs < 3:
         raise ValueError(f"Insufficient price history for item {item_id}. Need at least 3 data points.")
+
+
+def _layer1_array(forecast_df: pd.DataFrame) -> np.ndarray:
+    """periods x 3 array of (forecast, low_ci, high_ci) from a forecast frame."""
+    return forecast_df[["forecast", "low_ci", "high_ci"]].to_numpy(dtype=float)
+
+
+def _assemble_price_forecast(
+    item_id: int,
+    vendor_name: str,
+    latest_record,
+    layer1: np.ndarray,
+    vendor_vol: Optional[models.VendorVolatility]
+) -> dict:
+    """
+    Apply layers 2 and 3 to a layer 1 forecast and build the result dict.
     
+    latest_record is the latest price observation (a history row or mapping
+    with unit_price, shelf_life_days and category); layer1 is a periods x 3
+    array of (forecast, low_ci, high_ci) per future day.
+    """
     # Get latest record for metadata
-    latest_record = price_df.iloc[-1]
-    vendor_name = vendor or latest_record["vendor"]
     shelf_life_days = int(latest_record["shelf_life_days"])
     category = latest_record["category"]
     
-    # Layer 1: Time Series Forecast
-    forecast_df = forecast_price_prophet(price_df[["date", "unit_price"]], periods=30)
-    
-    # Get 7-day and 30-day forecasts
-    next_7_day = forecast_df.iloc[6] if len(forecast_df) > 6 else forecast_df.iloc[-1]
-    next_30_day = forecast_df.iloc[-1]
+    # Get 7-day, 14-day and 30-day forecasts
+    next_7_day = layer1[6] if len(layer1) > 6 else layer1[-1]
+    next_14_day = layer1[13] if len(layer1) > 13 else layer1[-1]
+    next_30_day = layer1[-1]
     
-    base_7_day = float(next_7_day["forecast"])
-    base_30_day = float(next_30_day["forecast"])
+    base_7_day = float(next_7_day[0])
+    base_14_day = float(next_14_day[0])
+    base_30_day = float(next_30_day[0])
     
     # Layer 2: Vendor Volatility Adjustment
-    vendor_vol = get_vendor_volatility(db, vendor_name)
-    volatility_multiplier = 1.0
-    
-    if vendor_vol:
-        # Adjustment formula: (1 + stdev/100) * (1 - reliability_score)
-        volatility_multiplier = (1 + vendor_vol.stdev_price_change / 100) * (1 - float(vendor_vol.reliability_score))
-    else:
-        # Default moderate volatility
-        volatility_multiplier = 1.05
+    volatility_multiplier = calculate_volatility_multiplier(vendor_vol)
     
     adjusted_7_day = base_7_day * volatility_multiplier
+    adjusted_14_day = base_14_day * volatility_multiplier
     adjusted_30_day = base_30_day * volatility_multiplier
     
     # Layer 3: Shelf Life Adjustment
     shelf_life_factor = calculate_shelf_life_factor(shelf_life_days)
     
     final_7_day = adjusted_7_day * shelf_life_factor
+    final_14_day = adjusted_14_day * shelf_life_factor
     final_30_day = adjusted_30_day * shelf_life_factor
     
     # Calculate confidence intervals
-    low_7_day = float(next_7_day["low_ci"]) * volatility_multiplier * shelf_life_factor
-    high_7_day = float(next_7_day["high_ci"]) * volatility_multiplier * shelf_life_factor
+    low_7_day = float(next_7_day[1]) * volatility_multiplier * shelf_life_factor
+    high_7_day = float(next_7_day[2]) * volatility_multiplier * shelf_life_factor
     
-    low_30_day = float(next_30_day["low_ci"]) * volatility_multiplier * shelf_life_factor
-    high_30_day = float(next_30_day["high_ci"]) * volatility_multiplier * shelf_life_factor
+    low_30_day = float(next_30_day[1]) * volatility_multiplier * shelf_life_factor
+    high_30_day = float(next_30_day[2]) * volatility_multiplier * shelf_life_factor
     
     # Determine risk level
-    price_change_pct = ((final_30_day - float(price_df.iloc[-1]["unit_price"])) / float(price_df.iloc[-1]["unit_price"])) * 100
+    price_change_pct = ((final_30_day - float(latest_record["unit_price"])) / float(latest_record["unit_price"])) * 100
     if abs(price_change_pct) > 10:
         risk = "high"
     elif abs(price_change_pct) > 5:
@@ -228,7 +592,7 @@ def forecast_item_price(
         item_id=item_id,
         vendor=vendor_name,
         category=category,
-        current_price=float(price_df.iloc[-1]["unit_price"]),
+        current_price=float(latest_record["unit_price"]),
         forecast_30_day=final_30_day,
         price_change_pct=price_change_pct,
         vendor_vol=vendor_vol,
@@ -241,6 +605,7 @@ def forecast_item_price(
         "item_id": item_id,
         "vendor": vendor_name,
         "next_7_day_price": round(final_7_day, 2),
+        "next_14_day_price": round(final_14_day, 2),
         "next_30_day_price": round(final_30_day, 2),
         "low_estimate_7d": round(low_7_day, 2),
         "high_estimate_7d": round(high_7_day, 2),
@@ -0,0 +1,217 @@
+"""
+Bulk price history ingestion from vendor price files (CSV or NDJSON).
+
+Files are processed in chunks of CHUNK_LINES lines, so memory stays constant
+whatever the file size:
+
+1. Lines are decoded (a CSV header row names the columns; NDJSON lines are
+   objects) and validated column-wise with pandas; season is derived from
+   the month when the file does not supply it.
+2. Valid rows are inserted with one executemany INSERT ... RETURNING.
+3. The derived state the single-record path keeps is updated for the chunk:
+   latest_prices (newest row per series), Holt forecast states and the
+   fitted-model cache. Each chunk commits on its own.
+
+Rejected lines are reported with their line number and reason; the rest of
+the file still loads. CSV fields may be quoted but cannot contain newlines.
+"""
+from __future__ import annotations
+import csv
+import json
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+import numpy as np
+from sqlalchemy import select, insert
+from sqlalchemy.orm import Session
+from app import models
+from app.services import holt_state, latest_prices
+from app.services.forecast_cache import forecast_cache
+from app.services.price_forecast import SEASON_BY_MONTH
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+REQUIRED_COLUMNS = ("item_id", "vendor", "date", "unit_price", "unit_cost", "purchase_quantity", "shelf_life_days", "category")
+CHUNK_LINES = 5000
+# Errors kept for the report; later ones are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+@dataclass
+class IngestReport:
+    """Running totals for one ingested file."""
+    lines: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def reject(self, line: int, error: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def as_dict(self) -> dict:
+        return {
+            "lines": self.lines,
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "errors": sorted(self.errors, key=lambda e: e["line"]),
+            "errors_truncated": self.rejected > len(self.errors),
+        }
+
+
+def parse_csv_header(line: bytes) -> list[str]:
+    """
+    Column names from a CSV header line.
+
+    Raises:
+        ValueError: If a required column is missing
+    """
+    columns = [c.strip().lower() for c in next(csv.reader([line.decode("utf-8-sig")]))]
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+    return columns
+
+
+def _decode(lines: list[tuple[int, bytes]], header: Optional[list[str]], report: IngestReport) -> list[tuple[int, dict]]:
+    """Turn raw lines into (line number, record) pairs; CSV when a header is given, NDJSON otherwise."""
+    records = []
+    for line_no, line in lines:
+        try:
+            text = line.decode("utf-8")
+            if header is not None:
+                values = next(csv.reader([text]))
+                if len(values) != len(header):
+                    report.reject(line_no, f"expected {len(header)} fields, got {len(values)}")
+                    continue
+                record = dict(zip(header, values))
+            else:
+                record = json.loads(text)
+                if not isinstance(record, dict):
+                    report.reject(line_no, "expected a JSON object")
+                    continue
+        except (UnicodeDecodeError, ValueError) as e:
+            report.reject(line_no, f"unreadable line: {e}")
+            continue
+        records.append((line_no, record))
+    return records
+
+
+def _positive_number(values: pd.Series, integer: bool = False) -> tuple[pd.Series, pd.Series]:
+    import pandas as pd
+    numbers = pd.to_numeric(values, errors="coerce")
+    valid = numbers.notna() & (numbers > 0)
+    if integer:
+        valid &= numbers % 1 == 0
+    return numbers, valid
+
+
+def validate_records(db: Session, records: list[tuple[int, dict]], report: IngestReport) -> list[dict]:
+    """
+    Validate a chunk of records column by column.
+
+    Rejected records are added to the report.
+
+    Returns:
+        Insertable price_history rows
+    """
+    import pandas as pd
+
+    if not records:
+        return []
+    frame = pd.DataFrame.from_records([r for _, r in records], columns=[*REQUIRED_COLUMNS, "season"])
+    frame.index = [line_no for line_no, _ in records]
+
+    checks: dict[str, pd.Series] = {}
+    item_ids, checks["item_id"] = _positive_number(frame["item_id"], integer=True)
+    dates = pd.to_datetime(frame["date"].astype(str), format="%Y-%m-%d", errors="coerce")
+    checks["date"] = dates.notna()
+    numbers = {}
+    for column in ("unit_price", "unit_cost"):
+        numbers[column], checks[column] = _positive_number(frame[column])
+    for column in ("purchase_quantity", "shelf_life_days"):
+        numbers[column], checks[column] = _positive_number(frame[column], integer=True)
+    text = {}
+    for column in ("vendor", "category"):
+        text[column] = frame[column].where(frame[column].notna(), "").astype(str).str.strip()
+        checks[column] = text[column] != ""
+
+    well_formed = pd.concat(checks, axis=1)
+    # Unknown products, looked up once per chunk
+    candidate_ids = {int(i) for i in item_ids[checks["item_id"]].unique()}
+    known = set(db.execute(select(models.Product.id).where(models.Product.id.in_(candidate_ids))).scalars()) if candidate_ids else set()
+    unknown = checks["item_id"] & ~item_ids.isin(known)
+
+    accepted = well_formed.all(axis=1) & ~unknown
+    for line_no in frame.index[~accepted]:
+        reasons = []
+        bad = [column for column in REQUIRED_COLUMNS if not well_formed.at[line_no, column]]
+        if bad:
+            reasons.append("invalid " + ", ".join(bad))
+        if unknown[line_no]:
+            reasons.append(f"unknown item_id {int(item_ids[line_no])}")
+        report.reject(int(line_no), "; ".join(reasons))
+
+    ok = accepted.to_numpy()
+    if not ok.any():
+        return []
+    given_season = frame["season"].where(frame["season"].notna(), "").astype(str).str.strip().to_numpy()[ok]
+    months = dates.dt.month.to_numpy()[ok].astype(int)
+    season = np.where(given_season != "", given_season, np.asarray(SEASON_BY_MONTH)[months - 1])
+
+    columns = {
+        "item_id": item_ids.to_numpy()[ok].astype(int).tolist(),
+        "vendor": text["vendor"].to_numpy()[ok].tolist(),
+        "date": [d.date() for d in dates[ok]],
+        "unit_price": numbers["unit_price"].to_numpy()[ok].round(2).tolist(),
+        "unit_cost": numbers["unit_cost"].to_numpy()[ok].round(2).tolist(),
+        "purchase_quantity": numbers["purchase_quantity"].to_numpy()[ok].astype(int).tolist(),
+        "shelf_life_days": numbers["shelf_life_days"].to_numpy()[ok].astype(int).tolist(),
+        "category": text["category"].to_numpy()[ok].tolist(),
+        "season": season.tolist(),
+    }
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def insert_price_rows(db: Session, rows: list[dict]) -> int:
+    """
+    Insert validated rows and bring the derived price state up to date.
+
+    Commits.
+
+    Returns:
+        Number of (item, vendor) series touched
+    """
+    if not rows:
+        return 0
+    ph = models.PriceHistory
+    inserted = db.execute(
+        insert(ph).returning(
+            ph.id, ph.item_id, ph.vendor, ph.date, ph.unit_price, ph.unit_cost,
+            ph.purchase_quantity, ph.shelf_life_days, ph.category
+        ),
+        rows
+    ).all()
+
+    # Bulk inserts bypass the latest-price flush hook: store each series' newest row
+    newest: dict[tuple[int, str], object] = {}
+    for r in inserted:
+        current = newest.get((r.item_id, r.vendor))
+        if current is None or (r.date, r.id) > (current.date, current.id):
+            newest[(r.item_id, r.vendor)] = r
+    latest_prices.upsert_latest(db.connection(), newest.values())
+    holt_state.record_prices(db, inserted)
+    db.commit()
+
+    for item_id, vendor in newest:
+        forecast_cache.invalidate(item_id, vendor)
+    return len(newest)
+
+
+def ingest_lines(db: Session, lines: list[tuple[int, bytes]], report: IngestReport, header: Optional[list[str]] = None):
+    """Decode, validate and insert one chunk of lines, updating the report."""
+    report.lines += len(lines)
+    rows = validate_records(db, _decode(lines, header, report), report)
+    insert_price_rows(db, rows)
+    report.inserted += len(rows)
@@ -0,0 +1,186 @@
+"""
+Monte Carlo price-risk simulation for the whole catalog.
+
+Each item's price follows geometric Brownian motion from its latest price,
+with drift and volatility taken from its vendor's VendorVolatility
+(avg/stdev price change, read as % per day). Layer 3's shelf-life factor is
+applied to the simulated prices, as in the point forecast.
+
+Because GBM increments are independent, only the checkpoint horizons are
+simulated (items x paths x len(horizons)), not every day. Items are processed
+in chunks that bound the working array, spread over a thread pool. Each chunk
+draws from its own child seed, so a seed always reproduces the same result
+regardless of the number of workers.
+"""
+from __future__ import annotations
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from app import models, crud
+from app.services.price_forecast import calculate_shelf_life_factor
+
+# Vendors without volatility metrics: no drift, moderate 5% daily moves
+DEFAULT_DRIFT_PCT = 0.0
+DEFAULT_STDEV_PCT = 5.0
+# Largest items x paths x horizons block simulated at once (float32: 64 MB per worker)
+MAX_CHUNK_ELEMENTS = 1 << 24
+
+
+def simulate_checkpoints(
+    s0: np.ndarray,
+    drift: np.ndarray,
+    sigma: np.ndarray,
+    horizons: np.ndarray,
+    paths: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Simulate GBM prices at the checkpoint horizons only.
+
+    Args:
+        s0, drift, sigma: Per-item start price, daily drift and daily
+            volatility (fractions, not percent)
+        horizons: Increasing day offsets
+
+    Returns:
+        float32 array of shape items x paths x len(horizons)
+    """
+    steps = np.diff(horizons, prepend=0).astype(np.float32)
+    z = rng.standard_normal((len(s0), paths, len(horizons)), dtype=np.float32)
+    z *= np.sqrt(steps)
+    np.cumsum(z, axis=2, out=z)  # Brownian motion at each checkpoint
+    z *= sigma.astype(np.float32)[:, None, None]
+    z += (((drift - 0.5 * sigma ** 2)[:, None] * horizons).astype(np.float32))[:, None, :]
+    np.exp(z, out=z)
+    z *= s0.astype(np.float32)[:, None, None]
+    return z
+
+
+def _worker_count() -> int:
+    """Simulation threads: PRICE_RISK_WORKERS if set, otherwise one per CPU."""
+    configured = os.getenv("PRICE_RISK_WORKERS", "").strip()
+    return max(1, int(configured)) if configured else (os.cpu_count() or 1)
+
+
+def _load_inputs(db: Session, item_ids: Optional[Iterable[int]]) -> list[models.LatestPrice]:
+    """Latest price record for each requested (or every active) item."""
+    if item_ids is None:
+        item_ids = db.execute(select(models.Product.id).where(models.Product.active == True)).scalars().all()
+    latest = crud.get_latest_prices(db, item_ids)
+    return [latest[item_id] for item_id in sorted(latest)]
+
+
+def simulate_price_risk(
+    db: Session,
+    item_ids: Optional[list[int]] = None,
+    paths: int = 1000,
+    horizons: tuple[int, ...] = (7, 14, 30),
+    percentiles: tuple[float, ...] = (5, 50, 95),
+    seed: Optional[int] = None,
+    include_items: bool = True
+) -> dict:
+    """
+    Simulate price paths for many items and summarise the risk.
+
+    Cost per item is its simulated price times its latest purchase quantity;
+    category costs are summed per path with one matrix product per chunk.
+    baseline_cost is the cost at today's prices (before the shelf-life
+    factor); cost_at_risk is the 95th percentile cost minus the expected cost.
+
+    Returns:
+        Dict with seed, paths, horizons, items (percentile bands per item,
+        empty unless include_items) and categories (cost-at-risk per horizon)
+    """
+    horizons_arr = np.array(sorted(set(horizons)), dtype=np.int64)
+    if len(horizons_arr) == 0 or horizons_arr[0] < 1:
+        raise ValueError("Horizons must be positive day counts")
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise ValueError("Percentiles must be between 0 and 100")
+    records = _load_inputs(db, item_ids)
+    seed_seq = np.random.SeedSequence(seed)
+    result = {
+        "seed": int(seed_seq.entropy),
+        "paths": paths,
+        "horizons": horizons_arr.tolist(),
+        "items": [],
+        "categories": [],
+    }
+    if not records:
+        return result
+
+    vendor_vols = {v.vendor: v for v in db.execute(select(models.VendorVolatility)).scalars().all()}
+    n_items = len(records)
+    shelf = np.array([calculate_shelf_life_factor(r.shelf_life_days) for r in records])
+    s0 = np.array([float(r.unit_price) for r in records]) * shelf
+    drift = np.empty(n_items)
+    sigma = np.empty(n_items)
+    for i, r in enumerate(records):
+        vol = vendor_vols.get(r.vendor)
+        drift[i] = (float(vol.avg_price_change) if vol else DEFAULT_DRIFT_PCT) / 100
+        sigma[i] = (float(vol.stdev_price_change) if vol else DEFAULT_STDEV_PCT) / 100
+    quantity = np.array([float(r.purchase_quantity) for r in records])
+
+    # items x categories weights, so cost per category and path is one product
+    counts = Counter(r.category for r in records)
+    categories = sorted(counts)
+    cat_index = {c: j for j, c in enumerate(categories)}
+    weights = np.zeros((n_items, len(categories)), dtype=np.float32)
+    weights[np.arange(n_items), [cat_index[r.category] for r in records]] = quantity
+    category_cost = np.zeros((len(categories), paths, len(horizons_arr)), dtype=np.float64)
+
+    band_values = np.empty((len(percentiles), n_items, len(horizons_arr)), dtype=np.float32)
+    chunk = max(1, MAX_CHUNK_ELEMENTS // (paths * len(horizons_arr)))
+    starts = range(0, n_items, chunk)
+
+    def run_chunk(start: int, child: np.random.SeedSequence) -> np.ndarray:
+        stop = min(start + chunk, n_items)
+        prices = simulate_checkpoints(s0[start:stop], drift[start:stop], sigma[start:stop], horizons_arr, paths, np.random.default_rng(child))
+        if include_items:
+            band_values[:, start:stop, :] = np.percentile(prices, percentiles, axis=1)
+        return np.tensordot(weights[start:stop], prices, axes=(0, 0))
+
+    # NumPy's generators, percentile and tensordot release the GIL, so threads scale across cores
+    workers = min(_worker_count(), len(starts))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(run_chunk, starts, seed_seq.spawn(len(starts))):
+            category_cost += partial
+
+    if include_items:
+        for i, r in enumerate(records):
+            result["items"].append({
+                "item_id": r.item_id,
+                "vendor": r.vendor,
+                "category": r.category,
+                "current_price": float(r.unit_price),
+                "bands": [
+                    {
+                        "horizon_days": int(h),
+                        "percentiles": {f"p{p:g}": round(float(band_values[k, i, j]), 2) for k, p in enumerate(percentiles)},
+                    }
+                    for j, h in enumerate(horizons_arr)
+                ],
+            })
+
+    baseline = np.array([float(r.unit_price) for r in records]) @ weights
+    expected = category_cost.mean(axis=1)
+    p95 = np.percentile(category_cost, 95, axis=1)
+    for j, category in enumerate(categories):
+        result["categories"].append({
+            "category": category,
+            "items": counts[category],
+            "baseline_cost": round(float(baseline[j]), 2),
+            "horizons": [
+                {
+                    "horizon_days": int(h),
+                    "expected_cost": round(float(expected[j, k]), 2),
+                    "p95_cost": round(float(p95[j, k]), 2),
+                    "cost_at_risk": round(float(p95[j, k] - expected[j, k]), 2),
+                }
+                for k, h in enumerate(horizons_arr)
+            ],
+        })
+    return result
@@ -0,0 +1,271 @@
+"""
+Indexed product search by name and SKU.
+
+Substring matching (list_products, the dashboard ingredient lookups) and the
+ranked search endpoint use a trigram index instead of an ilike scan:
+
+- SQLite: products_fts, an FTS5 table with the trigram tokenizer over
+  products.name and products.sku. Triggers on products keep it current on
+  every insert, update and delete, from the ORM or raw SQL.
+- PostgreSQL: pg_trgm GIN indexes on products.name and products.sku, which
+  ilike '%...%' uses directly.
+- Anything else, or when neither is available (SQLite without FTS5 trigram,
+  no permission to create pg_trgm): an in-process trigram index, built on
+  first use and kept current by Product insert/update/delete mapper events.
+
+ensure_search_index() (called from init_db) creates the index. Trigrams need
+at least 3 characters, so shorter search terms are matched with ilike.
+"""
+from __future__ import annotations
+import re
+import threading
+from collections import defaultdict
+from typing import Iterable
+from sqlalchemy import event, select, text, table, column, literal, literal_column, func, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app import models
+
+MIN_TERM_LENGTH = 3
+# bm25 weights for (name, sku): a SKU hit is a near-exact lookup
+BM25_WEIGHTS = (1.0, 5.0)
+
+_SQLITE_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, sku, content='products', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, name, sku) VALUES (new.id, new.name, new.sku); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, sku) VALUES ('delete', old.id, old.name, old.sku); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, sku ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, sku) VALUES ('delete', old.id, old.name, old.sku); "
+    "INSERT INTO products_fts(rowid, name, sku) VALUES (new.id, new.name, new.sku); END",
+]
+_POSTGRES_SCHEMA = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_sku_trgm ON products USING gin (sku gin_trgm_ops)",
+]
+
+products_fts = table("products_fts", column("rowid"), column("products_fts"), column("rank"))
+
+# Backend per database URL: "fts5", "pg_trgm" or "ngram"
+_backends: dict[str, str] = {}
+
+
+def ensure_search_index(engine: Engine):
+    """Create the search index for the engine's database if it is missing."""
+    dialect = engine.dialect.name
+    try:
+        if dialect == "sqlite":
+            with engine.begin() as conn:
+                created = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'products_fts'")).first() is None
+                for statement in _SQLITE_SCHEMA:
+                    conn.execute(text(statement))
+                if created:
+                    conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+        elif dialect == "postgresql":
+            with engine.begin() as conn:
+                for statement in _POSTGRES_SCHEMA:
+                    conn.execute(text(statement))
+    except DBAPIError as e:
+        print(f"Warning: Could not create the product search index ({e.orig}); using the in-process index")
+    _backends.pop(str(engine.url), None)
+
+
+def _detect_backend(db: Session) -> str:
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        found = db.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'products_fts'")).first()
+        return "fts5" if found else "ngram"
+    if dialect == "postgresql":
+        found = db.execute(text("SELECT 1 FROM pg_indexes WHERE indexname = 'ix_products_name_trgm'")).first()
+        return "pg_trgm" if found else "ngram"
+    return "ngram"
+
+
+def search_backend(db: Session) -> str:
+    """Index used for the session's database."""
+    key = str(db.get_bind().url)
+    backend = _backends.get(key)
+    if backend is None:
+        backend = _backends[key] = _detect_backend(db)
+    return backend
+
+
+def _terms(q: str) -> list[str]:
+    return [t for t in re.split(r"\s+", q.strip()) if t]
+
+
+def _phrase(value: str) -> str:
+    """FTS5 string literal; with the trigram tokenizer it matches the substring."""
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _trigrams(value: str) -> set[str]:
+    value = value.lower()
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class TrigramIndex:
+    """In-process trigram postings over product names and SKUs."""
+
+    def __init__(self):
+        self._postings: dict[str, set[int]] = defaultdict(set)
+        # product id -> (lowercase name, lowercase sku)
+        self._docs: dict[int, tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, product_id: int, name: str, sku: str):
+        with self._lock:
+            self._remove(product_id)
+            doc = ((name or "").lower(), (sku or "").lower())
+            self._docs[product_id] = doc
+            for gram in _trigrams(doc[0]) | _trigrams(doc[1]):
+                self._postings[gram].add(product_id)
+
+    def remove(self, product_id: int):
+        with self._lock:
+            self._remove(product_id)
+
+    def _remove(self, product_id: int):
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+        for gram in _trigrams(doc[0]) | _trigrams(doc[1]):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def _candidates(self, term: str) -> set[int]:
+        grams = sorted(_trigrams(term), key=lambda g: len(self._postings.get(g, ())))
+        if not grams:
+            return set(self._docs)
+        ids = set(self._postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not ids:
+                break
+            ids &= self._postings.get(gram, set())
+        return ids
+
+    def match(self, term: str, fields: tuple[int, ...] = (0, 1)) -> set[int]:
+        """Ids whose name or SKU (fields 0, 1) contains the term, ignoring case."""
+        term = term.lower()
+        with self._lock:
+            return {i for i in self._candidates(term) if any(term in self._docs[i][f] for f in fields)}
+
+
+def _coverage(name: str, sku: str, terms: list[str]) -> float:
+    """Share of the name or SKU covered by the terms; an exact SKU scores highest."""
+    name, sku = (name or "").lower(), (sku or "").lower()
+    if sku and " ".join(terms).lower() == sku:
+        return 2.0
+    covered = sum(len(t) for t in terms)
+    return max(covered / len(name) if name else 0.0, covered / len(sku) if sku else 0.0)
+
+
+_ngram_index: TrigramIndex | None = None
+_ngram_lock = threading.Lock()
+
+
+def _get_ngram_index(db: Session) -> TrigramIndex:
+    global _ngram_index
+    with _ngram_lock:
+        if _ngram_index is None:
+            index = TrigramIndex()
+            for product_id, name, sku in db.execute(select(models.Product.id, models.Product.name, models.Product.sku)):
+                index.add(product_id, name, sku)
+            _ngram_index = index
+        return _ngram_index
+
+
+@event.listens_for(models.Product, "after_insert")
+@event.listens_for(models.Product, "after_update")
+def _index_product(mapper, connection, target: models.Product):
+    if _ngram_index is not None:
+        _ngram_index.add(target.id, target.name, target.sku)
+
+
+@event.listens_for(models.Product, "after_delete")
+def _unindex_product(mapper, connection, target: models.Product):
+    if _ngram_index is not None:
+        _ngram_index.remove(target.id)
+
+
+def _term_clause(db: Session, term: str, name_only: bool = False):
+    """Products whose name (or SKU) contains `term`, through the index where possible."""
+    product = models.Product
+    columns = [product.name] if name_only else [product.name, product.sku]
+    backend = search_backend(db)
+    if len(term) < MIN_TERM_LENGTH or backend == "pg_trgm":
+        return or_(*(c.ilike(f"%{term}%") for c in columns))
+    if backend == "fts5":
+        query = f"name : {_phrase(term)}" if name_only else _phrase(term)
+        return product.id.in_(select(products_fts.c.rowid).where(products_fts.c.products_fts.op("MATCH")(query)))
+    return product.id.in_(_get_ngram_index(db).match(term, (0,) if name_only else (0, 1)))
+
+
+def contains_clause(db: Session, q: str):
+    """Filter for products whose name or SKU contains `q` (case-insensitive)."""
+    return _term_clause(db, q.strip())
+
+
+def name_contains_any(db: Session, names: Iterable[str]):
+    """Filter for products whose name contains any of `names` (case-insensitive)."""
+    names = [n for n in names if n]
+    if search_backend(db) == "fts5" and all(len(n) >= MIN_TERM_LENGTH for n in names):
+        # One MATCH for the whole list
+        query = "name : (" + " OR ".join(_phrase(n) for n in names) + ")"
+        return models.Product.id.in_(select(products_fts.c.rowid).where(products_fts.c.products_fts.op("MATCH")(query)))
+    return or_(*(_term_clause(db, n, name_only=True) for n in names))
+
+
+def search_products(db: Session, q: str, limit: int = 20, active_only: bool = True) -> list[dict]:
+    """
+    Ranked product search: every word of `q` must appear in the name or SKU.
+
+    Args:
+        q: Search text
+        limit: Maximum results
+        active_only: Skip inactive products
+
+    Returns:
+        List of dicts with product and score (higher is better), best first
+    """
+    terms = _terms(q)
+    if not terms:
+        return []
+    product = models.Product
+    backend = search_backend(db)
+    indexed = [t for t in terms if len(t) >= MIN_TERM_LENGTH]
+    short = [t for t in terms if len(t) < MIN_TERM_LENGTH]
+
+    if backend == "fts5" and indexed:
+        score = (-func.bm25(literal_column("products_fts"), *BM25_WEIGHTS)).label("score")
+        stmt = (
+            select(product, score)
+            .join(products_fts, products_fts.c.rowid == product.id)
+            .where(products_fts.c.products_fts.op("MATCH")(" ".join(_phrase(t) for t in indexed)))
+            .where(*(_term_clause(db, t) for t in short))
+            .order_by(score.desc(), product.id)
+        )
+    elif backend == "pg_trgm":
+        text_q = " ".join(terms)
+        score = func.greatest(func.word_similarity(literal(text_q), product.name), func.similarity(product.sku, literal(text_q))).label("score")
+        stmt = select(product, score).where(*(_term_clause(db, t) for t in terms)).order_by(score.desc(), product.id)
+    else:
+        stmt = select(product, literal(0.0).label("score")).where(*(_term_clause(db, t) for t in terms))
+
+    if active_only:
+        stmt = stmt.where(product.active == True)
+    if backend == "pg_trgm" or (backend == "fts5" and indexed):
+        hits = [(p, float(s or 0)) for p, s in db.execute(stmt.limit(limit)).all()]
+    else:
+        # No index score: rank the matches in Python
+        hits = [(p, _coverage(p.name, p.sku, terms)) for p, _ in db.execute(stmt).all()]
+        hits.sort(key=lambda hit: (-hit[1], hit[0].id))
+        hits = hits[:limit]
+    return [{"product": p, "score": round(s, 4)} for p, s in hits]
@@ -0,0 +1,230 @@
+"""
+Pre-aggregated daily sales cube.
+
+sales_daily_cube holds quantity, revenue and cost summed per (location, date,
+product, cocktail, service type), so dashboards read a few rows per location
+and day instead of scanning sales_records.
+
+A session after_flush hook adds every new SalesRecord into its cell with an
+additive upsert, covering every ORM insert (API, seed scripts, loaders).
+Updates and deletes of sales, and raw SQL inserts, need a rebuild:
+
+    python -m app.rebuild_sales_cube
+
+rollup() answers day/week/month x location/region x category questions from
+the cube; narrowing the filters (region -> location, month -> day) drills down.
+"""
+from __future__ import annotations
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional
+from sqlalchemy import event, select, delete, insert, func, case, cast, Date
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app import models
+
+KEY_COLUMNS = ("location_id", "date", "product_id", "cocktail_id", "service_type")
+MEASURES = ("quantity", "revenue", "cost", "sales_count")
+GRAINS = ("day", "week", "month")
+DIMENSIONS = ("location", "region")
+
+
+def _key(record: models.SalesRecord) -> tuple:
+    return (record.location_id, record.date, record.product_id or 0, record.cocktail_id or 0, record.service_type or "")
+
+
+def _aggregate(records: Iterable[models.SalesRecord]) -> list[dict]:
+    """Sum records into cube cells."""
+    cells: dict[tuple, dict] = {}
+    for r in records:
+        key = _key(r)
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = dict(zip(KEY_COLUMNS, key), quantity=0, revenue=Decimal(0), cost=Decimal(0), sales_count=0, first_sale_id=r.id)
+        cell["quantity"] += r.quantity
+        cell["revenue"] += Decimal(str(r.revenue))
+        cell["cost"] += Decimal(str(r.cost))
+        cell["sales_count"] += 1
+        cell["first_sale_id"] = min(cell["first_sale_id"], r.id)
+    return list(cells.values())
+
+
+def add_sales(connection: Connection, records: Iterable[models.SalesRecord]):
+    """Add flushed sales records to their cube cells."""
+    rows = _aggregate(records)
+    if not rows:
+        return
+    table = models.SalesDailyCube.__table__
+    dialect = connection.dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        set_ = {c: table.c[c] + stmt.excluded[c] for c in MEASURES}
+        set_["first_sale_id"] = case(
+            (stmt.excluded.first_sale_id < table.c.first_sale_id, stmt.excluded.first_sale_id),
+            else_=table.c.first_sale_id
+        )
+        set_["updated_at"] = func.now()
+        connection.execute(stmt.on_conflict_do_update(index_elements=list(KEY_COLUMNS), set_=set_))
+        return
+
+    for row in rows:
+        match = [table.c[c] == row[c] for c in KEY_COLUMNS]
+        current = connection.execute(select(table.c.first_sale_id).where(*match)).first()
+        if current is None:
+            connection.execute(insert(table).values(row))
+        else:
+            connection.execute(
+                table.update()
+                .where(*match)
+                .values(
+                    **{c: table.c[c] + row[c] for c in MEASURES},
+                    first_sale_id=min(current.first_sale_id, row["first_sale_id"]),
+                    updated_at=func.now()
+                )
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _track_sales(session: Session, flush_context):
+    # session.new still lists the objects inserted by this flush
+    new_sales = [obj for obj in session.new if isinstance(obj, models.SalesRecord)]
+    if new_sales:
+        add_sales(session.connection(), new_sales)
+
+
+def rebuild_sales_cube(db: Session) -> int:
+    """
+    Recompute sales_daily_cube from sales_records in one INSERT ... SELECT.
+
+    Returns:
+        Number of cube cells
+    """
+    sr = models.SalesRecord
+    keys = (
+        sr.location_id,
+        sr.date,
+        func.coalesce(sr.product_id, 0),
+        func.coalesce(sr.cocktail_id, 0),
+        func.coalesce(sr.service_type, ""),
+    )
+    source = select(
+        *keys,
+        func.sum(sr.quantity),
+        func.sum(sr.revenue),
+        func.sum(sr.cost),
+        func.count(),
+        func.min(sr.id),
+    ).group_by(*keys)
+
+    db.execute(delete(models.SalesDailyCube))
+    db.execute(insert(models.SalesDailyCube).from_select([*KEY_COLUMNS, *MEASURES, "first_sale_id"], source))
+    db.commit()
+    return db.execute(select(func.count()).select_from(models.SalesDailyCube)).scalar_one()
+
+
+def backfill_if_empty():
+    """Populate sales_daily_cube on first start against a database that already has sales."""
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        if db.execute(select(models.SalesDailyCube.id).limit(1)).first() is None and \
+                db.execute(select(models.SalesRecord.id).limit(1)).first() is not None:
+            count = rebuild_sales_cube(db)
+            print(f"✓ Backfilled sales cube with {count} cells")
+    finally:
+        db.close()
+        SessionLocal.remove()
+
+
+def _period(column, grain: str, dialect: str):
+    """Start of the day, ISO week (Monday) or month containing `column`."""
+    if grain == "day":
+        return column
+    if dialect == "sqlite":
+        if grain == "week":
+            return func.date(column, "weekday 0", "-6 days")
+        return func.date(column, "start of month")
+    return cast(func.date_trunc(grain, column), Date)
+
+
+def rollup(
+    db: Session,
+    grain: str = "day",
+    by: str = "location",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    region: Optional[str] = None,
+    location_id: Optional[int] = None,
+    category: Optional[str] = None,
+    by_category: bool = True
+) -> list[dict]:
+    """
+    Roll the cube up to a period grain and a location or region level.
+
+    Product sales fall under their product category, cocktail sales under the
+    cocktail's category.
+
+    Args:
+        grain: day, week (starting Monday) or month
+        by: location or region
+        start, end: Inclusive date range
+        region, location_id, category: Filters, for drilling down
+        by_category: Also group by category
+
+    Returns:
+        List of dicts with period, location_id or region, category (when
+        grouped), quantity, revenue, cost and sales_count, in period order
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain {grain!r}. Expected one of: {', '.join(GRAINS)}")
+    if by not in DIMENSIONS:
+        raise ValueError(f"Unknown level {by!r}. Expected one of: {', '.join(DIMENSIONS)}")
+
+    cube = models.SalesDailyCube
+    period = _period(cube.date, grain, db.get_bind().dialect.name).label("period")
+    level = (cube.location_id if by == "location" else func.coalesce(models.Location.region, "")).label(
+        "location_id" if by == "location" else "region"
+    )
+    category_name = func.coalesce(models.Category.name, models.Cocktail.category, "").label("category")
+    groups = [period, level, category_name] if by_category else [period, level]
+
+    stmt = (
+        select(
+            *groups,
+            func.sum(cube.quantity).label("quantity"),
+            func.sum(cube.revenue).label("revenue"),
+            func.sum(cube.cost).label("cost"),
+            func.sum(cube.sales_count).label("sales_count"),
+        )
+        .outerjoin(models.Location, models.Location.id == cube.location_id)
+        .outerjoin(models.Product, models.Product.id == cube.product_id)
+        .outerjoin(models.ProductType, models.ProductType.id == models.Product.product_type_id)
+        .outerjoin(models.Category, models.Category.id == models.ProductType.category_id)
+        .outerjoin(models.Cocktail, models.Cocktail.id == cube.cocktail_id)
+        .group_by(*groups)
+        .order_by(*groups)
+    )
+    if start is not None:
+        stmt = stmt.where(cube.date >= start)
+    if end is not None:
+        stmt = stmt.where(cube.date <= end)
+    if region is not None:
+        stmt = stmt.where(models.Location.region == region)
+    if location_id is not None:
+        stmt = stmt.where(cube.location_id == location_id)
+    if category is not None:
+        stmt = stmt.where(category_name == category)
+
+    results = []
+    for row in db.execute(stmt):
+        values = dict(row._mapping)
+        values["period"] = str(values["period"])[:10]
+        for measure in ("revenue", "cost"):
+            values[measure] = round(float(values[measure] or 0), 2)
+        results.append(values)
+    return results
@@ -0,0 +1,202 @@
+"""
+Vendor delivery performance from purchase orders and receiving logs.
+
+For every non-draft order created in the rolling window, receiving is read
+from InventoryLog rows with ref_type "order" (ref_id = order id, positive
+qty_change). Per supplier:
+
+- on-time %: share of due orders (received, or past their ETA) whose first
+  receipt arrived on or before eta_date; unreceived orders past ETA are late
+- fill rate: units received (capped at the ordered quantity per line) over
+  units ordered, for due orders
+- lead time: days from order creation to first receipt (mean, p50, p90,
+  min, max)
+
+Orders are reduced to one row each in SQL; only that per-order frame is
+aggregated in pandas. Results are materialized in vendor_performance, one
+row per supplier, by refresh_vendor_performance() (daily job, or on first
+start when the table is empty).
+"""
+from __future__ import annotations
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, func, case, and_
+from app import models, crud
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+WINDOW_DAYS = 90
+# Orders in these states are not expected to be delivered
+EXCLUDED_STATUSES = ("draft", "cancelled")
+
+
+def load_order_outcomes(db: Session, since: date) -> pd.DataFrame:
+    """
+    One row per order created since `since`, with delivery outcome.
+
+    Returns:
+        DataFrame with columns order_id, supplier_id, created_at, eta_date,
+        ordered, filled, first_received
+    """
+    import pandas as pd
+
+    il = models.InventoryLog
+    oi = models.OrderItem
+    order = models.Order
+    since_dt = datetime.combine(since, datetime.min.time())
+
+    # Receipts can only follow the order, so the window bounds them too
+    receipts = (
+        select(
+            il.ref_id.label("order_id"),
+            il.product_id,
+            func.sum(il.qty_change).label("received"),
+            func.min(il.created_at).label("first_received"),
+        )
+        .where(il.ref_type == "order", il.qty_change > 0, il.created_at >= since_dt)
+        .group_by(il.ref_id, il.product_id)
+        .subquery()
+    )
+    received = func.coalesce(receipts.c.received, 0)
+    stmt = (
+        select(
+            order.id,
+            order.supplier_id,
+            order.created_at,
+            order.eta_date,
+            func.sum(oi.qty),
+            func.sum(case((received >= oi.qty, oi.qty), else_=received)),
+            func.min(receipts.c.first_received),
+        )
+        .join(oi, oi.order_id == order.id)
+        .outerjoin(receipts, and_(receipts.c.order_id == order.id, receipts.c.product_id == oi.product_id))
+        .where(
+            order.created_at >= since_dt,
+            order.supplier_id.is_not(None),
+            order.status.not_in(EXCLUDED_STATUSES)
+        )
+        .group_by(order.id, order.supplier_id, order.created_at, order.eta_date)
+    )
+    frame = pd.DataFrame(
+        db.execute(stmt).all(),
+        columns=["order_id", "supplier_id", "created_at", "eta_date", "ordered", "filled", "first_received"]
+    )
+    frame["created_at"] = pd.to_datetime(frame["created_at"])
+    frame["first_received"] = pd.to_datetime(frame["first_received"])
+    frame["eta_date"] = pd.to_datetime(frame["eta_date"])
+    return frame
+
+
+def summarize_orders(orders: pd.DataFrame, as_of: date) -> pd.DataFrame:
+    """
+    Aggregate per-order outcomes into per-supplier performance.
+
+    Returns:
+        DataFrame indexed by supplier_id
+    """
+    import pandas as pd
+
+    received_day = orders["first_received"].dt.normalize()
+    is_received = orders["first_received"].notna()
+    has_eta = orders["eta_date"].notna()
+    due = has_eta & (is_received | (orders["eta_date"] < pd.Timestamp(as_of)))
+    on_time = due & is_received & (received_day <= orders["eta_date"])
+    closed = is_received | due
+
+    frame = pd.DataFrame({
+        "supplier_id": orders["supplier_id"],
+        "due": due,
+        "on_time": on_time,
+        "ordered": orders["ordered"].astype(float).where(closed, 0.0),
+        "filled": orders["filled"].astype(float).where(closed, 0.0),
+        "lead_days": (received_day - orders["created_at"].dt.normalize()).dt.days,
+    })
+    grouped = frame.groupby("supplier_id")
+    summary = pd.DataFrame({
+        "orders": grouped.size(),
+        "due_orders": grouped["due"].sum(),
+        "on_time_orders": grouped["on_time"].sum(),
+        "ordered": grouped["ordered"].sum(),
+        "filled": grouped["filled"].sum(),
+        "lead_time_mean": grouped["lead_days"].mean(),
+        "lead_time_p50": grouped["lead_days"].quantile(0.5),
+        "lead_time_p90": grouped["lead_days"].quantile(0.9),
+        "lead_time_min": grouped["lead_days"].min(),
+        "lead_time_max": grouped["lead_days"].max(),
+    })
+    summary["late_orders"] = summary["due_orders"] - summary["on_time_orders"]
+    summary["on_time_pct"] = (summary["on_time_orders"] / summary["due_orders"] * 100).where(summary["due_orders"] > 0)
+    summary["fill_rate"] = (summary["filled"] / summary["ordered"] * 100).where(summary["ordered"] > 0)
+    return summary
+
+
+def _number(value, digits: Optional[int] = 2):
+    """NaN-safe conversion for storing pandas values."""
+    if value is None or value != value:
+        return None
+    return round(float(value), digits) if digits is not None else int(value)
+
+
+def refresh_vendor_performance(db: Session, window_days: int = WINDOW_DAYS, as_of: Optional[date] = None) -> int:
+    """
+    Recompute vendor_performance over the last `window_days` of orders.
+
+    Suppliers without orders in the window are removed.
+
+    Returns:
+        Number of suppliers stored
+    """
+    as_of = as_of or date.today()
+    window_start = as_of - timedelta(days=window_days)
+    summary = summarize_orders(load_order_outcomes(db, window_start), as_of)
+    names = dict(db.execute(
+        select(models.Supplier.id, models.Supplier.name).where(models.Supplier.id.in_([int(i) for i in summary.index]))
+    ).all())
+
+    crud.bulk_upsert(db, models.VendorPerformance, [
+        {
+            "supplier_id": int(supplier_id),
+            "vendor": names.get(int(supplier_id), str(supplier_id)),
+            "window_start": window_start,
+            "orders": int(r["orders"]),
+            "due_orders": int(r["due_orders"]),
+            "on_time_orders": int(r["on_time_orders"]),
+            "late_orders": int(r["late_orders"]),
+            "on_time_pct": _number(r["on_time_pct"]),
+            "fill_rate": _number(r["fill_rate"]),
+            "lead_time_mean": _number(r["lead_time_mean"]),
+            "lead_time_p50": _number(r["lead_time_p50"]),
+            "lead_time_p90": _number(r["lead_time_p90"]),
+            "lead_time_min": _number(r["lead_time_min"], None),
+            "lead_time_max": _number(r["lead_time_max"], None),
+        }
+        for supplier_id, r in summary.iterrows()
+    ], index_elements=["supplier_id"])
+    db.execute(delete(models.VendorPerformance).where(models.VendorPerformance.supplier_id.not_in([int(i) for i in summary.index])))
+    db.commit()
+    return len(summary)
+
+
+def backfill_if_empty():
+    """Populate vendor_performance on first start against a database that already has orders."""
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        if db.execute(select(models.VendorPerformance.id).limit(1)).first() is None and \
+                db.execute(select(models.Order.id).limit(1)).first() is not None:
+            count = refresh_vendor_performance(db)
+            print(f"✓ Backfilled vendor performance for {count} suppliers")
+    finally:
+        db.close()
+        SessionLocal.remove()
+
+
+def get_vendor_performance(db: Session) -> dict[str, models.VendorPerformance]:
+    """
+    Materialized performance by vendor name. Read-only: the table is filled
+    by init_db on first start and by refresh_vendor_performance().
+    """
+    rows = db.execute(select(models.VendorPerformance)).scalars().all()
+    return {row.vendor: row for row in rows}
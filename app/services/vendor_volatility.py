@@ -0,0 +1,161 @@
+"""
+Vendor volatility computed from price history (layer 2 inputs).
+
+Every price history row is compared with the previous price of the same
+(item, vendor) series; the percentage changes are then aggregated per vendor
+into avg_price_change and stdev_price_change on VendorVolatility.
+
+Per-vendor running moments (count, mean, M2) are kept in
+vendor_price_change_stats, so an incremental run only reads price rows added
+after each vendor's last run (price_history.id above through_id, whatever
+their date) and merges their changes in (Chan et al. parallel variance). A
+backdated row also alters the already merged change of the row after it;
+only a full recompute corrects that.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, func, inspect
+from sqlalchemy.engine import Engine
+from app import models, crud
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# New vendors start here; reliability and lead time are maintained by hand
+DEFAULT_RELIABILITY = 0.0
+# VendorVolatility percentages are Numeric(6,4)
+MAX_PCT = 99.9999
+
+
+def ensure_through_id_column(engine: Engine):
+    """Add vendor_price_change_stats.through_id to a table created before it existed."""
+    columns = {c["name"] for c in inspect(engine).get_columns("vendor_price_change_stats")}
+    if "through_id" not in columns:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ALTER TABLE vendor_price_change_stats ADD COLUMN through_id INTEGER")
+
+
+def load_price_changes(db: Session, incremental: bool = True) -> pd.DataFrame:
+    """
+    Percentage change of every price against the previous price in its series.
+
+    The previous price comes from a LAG window over the whole table, so a
+    change that straddles the last run is still computed correctly.
+
+    Args:
+        incremental: Only return changes of rows added after the vendor's
+            through_id
+
+    Returns:
+        DataFrame with columns id (price_history id), vendor, date, pct_change
+    """
+    import pandas as pd
+
+    ph = models.PriceHistory
+    stats = models.VendorPriceChangeStats
+    prev_price = func.lag(ph.unit_price).over(partition_by=(ph.item_id, ph.vendor), order_by=(ph.date, ph.id))
+    changes = select(ph.id, ph.vendor, ph.date, ph.unit_price, prev_price.label("prev_price")).subquery()
+
+    stmt = select(changes.c.id, changes.c.vendor, changes.c.date, changes.c.unit_price, changes.c.prev_price).where(
+        changes.c.prev_price.is_not(None),
+        changes.c.prev_price != 0
+    )
+    if incremental:
+        stmt = stmt.outerjoin(stats, stats.vendor == changes.c.vendor).where(
+            stats.id.is_(None)
+            | (changes.c.id > stats.through_id)
+            # Stats written before through_id existed: their last run's date
+            | (stats.through_id.is_(None) & (changes.c.date > stats.through_date))
+        )
+
+    frame = pd.DataFrame(db.execute(stmt).all(), columns=["id", "vendor", "date", "unit_price", "prev_price"])
+    price = frame["unit_price"].astype(float)
+    prev = frame["prev_price"].astype(float)
+    frame["pct_change"] = (price - prev) / prev * 100
+    return frame[["id", "vendor", "date", "pct_change"]]
+
+
+def merge_moments(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Combine per-vendor (n, mean, m2) moments from two disjoint batches.
+
+    Both frames are indexed by vendor; vendors missing on one side keep the
+    other side's moments.
+    """
+    columns = ["n", "mean", "m2"]
+    both = old[columns].astype(float).join(new[columns].astype(float), how="outer", lsuffix="_a", rsuffix="_b").fillna(0.0)
+    n = both["n_a"] + both["n_b"]
+    delta = both["mean_b"] - both["mean_a"]
+    safe_n = n.where(n > 0, 1)
+    merged = both[[]].copy()
+    merged["n"] = n.astype(int)
+    merged["mean"] = both["mean_a"] + delta * both["n_b"] / safe_n
+    merged["m2"] = both["m2_a"] + both["m2_b"] + delta * delta * both["n_a"] * both["n_b"] / safe_n
+    return merged
+
+
+def recompute_vendor_volatility(db: Session, full: bool = False) -> dict:
+    """
+    Recompute VendorVolatility from price history and upsert every vendor.
+
+    Args:
+        full: Discard the running moments and rescan all history
+
+    Returns:
+        Dict with mode, changes (price changes read) and vendors (updated names)
+    """
+    import pandas as pd
+
+    if full:
+        db.execute(delete(models.VendorPriceChangeStats))
+
+    changes = load_price_changes(db, incremental=not full)
+    grouped = changes.groupby("vendor")
+    batch = pd.DataFrame({
+        "n": grouped["pct_change"].count(),
+        "mean": grouped["pct_change"].mean(),
+        "m2": grouped["pct_change"].var(ddof=0) * grouped["pct_change"].count(),
+        "through_date": grouped["date"].max(),
+        "through_id": grouped["id"].max(),
+    })
+    if batch.empty:
+        db.commit()
+        return {"mode": "full" if full else "incremental", "changes": 0, "vendors": []}
+
+    stats_rows = db.execute(select(models.VendorPriceChangeStats)).scalars().all()
+    previous = pd.DataFrame(
+        [(s.vendor, s.n, s.mean, s.m2) for s in stats_rows],
+        columns=["vendor", "n", "mean", "m2"]
+    ).set_index("vendor")
+    merged = merge_moments(previous, batch[["n", "mean", "m2"]]).loc[batch.index]
+    merged["through_date"] = batch["through_date"]
+    merged["through_id"] = batch["through_id"]
+
+    crud.bulk_upsert(db, models.VendorPriceChangeStats, [
+        {"vendor": vendor, "n": int(r["n"]), "mean": float(r["mean"]), "m2": float(r["m2"]), "through_date": r["through_date"],
+         "through_id": int(r["through_id"])}
+        for vendor, r in merged.iterrows()
+    ], index_elements=["vendor"])
+
+    # A standard deviation needs at least two changes
+    merged = merged[merged["n"] >= 2]
+    stdev = np.sqrt(merged["m2"] / (merged["n"] - 1))
+    lead_times = dict(db.execute(
+        select(models.Supplier.name, models.Supplier.lead_time_days).where(models.Supplier.name.in_(list(merged.index)))
+    ).all())
+    crud.bulk_upsert(db, models.VendorVolatility, [
+        {
+            "vendor": vendor,
+            "avg_price_change": round(float(np.clip(merged.at[vendor, "mean"], -MAX_PCT, MAX_PCT)), 4),
+            "stdev_price_change": round(float(min(stdev[vendor], MAX_PCT)), 4),
+            # Only used when the vendor has no row yet
+            "reliability_score": DEFAULT_RELIABILITY,
+            "lead_time_days": lead_times.get(vendor) or 7,
+        }
+        for vendor in merged.index
+    ], index_elements=["vendor"], update_columns=["avg_price_change", "stdev_price_change"])
+    db.commit()
+
+    return {"mode": "full" if full else "incremental", "changes": len(changes), "vendors": list(merged.index)}
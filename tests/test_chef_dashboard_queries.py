@@ -0,0 +1,141 @@
+"""
+GET /dashboards/chef issues a fixed number of SQL statements however many key
+ingredients it tracks (no per-ingredient queries), whether the price
+forecasts come from materialized rows or from the live batch fallback.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from app.database import Base
+from app import models, crud
+from app.routers import dashboards
+from app.services import product_search, price_forecast
+from app.services.dashboard_cache import dashboard_cache
+from app.services.forecast_cache import forecast_cache
+from app.services.forecast_store import HORIZONS
+
+# One product per CHEF_KEY_INGREDIENTS entry, each matching only its own name
+PRODUCTS = [
+    ("Beef Filet", "meat"), ("Ribeye Steak", "meat"), ("NY Strip Loin", "meat"), ("Short Rib", "meat"),
+    ("Atlantic Salmon", "seafood"), ("Sea Scallops", "seafood"), ("Ahi Tuna", "seafood"),
+    ("Broccolini", "produce"), ("Green Asparagus", "produce"), ("Yukon Potatoes", "produce"),
+]
+LOCATION_ID = 1
+
+
+@dataclass
+class Dashboard:
+    client: TestClient
+    expected_source: str
+    statements: list[str] = field(default_factory=list)
+    sources: list[str] = field(default_factory=list)
+    fallbacks: list[bool] = field(default_factory=list)
+
+
+def seed(engine, materialized: bool):
+    today = date.today()
+    with Session(engine) as db:
+        department = models.Department(name="Kitchen")
+        category = models.Category(name="Food", department=department)
+        product_type = models.ProductType(name="Ingredient", category=category)
+        db.add(models.Location(id=LOCATION_ID, name="Downtown"))
+        for i, (name, category_name) in enumerate(PRODUCTS):
+            product = models.Product(sku=f"CHEF-{i}", name=name, product_type=product_type)
+            db.add(product)
+            db.flush()
+            for days_ago, price in ((3, 10.0 + i), (2, 10.2 + i), (1, 10.5 + i)):
+                db.add(models.PriceHistory(
+                    item_id=product.id, vendor="US Foods", date=today - timedelta(days=days_ago),
+                    unit_price=price, unit_cost=price * 0.8, purchase_quantity=10, shelf_life_days=5,
+                    category=category_name, season="fall"
+                ))
+            db.add(models.PrepRecord(
+                location_id=LOCATION_ID, product_id=product.id, date=today,
+                ideal_prep_qty=10, actual_prep_qty=11, waste_qty=1, waste_score=10, trim_yield=90
+            ))
+        db.commit()
+        if materialized:
+            # Prices landed before the nightly run, so every materialized forecast is fresh
+            db.execute(update(models.LatestPrice).values(updated_at=datetime.utcnow() - timedelta(hours=1)))
+            crud.upsert_forecasts(db, [
+                {"product_id": product_id, "date": today, "horizon_days": horizon, "forecast_qty": 12.0, "model_version": "price-v1"}
+                for product_id in range(1, len(PRODUCTS) + 1)
+                for horizon in HORIZONS
+            ])
+
+
+@pytest.fixture(params=["materialized", "live"])
+def dashboard(request, tmp_path, monkeypatch):
+    """A client for the dashboards router on a seeded database, with every SQL statement recorded."""
+    url = f"sqlite:///{tmp_path / 'chef.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    product_search.ensure_search_index(engine)
+    seed(engine, materialized=request.param == "materialized")
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+
+    # The endpoint's sessions (async sections and the sync forecast batch) on this database
+    monkeypatch.setattr(dashboards, "new_async_session", async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False))
+    monkeypatch.setattr(dashboards, "SessionLocal", scoped_session(sessionmaker(bind=engine, autoflush=False)))
+    monkeypatch.setattr(dashboard_cache, "ttl_seconds", 0)
+    monkeypatch.setattr(forecast_cache, "cache_dir", None)
+    monkeypatch.setattr(price_forecast, "_prophet_class", lambda: None)
+    forecast_cache.clear()
+
+    app = FastAPI()
+    app.include_router(dashboards.router)
+    dashboard = Dashboard(TestClient(app), expected_source=request.param)
+
+    # A section that hits its error fallback would return fewer rows, not fewer queries
+    monkeypatch.setattr(dashboards, "skip_cache", lambda: dashboard.fallbacks.append(True))
+    get_price_forecasts = dashboards.get_price_forecasts
+
+    def recording_price_forecasts(db, latest_prices, *args, **kwargs):
+        forecasts = get_price_forecasts(db, latest_prices, *args, **kwargs)
+        dashboard.sources.extend(f["source"] for f in forecasts.values())
+        return forecasts
+
+    monkeypatch.setattr(dashboards, "get_price_forecasts", recording_price_forecasts)
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        dashboard.statements.append(statement)
+
+    for sync_engine in (engine, async_engine.sync_engine):
+        event.listen(sync_engine, "before_cursor_execute", record)
+
+    yield dashboard
+    dashboard.client.close()
+    forecast_cache.clear()
+    dashboards.SessionLocal.remove()
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+def count_statements(dashboard: Dashboard, monkeypatch, ingredients: list[str]) -> int:
+    monkeypatch.setattr(dashboards, "CHEF_KEY_INGREDIENTS", ingredients)
+    forecast_cache.clear()
+    dashboard.statements.clear()
+    dashboard.sources.clear()
+
+    response = dashboard.client.get("/dashboards/chef", params={"location_id": LOCATION_ID})
+
+    assert response.status_code == 200
+    assert len(response.json()["ingredient_status"]) == len(ingredients)
+    assert dashboard.fallbacks == []
+    assert dashboard.sources == [dashboard.expected_source] * len(ingredients)
+    return len(dashboard.statements)
+
+
+def test_chef_dashboard_query_count_is_constant(dashboard, monkeypatch):
+    ingredients = dashboards.CHEF_KEY_INGREDIENTS
+    assert len(ingredients) == 10
+    # The first request also detects the search backend, once per database URL
+    dashboard.client.get("/dashboards/chef", params={"location_id": LOCATION_ID})
+    counts = [count_statements(dashboard, monkeypatch, ingredients[:n]) for n in (1, 3, 10)]
+    assert counts[0] == counts[1] == counts[2]
@@ -0,0 +1,145 @@
+"""
+Price forecast layers and batch fitting.
+"""
+import os
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import Base
+from app import models
+from app.services import price_forecast, fit_pool, forecast_engines
+
+# Shorter than, equal to and longer than the 7-price moving average window
+SERIES_LENGTHS = (1, 2, 3, 6, 7, 8, 30)
+# As seeded by seed_delfriscos: vendor -> (stdev_price_change, reliability_score)
+SEEDED_VENDORS = {"US Foods": (3.0, 0.92), "Spec's": (11.0, 0.70)}
+
+
+def price_frame(prices: list[float]) -> pd.DataFrame:
+    start = date(2026, 1, 1)
+    return pd.DataFrame({
+        "date": [start + timedelta(days=i) for i in range(len(prices))],
+        "unit_price": prices,
+    })
+
+
+def simple_reference(prices: np.ndarray, periods: int) -> np.ndarray:
+    """The single-series simple forecast, one day at a time: periods x (forecast, low_ci, high_ci)."""
+    window = min(7, len(prices))
+    ma = np.mean(prices[-window:])
+    trend = (prices[-1] - prices[0]) / len(prices) if len(prices) > 1 else 0
+    forecast = [ma + trend * (i + 1) for i in range(periods)]
+    return np.array([(f, f * 0.90, f * 1.10) for f in forecast])
+
+
+@pytest.fixture
+def two_workers(monkeypatch):
+    monkeypatch.setenv("FORECAST_WORKERS", "2")
+    fit_pool.shutdown_fit_pool()
+    yield
+    fit_pool.shutdown_fit_pool()
+
+
+def test_broken_fit_pool_fails_the_batch_and_is_replaced(two_workers):
+    frames = [price_frame([10.0, 10.5, 11.0]), price_frame([4.0, 4.2, 4.1, 4.3])]
+    broken = fit_pool.get_fit_pool()
+    # A worker that dies takes the whole pool down, as an OOM kill would
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    results = price_forecast._fit_many(frames, periods=7)
+    assert [forecast_df for forecast_df, _, _ in results] == [None, None]
+    assert all(error.startswith("Fitting process failed") for _, _, error in results)
+
+    assert fit_pool.get_fit_pool() is not broken
+    results = price_forecast._fit_many(frames, periods=7)
+    assert [error for _, _, error in results] == [None, None]
+    assert [len(forecast_df) for forecast_df, _, _ in results] == [7, 7]
+
+
+def test_simple_matrix_matches_single_series_forecasts():
+    rng = np.random.default_rng(7)
+    series = [np.round(rng.uniform(5, 50, size=n), 2) for n in SERIES_LENGTHS]
+    matrix = price_forecast.stack_price_series(series)
+    # Shorter series are left-padded with NaN, right-aligned on their latest price
+    assert matrix.shape == (len(series), max(SERIES_LENGTHS))
+    assert np.isnan(matrix[0, :-1]).all()
+
+    forecast, low_ci, high_ci = price_forecast.forecast_prices_simple_matrix(matrix, periods=14)
+    for row, prices in enumerate(series):
+        # Out of date order on purpose: the single-series function sorts by date
+        single = price_forecast.forecast_price_simple(price_frame(list(prices)).iloc[::-1], periods=14)
+        expected = simple_reference(prices, 14)
+        np.testing.assert_allclose(single[["forecast", "low_ci", "high_ci"]].to_numpy(), expected)
+        np.testing.assert_allclose(np.column_stack([forecast[row], low_ci[row], high_ci[row]]), expected)
+
+
+def test_simple_engine_batch_matches_per_series_forecasts():
+    rng = np.random.default_rng(11)
+    engine = forecast_engines.get_engine("simple-v1")
+    series = [
+        (np.arange(np.datetime64("2026-01-01"), np.datetime64("2026-01-01") + n), np.round(rng.uniform(5, 50, size=n), 2))
+        for n in SERIES_LENGTHS
+    ]
+    batch = engine.forecast_many(series, periods=30)
+    for (dates, prices), bands in zip(series, batch):
+        np.testing.assert_allclose(bands, engine.forecast(dates, prices, periods=30))
+        np.testing.assert_allclose(bands, simple_reference(prices, 30))
+
+
+def test_simple_matrix_needs_a_price_per_series():
+    matrix = price_forecast.stack_price_series([np.array([10.0, 11.0]), np.array([])])
+    with pytest.raises(ValueError):
+        price_forecast.forecast_prices_simple_matrix(matrix)
+
+
+@pytest.fixture
+def seeded_db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        for vendor, (stdev, reliability) in SEEDED_VENDORS.items():
+            db.add(models.VendorVolatility(
+                vendor=vendor, avg_price_change=2.5, stdev_price_change=stdev,
+                reliability_score=reliability, lead_time_days=3
+            ))
+        department = models.Department(name="Meat")
+        product_type = models.ProductType(name="Beef", category=models.Category(name="Beef", department=department))
+        for vendor in SEEDED_VENDORS:
+            product = models.Product(sku=f"SKU-{vendor}", name=f"Filet from {vendor}", product_type=product_type)
+            db.add(product)
+            db.flush()
+            for days_ago in (3, 2, 1):
+                db.add(models.PriceHistory(
+                    item_id=product.id, vendor=vendor, date=date.today() - timedelta(days=days_ago),
+                    unit_price=40.50, unit_cost=32.40, purchase_quantity=10, shelf_life_days=365,
+                    category="meat", season="fall"
+                ))
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def test_reliability_damps_the_volatility_multiplier(seeded_db):
+    vendors = seeded_db.query(models.VendorVolatility).all()
+    multipliers = {v.vendor: price_forecast.calculate_volatility_multiplier(v) for v in vendors}
+    assert multipliers["US Foods"] == pytest.approx(1 + 0.03 * 0.08)
+    assert multipliers["Spec's"] == pytest.approx(1 + 0.11 * 0.30)
+    # A fully reliable vendor gets no markup, an unknown one the default
+    assert price_forecast.calculate_volatility_multiplier(models.VendorVolatility(stdev_price_change=11.0, reliability_score=1.0)) == 1.0
+    assert price_forecast.calculate_volatility_multiplier(None) == 1.05
+
+
+def test_flat_price_forecast_stays_near_the_current_price(seeded_db):
+    pairs = [(product.id, vendor) for product, vendor in zip(seeded_db.query(models.Product).order_by(models.Product.id), SEEDED_VENDORS)]
+    outcomes = price_forecast.forecast_item_prices(seeded_db, pairs, "simple-v1")
+    shelf_life_factor = price_forecast.calculate_shelf_life_factor(365)
+    for outcome in outcomes:
+        forecast = outcome["forecast"]
+        assert outcome["error"] is None
+        assert forecast["next_7_day_price"] == pytest.approx(40.50 * forecast["vendor_volatility_multiplier"] * shelf_life_factor, abs=0.01)
+        assert 40.50 <= forecast["next_7_day_price"] <= 40.50 * 1.1